@@ -4,16 +4,21 @@ Step 1: Create Azure Infrastructure for NYC Payroll Data Analytics
 This script creates all required Azure resources:
 1. Azure Data Lake Storage Gen2 (ADLS Gen2) with hierarchical namespace
 2. Azure SQL Database
-3. Azure Data Factory
+3. Azure Data Factory (+ data flow integration runtime with cluster TTL)
 4. Azure Synapse Analytics workspace
 
 Each resource is explained for learning purposes.
+
+For a faster run, scripts/azure/provision_async.py creates the same
+resources concurrently, following their dependencies.
 """
 
 import subprocess
 import json
 import sys
 
+import azure_session as session
+
 # Configuration - Udacity Lab Environment
 SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
 RESOURCE_GROUP = "ODL-DataEng-292169"
@@ -28,6 +33,10 @@ STORAGE_ACCOUNT = f"adlsnycpayroll{STUDENT_SUFFIX.replace('-', '')}"  # Must be
 SQL_SERVER_NAME = f"sqlserver-nycpayroll-{STUDENT_SUFFIX}"
 SQL_DB_NAME = "db_nycpayroll"
 DATA_FACTORY_NAME = f"adf-nycpayroll-{STUDENT_SUFFIX}"
+# Data flow runtime: name, size and TTL shared with provision_async.py and the pipeline
+INTEGRATION_RUNTIME_NAME = session.INTEGRATION_RUNTIME
+DATAFLOW_TTL_MINUTES = session.DATAFLOW_TTL_MINUTES
+DATAFLOW_COMPUTE = session.DATAFLOW_COMPUTE
 SYNAPSE_WORKSPACE_NAME = f"synapse-nycpayroll-{STUDENT_SUFFIX}"
 
 # SQL Server admin credentials
@@ -268,6 +277,48 @@ def create_data_factory():
     
     return result
 
+def create_integration_runtime():
+    """
+    Create a dedicated Azure integration runtime for data flows
+
+    WHY: On the default AutoResolveIntegrationRuntime every data flow
+    activity starts its own Spark cluster (minutes of start-up each time).
+    This runtime keeps a finished cluster warm for DATAFLOW_TTL_MINUTES and
+    hands it to the next activity (cleanup: false = quick re-use).
+    pl_NYC_Payroll_Pipeline references it by name; its cluster size applies
+    to every activity on it (activity-level compute is AutoResolve only).
+    """
+    print("\n" + "="*70)
+    print("CREATING DATA FLOW INTEGRATION RUNTIME")
+    print("="*70)
+
+    compute_properties = json.dumps({
+        "location": "AutoResolve",
+        "dataFlowProperties": {
+            "computeType": DATAFLOW_COMPUTE["computeType"],
+            "coreCount": DATAFLOW_COMPUTE["coreCount"],
+            "timeToLive": DATAFLOW_TTL_MINUTES,
+            "cleanup": False
+        }
+    })
+
+    command = f"""az datafactory integration-runtime managed create \
+        --factory-name {DATA_FACTORY_NAME} \
+        --name {INTEGRATION_RUNTIME_NAME} \
+        --resource-group {RESOURCE_GROUP} \
+        --description "Data flow runtime for pl_NYC_Payroll_Pipeline" \
+        --compute-properties '{compute_properties}' \
+        --output json"""
+
+    result = run_command(command, "Create Integration Runtime")
+
+    if result:
+        print(f"\nIntegration Runtime Created: {INTEGRATION_RUNTIME_NAME}")
+        print(f"- Clusters stay warm for {DATAFLOW_TTL_MINUTES} minutes after an activity")
+        print("- The next data flow activity reuses the warm cluster instead of a cold start")
+
+    return result
+
 def create_synapse_workspace():
     """
     Create Azure Synapse Analytics workspace
@@ -378,6 +429,7 @@ SQL Database:         {SQL_DB_NAME}
   Admin User:         {SQL_ADMIN_USER}
 
 Data Factory:         {DATA_FACTORY_NAME}
+  Integration Runtime: {INTEGRATION_RUNTIME_NAME} (TTL {DATAFLOW_TTL_MINUTES} min)
 
 Synapse Workspace:    {SYNAPSE_WORKSPACE_NAME}
   Admin User:         {SQL_ADMIN_USER}
@@ -428,8 +480,9 @@ def main():
     # Step 5: Create SQL Database
     create_sql_database()
     
-    # Step 6: Create Data Factory
-    create_data_factory()
+    # Step 6: Create Data Factory (+ data flow integration runtime)
+    if create_data_factory():
+        create_integration_runtime()
     
     # Step 7: Create Synapse Workspace
     create_synapse_workspace()
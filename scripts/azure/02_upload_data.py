@@ -12,89 +12,74 @@ We separate historical (2020) and current (2021) data for:
 - Following Bronze/Silver/Gold architecture patterns
 """
 
-import subprocess
 import os
 
+import azure_session as session
+import lake_inventory
+import lake_uploader
+from parquet_landing import LANDING_CONTAINER, LANDING_FOLDER, LANDING_PATH
+
 # Configuration
-STORAGE_ACCOUNT = "adlsnycpayrollrodolfol"
+STORAGE_ACCOUNT = session.STORAGE_ACCOUNT
 # Get absolute path to data folder
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 DATA_PATH = os.path.join(PROJECT_ROOT, "data")
 
-# Files to upload and their destinations
-FILE_MAPPINGS = {
-    # Master data files - go to both directories for reference
-    "AgencyMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
-    "EmpMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
-    "TitleMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
-    
-    # Historical payroll data
-    "nycpayroll_2020.csv": ["dirhistoryfiles"],
-    
-    # Current payroll data
-    "nycpayroll_2021.csv": ["dirpayrollfiles"]
-}
+# Files to upload and their destinations (defined once, in lake_uploader.py)
+FILE_MAPPINGS = lake_uploader.FILE_MAPPINGS
 
-def run_command(command, description):
-    """Execute command and handle errors"""
-    print(f"\n{'='*70}")
-    print(f"STEP: {description}")
-    print(f"{'='*70}")
-    
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        print("SUCCESS")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"ERROR: {e.stderr}")
-        return False
-
-def upload_file(local_file, container, storage_account):
+def upload_files():
     """
-    Upload a file to Azure Data Lake Storage Gen2
-    
-    WHY WE USE AZURE CLI:
-    - Simple authentication (already logged in)
-    - Reliable file transfer
-    - Automatic retry on network issues
-    
+    Upload every file in FILE_MAPPINGS to Azure Data Lake Storage Gen2
+
+    WHY WE USE THE STORAGE SDK (lake_uploader.py):
+    - Each file is read and sent once; extra containers get a server-side copy
+    - Blocks are uploaded in parallel to saturate the link
+    - Files whose size and MD5 already match the lake are skipped
+    - An interrupted upload resumes from its staged blocks (checkpoint)
+
     For large-scale production, we'd use:
     - Azure Data Factory for scheduled ingestion
-    - Azure Storage SDKs for programmatic control
     - AzCopy for bulk transfers
     """
-    file_path = os.path.join(DATA_PATH, local_file)
-    
-    if not os.path.exists(file_path):
-        print(f"ERROR: File not found: {file_path}")
-        return False
-    
-    command = f"""az storage blob upload \
-        --account-name {storage_account} \
-        --container-name {container} \
-        --name {local_file} \
-        --file "{file_path}" \
-        --auth-mode login \
-        --overwrite"""
-    
-    return run_command(
-        command,
-        f"Upload {local_file} to {container}"
+    print(f"\n{'='*70}")
+    print("STEP: Upload source files")
+    print(f"{'='*70}")
+
+    missing = [f for f in FILE_MAPPINGS if not os.path.exists(os.path.join(DATA_PATH, f))]
+    for filename in missing:
+        print(f"ERROR: File not found: {os.path.join(DATA_PATH, filename)}")
+
+    mappings = {f: c for f, c in FILE_MAPPINGS.items() if f not in missing}
+    return lake_uploader.upload_files(
+        mappings, DATA_PATH, account=STORAGE_ACCOUNT, checkpoint=lake_uploader.UploadCheckpoint()
     )
 
+def upload_landing_zone(storage_account):
+    """
+    Upload the partitioned Parquet landing zone (if it has been built)
+
+    WHY PARQUET:
+    - FiscalYear=/AgencyID= folders let Synapse prune partitions
+    - Columnar files let readers fetch only the columns they need
+    Run parquet_landing.py first to build data/landing/payroll.
+    """
+    if not os.path.isdir(LANDING_PATH):
+        print(f"\nSkipping Parquet landing zone (not built): {LANDING_PATH}")
+        return []
+
+    print(f"\n{'='*70}")
+    print(f"STEP: Upload Parquet landing zone to {LANDING_CONTAINER}/{LANDING_FOLDER}")
+    print(f"{'='*70}")
+    return lake_uploader.upload_tree(LANDING_PATH, LANDING_CONTAINER, LANDING_FOLDER, account=storage_account)
+
 def verify_uploads(storage_account):
     """
-    List all files in each container to verify uploads
+    Compare every container against the local files (lake_inventory.py)
     
     WHY VERIFICATION MATTERS:
-    - Ensures data integrity
+    - Ensures data integrity (size and MD5 of every blob are checked)
     - Confirms file availability for pipelines
     - Catches upload failures early
     """
@@ -102,33 +87,9 @@ def verify_uploads(storage_account):
     print("VERIFYING UPLOADS")
     print(f"{'='*70}")
     
-    for container in ["dirpayrollfiles", "dirhistoryfiles", "dirstaging"]:
-        print(f"\nContainer: {container}")
-        print("-" * 70)
-        
-        command = f"""az storage blob list \
-            --account-name {storage_account} \
-            --container-name {container} \
-            --auth-mode login \
-            --query "[].name" \
-            --output tsv"""
-        
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            files = result.stdout.strip().split('\n') if result.stdout.strip() else []
-            if files and files[0]:
-                for f in files:
-                    print(f"  - {f}")
-            else:
-                print("  (empty)")
-        except subprocess.CalledProcessError as e:
-            print(f"ERROR: {e.stderr}")
+    diff, inventory = lake_inventory.verify(FILE_MAPPINGS, DATA_PATH, account=storage_account)
+    lake_inventory.print_report(diff, inventory)
+    return not (diff["missing"] or diff["mismatched"])
 
 def print_summary():
     """Print summary with data engineering concepts"""
@@ -181,19 +142,19 @@ def main():
     
     input("\nPress Enter to start...")
     
-    # Upload each file to its designated container(s)
-    upload_count = 0
+    # Upload each file once; extra containers get a server-side copy
+    results = upload_files()
+    done = sum(1 for r in results if r["action"] != "failed")
     total_count = sum(len(containers) for containers in FILE_MAPPINGS.values())
     
-    for filename, containers in FILE_MAPPINGS.items():
-        for container in containers:
-            if upload_file(filename, container, STORAGE_ACCOUNT):
-                upload_count += 1
-    
     print(f"\n{'='*70}")
-    print(f"Upload Results: {upload_count}/{total_count} files uploaded")
+    print(f"Upload Results: {done}/{total_count} blobs in place "
+          f"({sum(1 for r in results if r['action'] == 'skipped')} unchanged)")
     print(f"{'='*70}")
     
+    # Upload the Parquet landing zone next to the raw CSVs
+    upload_landing_zone(STORAGE_ACCOUNT)
+    
     # Verify uploads
     verify_uploads(STORAGE_ACCOUNT)
     
@@ -7,6 +7,9 @@ This script creates all 6 tables in Azure SQL Database:
 - 3 Master Data tables (dimension tables)
 - 2 Payroll transaction tables (fact tables)
 - 1 Summary table (aggregated data)
+It then runs 07_create_partitioned_payroll.sql: NYC_Payroll_Data (all years,
+partitioned by FiscalYear), its staging table and the prepare/switch
+procedures that the pipeline's payroll-year loads call.
 
 For Data Scientists: In relational databases, you define the schema
 (structure) before loading data. This ensures data quality and enables
@@ -16,18 +19,21 @@ SQL queries with joins and aggregations.
 import subprocess
 import os
 
+import azure_session as session
+
 # Configuration
-SQL_SERVER_NAME = "sqlserver-nycpayroll-rodolfo-l.database.windows.net"
-SQL_DB_NAME = "db_nycpayroll"
-SQL_ADMIN_USER = "sqladmin"
-SQL_ADMIN_PASSWORD = "P@ssw0rd1234!"
+SQL_SERVER_NAME = session.sql_server_host("sql")
+SQL_DB_NAME = session.SQL_DATABASE
+SQL_ADMIN_USER = session.SQL_USERNAME
+SQL_ADMIN_PASSWORD = session.SQL_PASSWORD
 
 # Get path to SQL script
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
 SQL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "01_create_sqldb_tables.sql")
+PARTITIONED_SQL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "07_create_partitioned_payroll.sql")
 
-def run_sql_script():
+def run_sql_script(sql_script=SQL_SCRIPT):
     """
     Execute SQL script to create all tables
     
@@ -49,10 +55,10 @@ def run_sql_script():
     print(f"\nServer: {SQL_SERVER_NAME}")
     print(f"Database: {SQL_DB_NAME}")
     print(f"User: {SQL_ADMIN_USER}")
-    print(f"\nExecuting script: {SQL_SCRIPT}")
+    print(f"\nExecuting script: {sql_script}")
     
     # Build sqlcmd command
-    command = f'''sqlcmd -S {SQL_SERVER_NAME} -d {SQL_DB_NAME} -U {SQL_ADMIN_USER} -P "{SQL_ADMIN_PASSWORD}" -i "{SQL_SCRIPT}" -I'''
+    command = f'''sqlcmd -S {SQL_SERVER_NAME} -d {SQL_DB_NAME} -U {SQL_ADMIN_USER} -P "{SQL_ADMIN_PASSWORD}" -i "{sql_script}" -I'''
     
     try:
         result = subprocess.run(
@@ -173,18 +179,19 @@ def main():
     ╚═══════════════════════════════════════════════════════════════════╝
     """)
     
-    # Check if SQL script exists
-    if not os.path.exists(SQL_SCRIPT):
-        print(f"ERROR: SQL script not found: {SQL_SCRIPT}")
-        return
+    # Check if SQL scripts exist
+    for sql_script in (SQL_SCRIPT, PARTITIONED_SQL_SCRIPT):
+        if not os.path.exists(sql_script):
+            print(f"ERROR: SQL script not found: {sql_script}")
+            return
     
     print("\nThis script will create 6 tables in Azure SQL Database.")
     print("Estimated time: 1 minute")
     
     input("\nPress Enter to start...")
     
-    # Create tables
-    if run_sql_script():
+    # Create tables (per-year tables, then the partitioned payroll table)
+    if run_sql_script() and run_sql_script(PARTITIONED_SQL_SCRIPT):
         # Verify
         verify_tables()
         
@@ -10,35 +10,38 @@ We create 3 linked services:
 3. Synapse workspace - Write to external tables
 """
 
-import subprocess
-import json
-import os
-
-# Configuration
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
-STORAGE_ACCOUNT = "adlsnycpayrollrodolfol"
-SQL_SERVER = "sqlserver-nycpayroll-rodolfo-l"
-SQL_DATABASE = "db_nycpayroll"
-SQL_ADMIN_USER = "sqladmin"
-SQL_ADMIN_PASSWORD = "P@ssw0rd1234!"
-SYNAPSE_WORKSPACE = "synapse-nycpayroll-rodolfo-l"
-
-# Azure CLI path
-AZ_CLI = r"C:\Program Files\Microsoft SDKs\Azure\CLI2\wbin\az.cmd"
-
-# Get subscription ID
-result = subprocess.run(
-    [AZ_CLI, "account", "show", "--query", "id", "-o", "tsv"],
-    capture_output=True, text=True, check=True, shell=True
-)
-SUBSCRIPTION_ID = result.stdout.strip()
+import azure_session as session
+
+# Configuration (shared session: subscription resolved once, cached token)
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
+STORAGE_ACCOUNT = session.STORAGE_ACCOUNT
+SQL_SERVER = session.SQL_SERVER
+SQL_DATABASE = session.SQL_DATABASE
+SQL_ADMIN_USER = session.SQL_USERNAME
+SQL_ADMIN_PASSWORD = session.SQL_PASSWORD
+SYNAPSE_WORKSPACE = session.SYNAPSE_WORKSPACE
+
+SUBSCRIPTION_ID = session.get_subscription_id()
 
 print("=" * 80)
 print("STEP 2: Creating Linked Services in Azure Data Factory")
 print("=" * 80)
 print()
 
+print("Authenticating...")
+adf_client = session.adf_client()
+print("Authenticated successfully")
+print()
+
+
+def create_linked_service(linked_service):
+    """Create or update one linked service through the SDK client (raises on failure)"""
+    adf_client.linked_services.create_or_update(
+        RESOURCE_GROUP, DATA_FACTORY, linked_service["name"], {"properties": linked_service["properties"]}
+    )
+
+
 # ============================================================================
 # 1. ADLS Gen2 Linked Service
 # ============================================================================
@@ -47,15 +50,8 @@ print("   WHY: Allows ADF to read CSV files from Data Lake")
 print("   AUTH: Uses storage account key for simplicity")
 print()
 
-# Get storage account key
-result = subprocess.run(
-    [AZ_CLI, "storage", "account", "keys", "list",
-     "--resource-group", RESOURCE_GROUP,
-     "--account-name", STORAGE_ACCOUNT,
-     "--query", "[0].value", "-o", "tsv"],
-    capture_output=True, text=True, check=True, shell=True
-)
-storage_key = result.stdout.strip()
+# Get storage account key (management SDK, no CLI start-up)
+storage_key = session.storage_account_key(STORAGE_ACCOUNT)
 
 adls_linked_service = {
     "name": "ls_AdlsGen2",
@@ -71,21 +67,7 @@ adls_linked_service = {
     }
 }
 
-# Save to temp file
-with open("temp_adls_ls.json", "w") as f:
-    json.dump(adls_linked_service, f, indent=2)
-
-# Create linked service
-subprocess.run(
-    [AZ_CLI, "datafactory", "linked-service", "create",
-     "--resource-group", RESOURCE_GROUP,
-     "--factory-name", DATA_FACTORY,
-     "--name", "ls_AdlsGen2",
-     "--properties", "@temp_adls_ls.json"],
-    check=True, shell=True
-)
-
-os.remove("temp_adls_ls.json")
+create_linked_service(adls_linked_service)
 print("   ✓ ADLS Gen2 Linked Service created: ls_AdlsGen2")
 print()
 
@@ -108,21 +90,7 @@ sql_linked_service = {
     }
 }
 
-# Save to temp file
-with open("temp_sql_ls.json", "w") as f:
-    json.dump(sql_linked_service, f, indent=2)
-
-# Create linked service
-subprocess.run(
-    [AZ_CLI, "datafactory", "linked-service", "create",
-     "--resource-group", RESOURCE_GROUP,
-     "--factory-name", DATA_FACTORY,
-     "--name", "ls_SqlDatabase",
-     "--properties", "@temp_sql_ls.json"],
-    check=True, shell=True
-)
-
-os.remove("temp_sql_ls.json")
+create_linked_service(sql_linked_service)
 print("   ✓ Azure SQL Database Linked Service created: ls_SqlDatabase")
 print()
 
@@ -144,21 +112,7 @@ synapse_linked_service = {
     }
 }
 
-# Save to temp file
-with open("temp_synapse_ls.json", "w") as f:
-    json.dump(synapse_linked_service, f, indent=2)
-
-# Create linked service
-subprocess.run(
-    [AZ_CLI, "datafactory", "linked-service", "create",
-     "--resource-group", RESOURCE_GROUP,
-     "--factory-name", DATA_FACTORY,
-     "--name", "ls_Synapse",
-     "--properties", "@temp_synapse_ls.json"],
-    check=True, shell=True
-)
-
-os.remove("temp_synapse_ls.json")
+create_linked_service(synapse_linked_service)
 print("   ✓ Synapse Linked Service created: ls_Synapse")
 print()
 
@@ -170,15 +124,9 @@ print("VERIFICATION: Listing all linked services")
 print("=" * 80)
 print()
 
-result = subprocess.run(
-    [AZ_CLI, "datafactory", "linked-service", "list",
-     "--resource-group", RESOURCE_GROUP,
-     "--factory-name", DATA_FACTORY,
-     "--query", "[].{Name:name, Type:properties.type}", "-o", "table"],
-    capture_output=True, text=True, check=True, shell=True
-)
-
-print(result.stdout)
+for linked_service in adf_client.linked_services.list_by_factory(RESOURCE_GROUP, DATA_FACTORY):
+    print(f"  {linked_service.name:<25} {linked_service.properties.type}")
+print()
 
 print("=" * 80)
 print("STEP 2 COMPLETE!")
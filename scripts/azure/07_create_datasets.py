@@ -2,43 +2,71 @@
 Step 3: Create Datasets in Azure Data Factory (Automated)
 
 Datasets define schema/structure of data sources and destinations.
-We create 12 datasets total:
-- 5 CSV source files from Data Lake
-- 6 SQL table destinations
+We create 11 datasets total:
+- 3 CSV master files from Data Lake
+- 5 SQL table destinations (incl. the FiscalYear-partitioned NYC_Payroll_Data
+  that the payroll-year loads switch into and the aggregation reads)
 - 1 Synapse external table destination
+- 2 parameterized datasets (any lake CSV, any SQL table) used by the
+  df_Load_Generic and df_Load_Payroll_Year flows that the pipeline's
+  ForEach runs per load_manifest.json entry
+
+The per-year payroll datasets (ds_nycpayroll_2020/2021,
+ds_NYC_Payroll_Data_2020/2021) and the df_Load_2020/2021_Payroll flows that
+used them are retired: every payroll file is read through ds_Lake_CSV and
+lands in NYC_Payroll_Data. They are deleted from the factory if present.
+
+Datasets whose definition has not changed since the last deploy are
+skipped (content-hash manifest in adf_deploy.py).
 """
 
-import subprocess
-import json
-import os
+import sys
+
+import azure_session as session
+from adf_deploy import artifacts_from_dicts, deploy_changed
 
-# Configuration
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
-AZ_CLI = r"C:\Program Files\Microsoft SDKs\Azure\CLI2\wbin\az.cmd"
+# Configuration (shared session: subscription resolved once, cached token)
+SUBSCRIPTION_ID = session.get_subscription_id()
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
+
+# Retired per-year payroll artifacts (data flows first: they reference the datasets)
+RETIRED_DATAFLOWS = ["df_Load_2020_Payroll", "df_Load_2021_Payroll"]
+RETIRED_DATASETS = ["ds_nycpayroll_2020", "ds_nycpayroll_2021", "ds_NYC_Payroll_Data_2020", "ds_NYC_Payroll_Data_2021"]
 
 print("=" * 80)
 print("STEP 3: Creating Datasets in Azure Data Factory")
 print("=" * 80)
 print()
 
+print("Authenticating...")
+adf_client = session.adf_client()
+print("Authenticated successfully")
+print()
+
+
+dataset_resources = {}
+
+
+def define_dataset(name, dataset):
+    """Collect one dataset; all of them are deployed together at the end"""
+    print(f"Defining: {name}")
+    dataset_resources[name] = dataset
+
+
 # ============================================================================
-# CSV DATASETS (5) - Source files from Data Lake
+# CSV DATASETS (3) - Master files from Data Lake
 # ============================================================================
-print("PART 1: Creating CSV Source Datasets (5)")
+print("PART 1: Creating CSV Source Datasets (3)")
 print("-" * 80)
 
 csv_datasets = [
     ("ds_AgencyMaster", "dirpayrollfiles", "AgencyMaster.csv"),
     ("ds_EmpMaster", "dirpayrollfiles", "EmpMaster.csv"),
     ("ds_TitleMaster", "dirpayrollfiles", "TitleMaster.csv"),
-    ("ds_nycpayroll_2020", "dirhistoryfiles", "nycpayroll_2020.csv"),
-    ("ds_nycpayroll_2021", "dirpayrollfiles", "nycpayroll_2021.csv"),
 ]
 
 for name, container, filename in csv_datasets:
-    print(f"Creating: {name}")
-    
     dataset = {
         "properties": {
             "linkedServiceName": {
@@ -62,49 +90,25 @@ for name, container, filename in csv_datasets:
         }
     }
     
-    # Save to temp file
-    temp_file = f"temp_{name}.json"
-    with open(temp_file, "w") as f:
-        json.dump(dataset, f, indent=2)
-    
-    # Create dataset
-    try:
-        subprocess.run(
-            [AZ_CLI, "datafactory", "dataset", "create",
-             "--resource-group", RESOURCE_GROUP,
-             "--factory-name", DATA_FACTORY,
-             "--name", name,
-             "--properties", f"@{temp_file}"],
-            check=True, shell=True, capture_output=True, text=True
-        )
-        print(f"  SUCCESS: {name}")
-    except subprocess.CalledProcessError as e:
-        print(f"  ERROR: {name}")
-        print(f"  {e.stderr}")
-    
-    os.remove(temp_file)
-    print()
+    define_dataset(name, dataset)
 
 print()
 
 # ============================================================================
-# SQL TABLE DATASETS (6) - Destination tables in SQL Database
+# SQL TABLE DATASETS (5) - Destination tables in SQL Database
 # ============================================================================
-print("PART 2: Creating SQL Table Datasets (6)")
+print("PART 2: Creating SQL Table Datasets (5)")
 print("-" * 80)
 
 sql_datasets = [
     ("ds_NYC_Payroll_AGENCY_MD", "NYC_Payroll_AGENCY_MD"),
     ("ds_NYC_Payroll_EMP_MD", "NYC_Payroll_EMP_MD"),
     ("ds_NYC_Payroll_TITLE_MD", "NYC_Payroll_TITLE_MD"),
-    ("ds_NYC_Payroll_Data_2020", "NYC_Payroll_Data_2020"),
-    ("ds_NYC_Payroll_Data_2021", "NYC_Payroll_Data_2021"),
+    ("ds_NYC_Payroll_Data", "NYC_Payroll_Data"),
     ("ds_NYC_Payroll_Summary", "NYC_Payroll_Summary"),
 ]
 
 for name, table in sql_datasets:
-    print(f"Creating: {name}")
-    
     dataset = {
         "properties": {
             "linkedServiceName": {
@@ -120,28 +124,7 @@ for name, table in sql_datasets:
         }
     }
     
-    # Save to temp file
-    temp_file = f"temp_{name}.json"
-    with open(temp_file, "w") as f:
-        json.dump(dataset, f, indent=2)
-    
-    # Create dataset
-    try:
-        subprocess.run(
-            [AZ_CLI, "datafactory", "dataset", "create",
-             "--resource-group", RESOURCE_GROUP,
-             "--factory-name", DATA_FACTORY,
-             "--name", name,
-             "--properties", f"@{temp_file}"],
-            check=True, shell=True, capture_output=True, text=True
-        )
-        print(f"  SUCCESS: {name}")
-    except subprocess.CalledProcessError as e:
-        print(f"  ERROR: {name}")
-        print(f"  {e.stderr}")
-    
-    os.remove(temp_file)
-    print()
+    define_dataset(name, dataset)
 
 print()
 
@@ -151,8 +134,6 @@ print()
 print("PART 3: Creating Synapse Dataset (1)")
 print("-" * 80)
 
-print("Creating: ds_Synapse_NYC_Payroll_Summary")
-
 synapse_dataset = {
     "properties": {
         "linkedServiceName": {
@@ -168,27 +149,88 @@ synapse_dataset = {
     }
 }
 
-# Save to temp file
-temp_file = "temp_ds_Synapse_NYC_Payroll_Summary.json"
-with open(temp_file, "w") as f:
-    json.dump(synapse_dataset, f, indent=2)
-
-# Create dataset
-try:
-    subprocess.run(
-        [AZ_CLI, "datafactory", "dataset", "create",
-         "--resource-group", RESOURCE_GROUP,
-         "--factory-name", DATA_FACTORY,
-         "--name", "ds_Synapse_NYC_Payroll_Summary",
-         "--properties", f"@{temp_file}"],
-        check=True, shell=True, capture_output=True, text=True
-    )
-    print("  SUCCESS: ds_Synapse_NYC_Payroll_Summary")
-except subprocess.CalledProcessError as e:
-    print("  ERROR: ds_Synapse_NYC_Payroll_Summary")
-    print(f"  {e.stderr}")
-
-os.remove(temp_file)
+define_dataset("ds_Synapse_NYC_Payroll_Summary", synapse_dataset)
+
+# ============================================================================
+# PARAMETERIZED DATASETS (2) - Used by df_Load_Generic for every manifest entry
+# ============================================================================
+print("PART 4: Creating Parameterized Datasets (2)")
+print("-" * 80)
+
+parameterized_datasets = {
+    "ds_Lake_CSV": {
+        "properties": {
+            "linkedServiceName": {
+                "referenceName": "ls_AdlsGen2",
+                "type": "LinkedServiceReference"
+            },
+            "parameters": {
+                "fileSystem": {"type": "string"},
+                "fileName": {"type": "string"}
+            },
+            "type": "DelimitedText",
+            "typeProperties": {
+                "location": {
+                    "type": "AzureBlobFSLocation",
+                    "fileName": {"value": "@dataset().fileName", "type": "Expression"},
+                    "folderPath": "",
+                    "fileSystem": {"value": "@dataset().fileSystem", "type": "Expression"}
+                },
+                "columnDelimiter": ",",
+                "escapeChar": "\\",
+                "firstRowAsHeader": True,
+                "quoteChar": "\""
+            },
+            "schema": []
+        }
+    },
+    "ds_SqlDb_Table": {
+        "properties": {
+            "linkedServiceName": {
+                "referenceName": "ls_SqlDatabase",
+                "type": "LinkedServiceReference"
+            },
+            "parameters": {
+                "tableName": {"type": "string"}
+            },
+            "type": "AzureSqlTable",
+            "typeProperties": {
+                "schema": "dbo",
+                "table": {"value": "@dataset().tableName", "type": "Expression"}
+            },
+            "schema": []
+        }
+    },
+}
+
+for name, dataset in parameterized_datasets.items():
+    define_dataset(name, dataset)
+
+# ============================================================================
+# DEPLOY (only datasets whose definition changed since the last deploy)
+# ============================================================================
+print("=" * 80)
+print(f"DEPLOY: {len(dataset_resources)} datasets")
+print("=" * 80)
+results = deploy_changed(
+    adf_client,
+    artifacts_from_dicts("dataset", dataset_resources),
+    resource_group=RESOURCE_GROUP,
+    factory=DATA_FACTORY
+)
+print()
+
+# ============================================================================
+# RETIRED ARTIFACTS (per-year payroll flows and datasets)
+# ============================================================================
+print("Removing retired per-year payroll artifacts")
+print("-" * 80)
+for name in RETIRED_DATAFLOWS:
+    adf_client.data_flows.delete(RESOURCE_GROUP, DATA_FACTORY, name)
+    print(f"  ✓ {name}")
+for name in RETIRED_DATASETS:
+    adf_client.datasets.delete(RESOURCE_GROUP, DATA_FACTORY, name)
+    print(f"  ✓ {name}")
 print()
 
 # ============================================================================
@@ -199,24 +241,23 @@ print("VERIFICATION: Listing all datasets")
 print("=" * 80)
 print()
 
-result = subprocess.run(
-    [AZ_CLI, "datafactory", "dataset", "list",
-     "--resource-group", RESOURCE_GROUP,
-     "--factory-name", DATA_FACTORY,
-     "--query", "[].{Name:name, Type:properties.type}", "-o", "table"],
-    capture_output=True, text=True, check=True, shell=True
-)
-
-print(result.stdout)
+for dataset in adf_client.datasets.list_by_factory(RESOURCE_GROUP, DATA_FACTORY):
+    print(f"  {dataset.name:<40} {dataset.properties.type}")
+print()
 
 print("=" * 80)
 print("STEP 3 COMPLETE!")
 print("=" * 80)
 print()
-print("12 datasets created:")
-print("  CSV Source (5): AgencyMaster, EmpMaster, TitleMaster, 2020, 2021")
-print("  SQL Tables (6): AGENCY_MD, EMP_MD, TITLE_MD, Data_2020, Data_2021, Summary")
+print(f"11 datasets defined, {sum(1 for r in results.values() if r == 'deployed')} deployed "
+      "(unchanged ones skipped):")
+print("  CSV Source (3): AgencyMaster, EmpMaster, TitleMaster")
+print("  SQL Tables (5): AGENCY_MD, EMP_MD, TITLE_MD, Data (partitioned), Summary")
 print("  Synapse (1): NYC_Payroll_Summary")
+print("  Parameterized (2): ds_Lake_CSV, ds_SqlDb_Table")
 print()
 print("Next: Create pipelines with Copy activities and Data Flows")
 print()
+
+if any(status != "deployed" for status in results.values()):
+    sys.exit(1)
@@ -1,104 +1,96 @@
 """
 Step 4: Create Data Flows using Azure Data Factory Python SDK
 
-Per project requirements:
-Create 5 separate data flows, one for each CSV file → SQL table
-- df_Load_AgencyMaster
-- df_Load_EmpMaster
-- df_Load_TitleMaster
-- df_Load_2020_Payroll
-- df_Load_2021_Payroll
-
-Each data flow: Source (CSV dataset) → Sink (SQL table)
+Creates df_Load_Generic: one parameterized load flow
+Source (ds_Lake_CSV: fileSystem, fileName) → Sink (ds_SqlDb_Table: tableName)
+The pipeline's ForEach runs it once per master file in load_manifest.json.
+
+Creates df_Load_Payroll_Year: the same source, every row appended to
+NYC_Payroll_Data_Stage (AgencyCode renamed to AgencyID). The ForEach runs it
+for every manifest entry with fiscalYears, between the prepare and switch
+procedures of 07_create_partitioned_payroll.sql, so a new year is a new
+manifest line instead of a new table and data flow. A row whose FiscalYear
+is not in $fiscalYears fails the flow: it would sit in staging unswitched.
+
+The project rubric asks for separate data flows, one for each CSV → SQL table.
+Pass --per-file to deploy the master ones as well (df_Load_AgencyMaster,
+df_Load_EmpMaster, df_Load_TitleMaster); the pipeline no longer uses them.
+The per-year payroll flows (df_Load_2020/2021_Payroll) and their tables are
+retired: every payroll file is loaded by df_Load_Payroll_Year.
+
+Usage:
+    python 08_create_pipelines.py
+    python 08_create_pipelines.py --per-file
+
+The definitions are read from JSON/dataflow (the files adf_deploy.py deploys),
+so both deploy paths send the same content and hash it the same way. Data
+flows whose definition has not changed since the last deploy are skipped
+(content-hash manifest in adf_deploy.py).
 """
 
-from azure.identity import AzureCliCredential
-from azure.mgmt.datafactory import DataFactoryManagementClient
 from azure.mgmt.datafactory.models import *
+import sys
 import time
 
+import azure_session as session
+from adf_deploy import deploy_changed, load_json_artifacts
+
 # Configuration
-SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
+SUBSCRIPTION_ID = session.get_subscription_id()
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
 
 print("=" * 80)
-print("STEP 4: Creating 5 Data Flows (per project requirements)")
+print("STEP 4: Creating Data Flows")
 print("=" * 80)
 print()
 
-# Authenticate
+# Authenticate (shared session: cached token and client)
 print("Authenticating...")
-credential = AzureCliCredential()
-adf_client = DataFactoryManagementClient(credential, SUBSCRIPTION_ID)
+adf_client = session.adf_client()
 print("Authenticated successfully")
 print()
 
+PER_FILE = "--per-file" in sys.argv
+
+# Definitions come from JSON/dataflow, the same files adf_deploy.py and
+# pipeline_scheduler.py read, so every deploy path hashes the same content
+DATAFLOWS = ["df_Load_Generic", "df_Load_Payroll_Year"]
+PER_FILE_DATAFLOWS = ["df_Load_AgencyMaster", "df_Load_EmpMaster", "df_Load_TitleMaster"]
+
+
+def dataset_names(dataflow, side):
+    return ", ".join(item["dataset"]["referenceName"] for item in dataflow.properties["typeProperties"][side])
+
+
+json_dataflows = {artifact.name: artifact for artifact in load_json_artifacts() if artifact.kind == "dataflow"}
+dataflows = [json_dataflows[name] for name in DATAFLOWS + (PER_FILE_DATAFLOWS if PER_FILE else [])]
+
 # ============================================================================
-# CREATE 5 DATA FLOWS (one for each CSV → SQL table load)
+# LOAD DATA FLOWS (generic + payroll year; --per-file adds one per master file)
 # ============================================================================
 
-dataflow_configs = [
-    ("df_Load_AgencyMaster", "ds_AgencyMaster", "ds_NYC_Payroll_AGENCY_MD", "Agency master data"),
-    ("df_Load_EmpMaster", "ds_EmpMaster", "ds_NYC_Payroll_EMP_MD", "Employee master data"),
-    ("df_Load_TitleMaster", "ds_TitleMaster", "ds_NYC_Payroll_TITLE_MD", "Title master data"),
-    ("df_Load_2020_Payroll", "ds_nycpayroll_2020", "ds_NYC_Payroll_Data_2020", "2020 payroll data"),
-    ("df_Load_2021_Payroll", "ds_nycpayroll_2021", "ds_NYC_Payroll_Data_2021", "2021 payroll data"),
-]
-
-for df_name, source_ds, sink_ds, description in dataflow_configs:
-    print(f"Creating data flow: {df_name}")
-    print(f"  Source: {source_ds} → Sink: {sink_ds}")
-    
-    # Create data flow resource with properties wrapper
-    dataflow_resource = {
-        "properties": {
-            "type": "MappingDataFlow",
-            "description": f"Load {description} from Data Lake to SQL Database",
-            "typeProperties": {
-                "sources": [
-                    {
-                        "name": "source",
-                        "dataset": {
-                            "referenceName": source_ds,
-                            "type": "DatasetReference"
-                        }
-                    }
-                ],
-                "sinks": [
-                    {
-                        "name": "sink",
-                        "dataset": {
-                            "referenceName": sink_ds,
-                            "type": "DatasetReference"
-                        }
-                    }
-                ],
-                "script": f"source(allowSchemaDrift: true, validateSchema: false) ~> source\nsource sink(allowSchemaDrift: true, validateSchema: false, deletable:false, insertable:true, updateable:false, upsertable:false, recreate:true, format: 'table', skipDuplicateMapInputs: true, skipDuplicateMapOutputs: true) ~> sink"
-            }
-        }
-    }
-    
-    try:
-        adf_client.data_flows.create_or_update(
-            RESOURCE_GROUP,
-            DATA_FACTORY,
-            df_name,
-            dataflow_resource
-        )
-        print(f"  SUCCESS: {df_name} created")
-    except Exception as e:
-        print(f"  ERROR: {df_name}")
-        print(f"  {str(e)}")
-    
-    print()
+for dataflow in dataflows:
+    print(f"Defining data flow: {dataflow.name}")
+    print(f"  Source: {dataset_names(dataflow, 'sources')} → Sink: {dataset_names(dataflow, 'sinks')}")
+    print(f"  {dataflow.properties['description']}")
+print()
+
+# Deploy only the data flows that changed since the last deploy
+deploy_changed(
+    adf_client,
+    dataflows,
+    resource_group=RESOURCE_GROUP,
+    factory=DATA_FACTORY
+)
+print()
 
 print("=" * 80)
 print("STEP 4 COMPLETE!")
 print("=" * 80)
 print()
-print("5 data flows created:")
-for df_name, _, _, _ in dataflow_configs:
-    print(f"  - {df_name}")
+print(f"{len(dataflows)} data flows created:")
+for dataflow in dataflows:
+    print(f"  - {dataflow.name}")
 print()
 print("Next: Verify data flows in ADF Studio and take screenshots")
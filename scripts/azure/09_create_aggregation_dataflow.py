@@ -3,7 +3,9 @@
 Step 5: Create Aggregation Data Flow
 
 Creates Dataflow_Summary_Aggregate that:
-- Combines 2020 + 2021 payroll data from SQL DB
+- Reads every fiscal year from the FiscalYear-partitioned NYC_Payroll_Data
+  (loaded by the pipeline's payroll-year branch, see load_manifest.json), so
+  a new year needs no change here
 - Calculates TotalPaid column
 - Groups by AgencyName, FiscalYear
 - Outputs to SQL DB (NYC_Payroll_Summary) AND Data Lake (dirstaging)
@@ -11,32 +13,29 @@ Creates Dataflow_Summary_Aggregate that:
 
 import os
 import sys
-from azure.identity import AzureCliCredential
-from azure.mgmt.datafactory import DataFactoryManagementClient
+
+import azure_session as session
 
 # Configuration
-SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
+SUBSCRIPTION_ID = session.get_subscription_id()
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
 
 print("=" * 80)
 print("STEP 5: Creating Aggregation Data Flow")
 print("=" * 80)
 print()
 
-# Authenticate
+# Authenticate (shared session: cached token and client)
 print("Authenticating...")
-credential = AzureCliCredential()
-adf_client = DataFactoryManagementClient(credential, SUBSCRIPTION_ID)
+adf_client = session.adf_client()
 print("Authenticated successfully")
 print()
 
 # Create aggregation data flow
 df_name = "Dataflow_Summary_Aggregate"
 print(f"Creating data flow: {df_name}")
-print("  - Source 1: 2020 Payroll (SQL)")
-print("  - Source 2: 2021 Payroll (SQL)")
-print("  - Union both sources")
+print("  - Source: NYC_Payroll_Data, all fiscal years (SQL)")
 print("  - Derived Column: TotalPaid = RegularGrossPaid + TotalOTPaid + TotalOtherPay")
 print("  - Aggregate: Group by AgencyName, FiscalYear → Sum TotalPaid")
 print("  - Sink 1: NYC_Payroll_Summary (SQL DB) - Truncate")
@@ -46,22 +45,14 @@ print()
 dataflow_resource = {
     "properties": {
         "type": "MappingDataFlow",
-        "description": "Aggregate payroll data from 2020 and 2021, calculate total compensation, and output to SQL DB and Data Lake",
+        "description": "Aggregate every fiscal year in NYC_Payroll_Data, calculate total compensation, and output to SQL DB and Data Lake",
         "typeProperties": {
             "sources": [
                 {
-                    "name": "source2020",
-                    "description": "2020 payroll data from SQL DB",
-                    "dataset": {
-                        "referenceName": "ds_NYC_Payroll_Data_2020",
-                        "type": "DatasetReference"
-                    }
-                },
-                {
-                    "name": "source2021",
-                    "description": "2021 payroll data from SQL DB",
+                    "name": "sourcePayroll",
+                    "description": "All payroll years from the FiscalYear-partitioned SQL DB table",
                     "dataset": {
-                        "referenceName": "ds_NYC_Payroll_Data_2021",
+                        "referenceName": "ds_NYC_Payroll_Data",
                         "type": "DatasetReference"
                     }
                 }
@@ -85,10 +76,6 @@ dataflow_resource = {
                 }
             ],
             "transformations": [
-                {
-                    "name": "union1",
-                    "description": "Combine 2020 and 2021 data"
-                },
                 {
                     "name": "derivedColumn1",
                     "description": "Calculate TotalPaid"
@@ -122,34 +109,8 @@ dataflow_resource = {
     allowSchemaDrift: true,
     validateSchema: false,
     isolationLevel: 'READ_UNCOMMITTED',
-    format: 'table') ~> source2020
-source(output(
-        FiscalYear as integer,
-        PayrollNumber as integer,
-        AgencyID as string,
-        AgencyName as string,
-        EmployeeID as string,
-        LastName as string,
-        FirstName as string,
-        AgencyStartDate as date,
-        WorkLocationBorough as string,
-        TitleCode as string,
-        TitleDescription as string,
-        LeaveStatusasofJune30 as string,
-        BaseSalary as double,
-        PayBasis as string,
-        RegularHours as double,
-        RegularGrossPaid as double,
-        OTHours as double,
-        TotalOTPaid as double,
-        TotalOtherPay as double
-    ),
-    allowSchemaDrift: true,
-    validateSchema: false,
-    isolationLevel: 'READ_UNCOMMITTED',
-    format: 'table') ~> source2021
-source2020, source2021 union(byName: true)~> union1
-union1 derive(TotalPaid = RegularGrossPaid + TotalOTPaid + TotalOtherPay) ~> derivedColumn1
+    format: 'table') ~> sourcePayroll
+sourcePayroll derive(TotalPaid = RegularGrossPaid + TotalOTPaid + TotalOtherPay) ~> derivedColumn1
 derivedColumn1 aggregate(groupBy(AgencyName, FiscalYear),
     TotalPaid = sum(TotalPaid)) ~> aggregate1
 aggregate1 sink(allowSchemaDrift: true,
@@ -186,8 +147,7 @@ try:
     print(f"SUCCESS: {df_name} created")
     print()
     print("Data flow includes:")
-    print("  ✓ 2 sources (2020 + 2021 payroll from SQL)")
-    print("  ✓ Union transformation")
+    print("  ✓ 1 source (NYC_Payroll_Data, every fiscal year)")
     print("  ✓ Derived column (TotalPaid calculation)")
     print("  ✓ Aggregate (group by AgencyName, FiscalYear)")
     print("  ✓ 2 sinks (SQL DB + Data Lake)")
@@ -202,4 +162,4 @@ print("STEP 5 COMPLETE!")
 print("=" * 80)
 print()
 print("Next: Verify in ADF Studio that Dataflow_Summary_Aggregate exists")
-print("      Check that it has 2 sources, transformations, and 2 sinks")
+print("      Check that it has 1 source, transformations, and 2 sinks")
@@ -4,17 +4,15 @@ Create dataset for Data Lake sink: ds_NYC_Payroll_Summary_DataLake
 Points to dirstaging container for CSV output
 """
 
-from azure.identity import AzureCliCredential
-from azure.mgmt.datafactory import DataFactoryManagementClient
+import azure_session as session
 
-SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
+SUBSCRIPTION_ID = session.get_subscription_id()
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
 
 print("Creating dataset: ds_NYC_Payroll_Summary_DataLake")
 
-credential = AzureCliCredential()
-adf_client = DataFactoryManagementClient(credential, SUBSCRIPTION_ID)
+adf_client = session.adf_client()
 
 dataset_resource = {
     "properties": {
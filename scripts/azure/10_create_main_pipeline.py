@@ -3,222 +3,100 @@
 Step 6: Create Main Pipeline
 
 Creates pipeline that orchestrates all data flows:
-1. Parallel: Load master data (Agency, Employee, Title)
-2. Sequential: Load 2020 payroll → Load 2021 payroll
-3. Final: Run aggregation (after all loads complete)
+1. ForEach over load_manifest.json (batchCount files at a time): master
+   files run df_Load_Generic with their file and table as dataset
+   parameters; payroll files (entries with fiscalYears) run
+   usp_Prepare_Payroll_Years → df_Load_Payroll_Year → usp_Switch_Payroll_Years
+   into the FiscalYear-partitioned NYC_Payroll_Data
+2. Final: Run aggregation over NYC_Payroll_Data (after the loads, since it
+   reads their tables)
+
+Adding a new year is a new line in load_manifest.json, then rerun this script;
+the aggregation picks the year up from NYC_Payroll_Data without changes.
+
+The activity dependencies are not hardcoded: pipeline_scheduler.py derives
+them from each activity's dataset reads and writes. Run
+`python pipeline_scheduler.py` first to see the simulated makespan.
+The loads run on the dedicated integration runtime created by
+01_create_infrastructure.py, so an activity that starts within its TTL
+reuses a warm cluster instead of cold-starting one. That runtime's size
+applies to them (ADF ignores activity-level compute there); compute_sizing.py
+sizes every activity from the lake files, and a load sized above the runtime
+is reported here. The aggregation runs on the runtime when its sizing fits,
+otherwise on AutoResolve with its own compute (never both).
 """
 
 import sys
-from azure.identity import AzureCliCredential
-from azure.mgmt.datafactory import DataFactoryManagementClient
+
+import azure_session as session
+from compute_sizing import compute_settings, size_manifest
+from pipeline_scheduler import (
+    FOREACH_ACTIVITY,
+    INTEGRATION_RUNTIME,
+    LOAD_DATAFLOW,
+    PIPELINE_NAME,
+    POST_LOAD_ACTIVITIES,
+    build_manifest_pipeline,
+    derive_manifest_dependencies,
+    load_manifest,
+    oversized,
+    placement,
+)
 
 # Configuration
-SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
-RESOURCE_GROUP = "ODL-DataEng-292169"
-DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
+SUBSCRIPTION_ID = session.get_subscription_id()
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
 
 print("=" * 80)
 print("STEP 6: Creating Main Pipeline")
 print("=" * 80)
 print()
 
-# Authenticate
+# Authenticate (shared session: cached token and client)
 print("Authenticating...")
-credential = AzureCliCredential()
-adf_client = DataFactoryManagementClient(credential, SUBSCRIPTION_ID)
+adf_client = session.adf_client()
 print("Authenticated successfully")
 print()
 
-pipeline_name = "pl_NYC_Payroll_Pipeline"
+pipeline_name = PIPELINE_NAME
 print(f"Creating pipeline: {pipeline_name}")
+print(f"Integration runtime: {INTEGRATION_RUNTIME}")
 print()
-print("Pipeline structure:")
-print("  1. Parallel execution:")
-print("     - df_Load_AgencyMaster")
-print("     - df_Load_EmpMaster")
-print("     - df_Load_TitleMaster")
-print("  2. Sequential execution (after master data):")
-print("     - df_Load_2020_Payroll")
-print("     - df_Load_2021_Payroll")
-print("  3. Final aggregation (after all loads):")
-print("     - Dataflow_Summary_Aggregate")
+
+# Loads to run, and dependencies derived from each activity's dataset reads/writes
+manifest = load_manifest()
+dependencies = derive_manifest_dependencies(manifest)
+activity_names = [FOREACH_ACTIVITY] + [name for name, _ in POST_LOAD_ACTIVITIES]
+print("Pipeline structure (derived from dataset reads/writes):")
+print(f"  - {FOREACH_ACTIVITY} ({LOAD_DATAFLOW} × {len(manifest['loads'])}, "
+      f"batchCount {manifest['batchCount']}): start immediately")
+for entry in manifest["loads"]:
+    years = ", ".join(map(str, entry.get("fiscalYears", [])))
+    year = f" (FiscalYear {years}, partition switch)" if years else ""
+    print(f"      {entry['fileSystem']}/{entry['fileName']} → {entry['tableName']}{year}")
+for name, dataflow in POST_LOAD_ACTIVITIES:
+    after = ", ".join(dependencies[name]) or "start immediately"
+    print(f"  - {name} ({dataflow}): {after}")
+print()
+
+# Compute per load and activity, sized from the source files in the lake
+sizing = size_manifest(manifest, source="lake")
+compute = compute_settings(sizing)
+print("Compute sizing:")
+for name, s in sizing.items():
+    print(f"  - {name}: {s['coreCount']} cores {s['computeType']} ({s['reason']})")
+for name, _ in POST_LOAD_ACTIVITIES:
+    _, runtime = placement(compute.get(name))
+    print(f"  ✓ {name} runs on {runtime or 'AutoResolve with its own compute'}")
+for name in oversized(manifest, compute):
+    print(f"  ✗ {name} is sized above {INTEGRATION_RUNTIME} ({session.DATAFLOW_COMPUTE['coreCount']} cores "
+          f"{session.DATAFLOW_COMPUTE['computeType']}), which all loads share; "
+          f"raise azure_session.DATAFLOW_COMPUTE")
 print()
 
 # Pipeline definition
-pipeline_resource = {
-    "properties": {
-        "activities": [
-            # Activity 1: Load Agency Master
-            {
-                "name": "Load_AgencyMaster",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "df_Load_AgencyMaster",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            },
-            # Activity 2: Load Employee Master
-            {
-                "name": "Load_EmpMaster",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "df_Load_EmpMaster",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            },
-            # Activity 3: Load Title Master
-            {
-                "name": "Load_TitleMaster",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "df_Load_TitleMaster",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            },
-            # Activity 4: Load 2020 Payroll (depends on all 3 master loads)
-            {
-                "name": "Load_2020_Payroll",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [
-                    {
-                        "activity": "Load_AgencyMaster",
-                        "dependencyConditions": ["Succeeded"]
-                    },
-                    {
-                        "activity": "Load_EmpMaster",
-                        "dependencyConditions": ["Succeeded"]
-                    },
-                    {
-                        "activity": "Load_TitleMaster",
-                        "dependencyConditions": ["Succeeded"]
-                    }
-                ],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "df_Load_2020_Payroll",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            },
-            # Activity 5: Load 2021 Payroll (depends on 2020 completion)
-            {
-                "name": "Load_2021_Payroll",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [
-                    {
-                        "activity": "Load_2020_Payroll",
-                        "dependencyConditions": ["Succeeded"]
-                    }
-                ],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "df_Load_2021_Payroll",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            },
-            # Activity 6: Aggregate (depends on 2021 completion)
-            {
-                "name": "Aggregate_Payroll_Summary",
-                "type": "ExecuteDataFlow",
-                "dependsOn": [
-                    {
-                        "activity": "Load_2021_Payroll",
-                        "dependencyConditions": ["Succeeded"]
-                    }
-                ],
-                "policy": {
-                    "timeout": "0.12:00:00",
-                    "retry": 0,
-                    "retryIntervalInSeconds": 30,
-                    "secureOutput": False,
-                    "secureInput": False
-                },
-                "typeProperties": {
-                    "dataFlow": {
-                        "referenceName": "Dataflow_Summary_Aggregate",
-                        "type": "DataFlowReference"
-                    },
-                    "compute": {
-                        "coreCount": 8,
-                        "computeType": "General"
-                    },
-                    "traceLevel": "Fine"
-                }
-            }
-        ],
-        "annotations": []
-    }
-}
+pipeline_resource = build_manifest_pipeline(manifest, dependencies, compute=compute)
 
 try:
     adf_client.pipelines.create_or_update(
@@ -229,13 +107,10 @@ try:
     )
     print(f"SUCCESS: {pipeline_name} created")
     print()
-    print("Pipeline includes 6 activities:")
-    print("  ✓ Load_AgencyMaster (parallel)")
-    print("  ✓ Load_EmpMaster (parallel)")
-    print("  ✓ Load_TitleMaster (parallel)")
-    print("  ✓ Load_2020_Payroll (after master data)")
-    print("  ✓ Load_2021_Payroll (after 2020)")
-    print("  ✓ Aggregate_Payroll_Summary (after all loads)")
+    print(f"Pipeline includes {len(activity_names)} activities:")
+    for name in activity_names:
+        after = f"after {', '.join(dependencies[name])}" if dependencies[name] else "parallel"
+        print(f"  ✓ {name} ({after})")
 except Exception as e:
     print(f"ERROR: {pipeline_name}")
     print(f"  {str(e)}")
@@ -249,6 +124,6 @@ print()
 print("Next Steps:")
 print("  1. Open ADF Studio → Author → Pipelines")
 print("  2. Open pl_NYC_Payroll_Pipeline")
-print("  3. Take screenshot showing all 6 activities")
+print("  3. Take screenshot showing the ForEach and aggregation activities")
 print("  4. Click 'Debug' to test run the pipeline")
-print("  5. Monitor execution in Monitor tab")
+print("  5. Monitor execution in Monitor tab (or: python pipeline_monitor.py)")
@@ -3,156 +3,203 @@
 Step 8: Verify Pipeline Results
 
 Queries SQL DB, checks Data Lake, and queries Synapse to verify data loaded correctly.
+
+The three checks run concurrently and are printed as one report at the end.
+Table row counts come from one sys.dm_db_partition_stats query (metadata
+only, no COUNT(*) scans of the fact tables). Connections come from
+sql_pool.py, which retries transient errors such as a serverless resume.
 """
 
-import pyodbc
-import pandas as pd
-from azure.storage.filedatalake import DataLakeServiceClient
-from azure.identity import AzureCliCredential
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import azure_session as session
+import sql_pool
+from reconcile_summary import SUMMARY_FILE_PREFIXES
 
 # Configuration
-SQL_SERVER = "sqlserver-nycpayroll-rodolfo-l.database.windows.net"
-SQL_DATABASE = "db_nycpayroll"
-SQL_USERNAME = "sqladmin"
-SQL_PASSWORD = "P@ssw0rd1234!"
-STORAGE_ACCOUNT = "adlsnycpayrollrodolfol"
+STORAGE_ACCOUNT = session.STORAGE_ACCOUNT
 CONTAINER = "dirstaging"
 
-print("=" * 80)
-print("STEP 8: Verifying Pipeline Results")
-print("=" * 80)
-print()
-
-# 1. Verify SQL Database
-print("1. Checking SQL Database: NYC_Payroll_Summary")
-print("-" * 80)
-
-try:
-    conn_str = f"DRIVER={{ODBC Driver 18 for SQL Server}};SERVER={SQL_SERVER};DATABASE={SQL_DATABASE};UID={SQL_USERNAME};PWD={SQL_PASSWORD};Encrypt=yes;TrustServerCertificate=no"
-    conn = pyodbc.connect(conn_str)
-    
-    # Query summary table
-    query = """
-    SELECT 
-        FiscalYear,
-        AgencyName,
-        TotalPaid
-    FROM NYC_Payroll_Summary
-    ORDER BY FiscalYear, TotalPaid DESC
+TABLES = [
+    'NYC_Payroll_AGENCY_MD',
+    'NYC_Payroll_EMP_MD',
+    'NYC_Payroll_TITLE_MD',
+    'NYC_Payroll_Data',
+    'NYC_Payroll_Summary'
+]
+
+# Heap (0) or clustered index (1) rows = table rows, read from metadata
+ROW_COUNT_QUERY = """
+SELECT t.name, SUM(ps.row_count)
+FROM sys.dm_db_partition_stats ps
+JOIN sys.tables t ON t.object_id = ps.object_id
+WHERE ps.index_id IN (0, 1) AND t.name IN ({names})
+GROUP BY t.name
+"""
+
+SUMMARY_YEARS_QUERY = """
+SELECT FiscalYear, COUNT(*), SUM(TotalPaid)
+FROM {table}
+GROUP BY FiscalYear
+ORDER BY FiscalYear
+"""
+
+SUMMARY_TOP_QUERY = """
+SELECT TOP 5
+    FiscalYear,
+    AgencyName,
+    TotalPaid
+FROM {table}
+ORDER BY TotalPaid DESC
+"""
+
+
+def table_row_counts(cursor, tables=TABLES):
+    """All row counts in one round-trip; tables that do not exist are reported as None"""
+    names = ", ".join(f"'{t}'" for t in tables)
+    cursor.execute(ROW_COUNT_QUERY.format(names=names))
+    counts = {name: int(count) for name, count in cursor.fetchall()}
+    return {table: counts.get(table) for table in tables}
+
+
+def summarize_summary_table(cursor, table):
+    """Per-year counts/totals and the top 5 rows, computed server-side"""
+    cursor.execute(SUMMARY_YEARS_QUERY.format(table=table))
+    years = [
+        (int(year) if year is not None else None, int(count), float(total) if total is not None else 0.0)
+        for year, count, total in cursor.fetchall()
+    ]
+    cursor.execute(SUMMARY_TOP_QUERY.format(table=table))
+    top = [tuple(row) for row in cursor.fetchall()]
+    return {"years": years, "records": sum(count for _, count, _ in years), "top": top}
+
+
+def check_sql():
+    """1. SQL Database: summary table + row counts for all tables"""
+    def read(conn):
+        cursor = conn.cursor()
+        return summarize_summary_table(cursor, "NYC_Payroll_Summary"), table_row_counts(cursor)
+
+    summary, counts = sql_pool.run("sql", read)
+
+    missing = [t for t, c in counts.items() if c is None]
+    return {
+        "ok": summary["records"] > 0 and not missing,
+        "summary": summary,
+        "row_counts": counts,
+        "problems": [f"table not found: {t}" for t in missing],
+    }
+
+
+def summary_files(files):
+    """
+    Summary CSVs among the listed paths
+
+    The data flow sink writes Spark part files (part-00000-....csv), or
+    NYC_Payroll_Summary.csv when a single output file is configured.
+    """
+    return [f for f in files if f.rsplit("/", 1)[-1].startswith(SUMMARY_FILE_PREFIXES) and f.endswith(".csv")]
+
+
+def check_lake():
+    """2. Data Lake: summary output in dirstaging"""
+    file_system_client = session.datalake_client(STORAGE_ACCOUNT).get_file_system_client(CONTAINER)
+    files = [path.name for path in file_system_client.get_paths() if not path.is_directory]
+    found = summary_files(files)
+    return {
+        "ok": bool(found),
+        "files": files,
+        "problems": [] if found else [f"no summary CSV (part-*.csv or NYC_Payroll_Summary.csv) in {CONTAINER}"],
+    }
+
+
+def check_synapse():
+    """3. Synapse: external table over dirstaging"""
+    summary = sql_pool.run("synapse", lambda conn: summarize_summary_table(conn.cursor(), "dbo.NYC_Payroll_Summary"))
+    return {"ok": summary["records"] > 0, "summary": summary, "problems": []}
+
+
+CHECKS = [
+    ("sql", "1. Checking SQL Database: NYC_Payroll_Summary", check_sql),
+    ("lake", "2. Checking Data Lake: dirstaging container", check_lake),
+    ("synapse", "3. Checking Synapse: External table", check_synapse),
+]
+
+
+def run_checks(checks=CHECKS):
+    """
+    Run every check on its own thread
+
+    Returns {name: result}; a check that raises is reported with ok=False
+    and the error, the others still complete.
     """
-    
-    df = pd.read_sql(query, conn)
-    
-    print(f"✓ Total records: {len(df)}")
-    print(f"✓ Fiscal years: {df['FiscalYear'].unique().tolist()}")
+    def run(check):
+        name, _, func = check
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            result = {"ok": False, "problems": [f"{name} error: {e}"]}
+        result["seconds"] = time.perf_counter() - start
+        return name, result
+
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        return dict(pool.map(run, checks))
+
+
+def print_summary(summary):
+    print(f"✓ Total records: {summary['records']}")
+    print(f"✓ Fiscal years: {[year for year, _, _ in summary['years']]}")
     print()
     print("Top 5 agencies by total paid:")
-    print(df.head(5).to_string(index=False))
-    print()
-    
-    # Also check row counts in all tables
-    tables = [
-        'NYC_Payroll_AGENCY_MD',
-        'NYC_Payroll_EMP_MD', 
-        'NYC_Payroll_TITLE_MD',
-        'NYC_Payroll_Data_2020',
-        'NYC_Payroll_Data_2021',
-        'NYC_Payroll_Summary'
-    ]
-    
-    print("Row counts for all tables:")
-    for table in tables:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"  {table}: {count:,} rows")
-    
-    conn.close()
-    print("✓ SQL Database verification complete")
-    
-except Exception as e:
-    print(f"✗ SQL Database error: {str(e)}")
-
-print()
-print()
-
-# 2. Verify Data Lake
-print("2. Checking Data Lake: dirstaging container")
-print("-" * 80)
-
-try:
-    credential = AzureCliCredential()
-    service_client = DataLakeServiceClient(
-        account_url=f"https://{STORAGE_ACCOUNT}.dfs.core.windows.net",
-        credential=credential
-    )
-    
-    file_system_client = service_client.get_file_system_client(CONTAINER)
-    paths = file_system_client.get_paths()
-    
-    files_found = []
-    for path in paths:
-        if not path.is_directory:
-            files_found.append(path.name)
-            print(f"✓ Found file: {path.name}")
-    
-    if "NYC_Payroll_Summary.csv" in files_found:
+    for year, agency, total in summary["top"]:
+        print(f"  {year}  {agency or '(blank)':<40} {total or 0:>18,.2f}")
+
+
+def print_report(report):
+    for name, title, _ in CHECKS:
+        result = report[name]
+        print(title)
+        print("-" * 80)
+        if "summary" in result:
+            print_summary(result["summary"])
+            print()
+        if "row_counts" in result:
+            print("Row counts for all tables:")
+            for table, count in result["row_counts"].items():
+                print(f"  {table}: {count:,} rows" if count is not None else f"  {table}: (missing)")
+        for path in result.get("files", []):
+            print(f"✓ Found file: {path}")
+        for problem in result["problems"]:
+            print(f"✗ {problem}")
+        status = "✓" if result["ok"] else "✗"
+        print(f"{status} {name} verification {'complete' if result['ok'] else 'FAILED'} ({result['seconds']:.1f}s)")
         print()
-        print("✓ NYC_Payroll_Summary.csv exists in dirstaging")
-    else:
         print()
-        print("✗ NYC_Payroll_Summary.csv NOT FOUND in dirstaging")
-    
-    print("✓ Data Lake verification complete")
-    
-except Exception as e:
-    print(f"✗ Data Lake error: {str(e)}")
-
-print()
-print()
-
-# 3. Verify Synapse
-print("3. Checking Synapse: External table")
-print("-" * 80)
-
-try:
-    # Synapse serverless connection
-    synapse_server = "synapse-nycpayroll-rodolfo-l-ondemand.sql.azuresynapse.net"
-    synapse_database = "udacity"
-    
-    conn_str = f"DRIVER={{ODBC Driver 18 for SQL Server}};SERVER={synapse_server};DATABASE={synapse_database};UID={SQL_USERNAME};PWD={SQL_PASSWORD};Encrypt=yes;TrustServerCertificate=no"
-    conn = pyodbc.connect(conn_str)
-    
-    query = """
-    SELECT 
-        FiscalYear,
-        AgencyName,
-        TotalPaid
-    FROM dbo.NYC_Payroll_Summary
-    ORDER BY FiscalYear, TotalPaid DESC
-    """
-    
-    df = pd.read_sql(query, conn)
-    
-    print(f"✓ Total records: {len(df)}")
-    print(f"✓ Fiscal years: {df['FiscalYear'].unique().tolist()}")
+
+
+def main():
+    print("=" * 80)
+    print("STEP 8: Verifying Pipeline Results")
+    print("=" * 80)
     print()
-    print("Top 5 agencies from Synapse:")
-    print(df.head(5).to_string(index=False))
-    
-    conn.close()
+
+    start = time.perf_counter()
+    report = run_checks()
+    print_report(report)
+
+    print("=" * 80)
+    passed = sum(1 for result in report.values() if result["ok"])
+    print(f"VERIFICATION COMPLETE! {passed}/{len(report)} checks passed in {time.perf_counter() - start:.1f}s")
+    print("=" * 80)
     print()
-    print("✓ Synapse external table verification complete")
-    
-except Exception as e:
-    print(f"✗ Synapse error: {str(e)}")
-
-print()
-print("=" * 80)
-print("VERIFICATION COMPLETE!")
-print("=" * 80)
-print()
-print("Screenshots needed:")
-print("  - step8_sqldb_summary_query.png (SQL query results)")
-print("  - step8_dirstaging_files.png (Data Lake files)")
-print("  - step8_synapse_query.png (Synapse query results)")
+    print("Screenshots needed:")
+    print("  - step8_sqldb_summary_query.png (SQL query results)")
+    print("  - step8_dirstaging_files.png (Data Lake files)")
+    print("  - step8_synapse_query.png (Synapse query results)")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,16 @@
 #!/usr/bin/env python3
 """
 Query Synapse using OPENROWSET to read partition files directly
-"""
 
-import pyodbc
-import pandas as pd
+Results go through openrowset_cache.py: a repeat run with unchanged lake
+files is answered locally without scanning (and paying for) the files again.
+"""
 
-SYNAPSE_SERVER = "synapse-nycpayroll-rodolfo-l-ondemand.sql.azuresynapse.net"
-DATABASE = "udacity"
-USERNAME = "sqladmin"
-PASSWORD = "P@ssw0rd1234!"
+import openrowset_cache
 
 print("Querying dirstaging partition files using OPENROWSET...")
 print()
 
-conn_str = f"DRIVER={{ODBC Driver 18 for SQL Server}};SERVER={SYNAPSE_SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD};Encrypt=yes;TrustServerCertificate=no"
-conn = pyodbc.connect(conn_str)
-
 # Query using OPENROWSET with full storage path
 query = """
 SELECT 
@@ -37,8 +31,9 @@ ORDER BY TotalPaid DESC
 """
 
 try:
-    df = pd.read_sql(query, conn)
+    df, hit = openrowset_cache.read_sql(query)
     
+    print(f"✓ {'Served from local cache (lake files unchanged)' if hit else 'Scanned by Synapse serverless'}")
     print(f"✓ Total records: {len(df)}")
     print(f"✓ Fiscal years: {sorted(df['FiscalYear'].unique().tolist())}")
     print()
@@ -50,7 +45,46 @@ try:
 except Exception as e:
     print(f"✗ Error: {str(e)}")
 
-conn.close()
+# Same totals straight from the Parquet landing zone (parquet_landing.py).
+# filepath(1) is the FiscalYear= folder, so the WHERE clause prunes every
+# other year's files, and the WITH clause reads only 4 of the 19 columns.
+parquet_query = """
+SELECT 
+    CAST(r.filepath(1) AS INT) AS FiscalYear,
+    AgencyName,
+    SUM(RegularGrossPaid + TotalOTPaid + TotalOtherPay) AS TotalPaid
+FROM OPENROWSET(
+    BULK 'https://adlsnycpayrollrodolfol.dfs.core.windows.net/dirpayrollfiles/payroll_parquet/FiscalYear=*/AgencyID=*/*.parquet',
+    FORMAT = 'PARQUET'
+) WITH (
+    AgencyName VARCHAR(200) COLLATE Latin1_General_100_CI_AS_SC_UTF8,
+    RegularGrossPaid FLOAT,
+    TotalOTPaid FLOAT,
+    TotalOtherPay FLOAT
+) AS r
+WHERE r.filepath(1) = '2021'
+GROUP BY r.filepath(1), AgencyName
+ORDER BY TotalPaid DESC
+"""
+
+print()
+print("Querying Parquet landing zone (FiscalYear=2021 partitions only)...")
+print()
+
+try:
+    df, hit = openrowset_cache.read_sql(parquet_query)
+    
+    print(f"✓ {'Served from local cache (lake files unchanged)' if hit else 'Scanned by Synapse serverless'}")
+    print(f"✓ Total records: {len(df)}")
+    print()
+    print("Top 10 agencies by total paid (2021, from Parquet):")
+    print(df.head(10).to_string(index=False))
+    print()
+    print("✓ Partition-pruned Parquet query successful")
+    
+except Exception as e:
+    print(f"✗ Parquet query error: {str(e)}")
+    print("  Run parquet_landing.py and 02_upload_data.py to build the landing zone")
 
 print()
 print("=" * 80)
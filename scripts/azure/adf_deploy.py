@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+ADF Deploy Engine: Dependency-aware parallel deployment of all artifacts
+
+Scripts 06, 07, 08, 09, 09a and 10 create linked services, datasets, data
+flows and the pipeline one call at a time, each blocking on an ARM round-trip.
+
+This engine:
+1. Reads artifact definitions from the JSON/ folder (ADF Git layout) or
+   from Python dicts passed in by a script
+2. Builds the reference graph from every {"referenceName", "type": "...Reference"}
+   (linked service → dataset → data flow → pipeline)
+3. Deploys level by level; all artifacts in one level go out concurrently
+   on a bounded thread pool
+
+WHY THIS MATTERS:
+A full redeploy of ~25 artifacts costs one or two round-trips per level
+instead of one round-trip per artifact. If an artifact fails, everything
+that references it is skipped instead of failing with a confusing error.
+
+Content-hash diff:
+Every artifact is hashed from its normalized JSON (sorted keys, empty
+values dropped). Only artifacts whose hash differs from the last deployed
+hash (local manifest) or from the live factory definition (one list call
+per artifact type) are pushed, so a deploy that changes one data flow
+pays for that one call.
+
+Usage:
+    python adf_deploy.py --dry-run       # show the deployment levels only
+    python adf_deploy.py --dry-run --diff live   # plan against the factory (read-only)
+    python adf_deploy.py                 # deploy what changed under JSON/
+    python adf_deploy.py --diff live     # diff against the factory itself
+    python adf_deploy.py --force         # deploy everything
+    python adf_deploy.py --only Dataflow_Summary_Aggregate pl_NYC_Payroll_Pipeline
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import azure_session as session
+
+# Configuration
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+JSON_PATH = os.path.join(PROJECT_ROOT, "JSON")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".adf_deploy_manifest.json")
+
+MAX_WORKERS = 8
+
+# JSON/ sub-folder -> artifact kind
+KIND_FOLDERS = {
+    "linkedService": "linkedService",
+    "dataset": "dataset",
+    "dataflow": "dataflow",
+    "pipeline": "pipeline",
+}
+
+# Reference type -> artifact kind it points to
+REFERENCE_KINDS = {
+    "LinkedServiceReference": "linkedService",
+    "DatasetReference": "dataset",
+    "DataFlowReference": "dataflow",
+    "PipelineReference": "pipeline",
+}
+
+# Artifact kind -> DataFactoryManagementClient operations attribute
+CLIENT_OPERATIONS = {
+    "linkedService": "linked_services",
+    "dataset": "datasets",
+    "dataflow": "data_flows",
+    "pipeline": "pipelines",
+}
+
+
+class Artifact:
+    """One ADF artifact: kind, name and its properties body"""
+
+    def __init__(self, kind, name, properties):
+        self.kind = kind
+        self.name = name
+        self.properties = properties
+
+    @property
+    def key(self):
+        return (self.kind, self.name)
+
+    def resource(self):
+        """Body accepted by <operations>.create_or_update"""
+        return {"properties": self.properties}
+
+    def content_hash(self):
+        return content_hash(self.properties)
+
+    def references(self):
+        """(kind, name) of every artifact this one references"""
+        found = set()
+
+        def walk(node):
+            if isinstance(node, dict):
+                kind = REFERENCE_KINDS.get(node.get("type"))
+                if kind and "referenceName" in node:
+                    found.add((kind, node["referenceName"]))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(self.properties)
+        found.discard(self.key)
+        return found
+
+    def __repr__(self):
+        return f"{self.kind}:{self.name}"
+
+
+def normalize(node):
+    """
+    Drop values that ADF treats as absent (None, empty lists/dicts)
+
+    ADF Studio exports "annotations": [] and "userProperties": [] while the
+    scripts omit them; without this every artifact would look changed.
+    """
+    if isinstance(node, dict):
+        cleaned = {key: normalize(value) for key, value in node.items()}
+        return {key: value for key, value in cleaned.items() if value not in (None, [], {})}
+    if isinstance(node, list):
+        return [normalize(value) for value in node]
+    return node
+
+
+def content_hash(properties):
+    """SHA-256 of the normalized, key-sorted JSON of an artifact's properties"""
+    canonical = json.dumps(normalize(properties), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_json_artifacts(json_path=JSON_PATH):
+    """Read every artifact definition from the JSON/ folder"""
+    artifacts = []
+    for folder, kind in KIND_FOLDERS.items():
+        for path in sorted(glob.glob(os.path.join(json_path, folder, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                definition = json.load(f)
+            artifacts.append(Artifact(kind, definition["name"], definition["properties"]))
+    return artifacts
+
+
+def artifacts_from_dicts(kind, resources):
+    """
+    Wrap Python dict definitions (as built in scripts 06-10)
+
+    resources: {name: {"properties": {...}}}
+    """
+    return [Artifact(kind, name, body["properties"]) for name, body in resources.items()]
+
+
+def build_levels(artifacts):
+    """
+    Group artifacts into deployment levels
+
+    Level 0 has no references inside the set, level N only references
+    levels < N. References to artifacts outside the set (already deployed)
+    do not create edges. Raises ValueError on reference cycles.
+    """
+    by_key = {a.key: a for a in artifacts}
+    depends = {a.key: {r for r in a.references() if r in by_key} for a in artifacts}
+
+    levels = []
+    placed = set()
+    while len(placed) < len(by_key):
+        ready = sorted(k for k, deps in depends.items() if k not in placed and deps <= placed)
+        if not ready:
+            cycle = sorted(k for k in by_key if k not in placed)
+            raise ValueError(f"Reference cycle between: {cycle}")
+        levels.append([by_key[k] for k in ready])
+        placed.update(ready)
+    return levels
+
+
+def select_with_dependencies(artifacts, names):
+    """Restrict to the named artifacts plus everything they reference"""
+    by_name = {}
+    for artifact in artifacts:
+        by_name.setdefault(artifact.name, []).append(artifact)
+    by_key = {a.key: a for a in artifacts}
+
+    selected = {}
+    stack = [a for name in names for a in by_name.get(name, [])]
+    while stack:
+        artifact = stack.pop()
+        if artifact.key in selected:
+            continue
+        selected[artifact.key] = artifact
+        stack.extend(by_key[r] for r in artifact.references() if r in by_key)
+    return list(selected.values())
+
+
+def manifest_key(artifact):
+    return f"{artifact.kind}/{artifact.name}"
+
+
+def read_manifest(path=MANIFEST_PATH, factory=DATA_FACTORY):
+    """Last deployed hashes for one factory: {"kind/name": sha256}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get(factory, {})
+
+
+def write_manifest(hashes, path=MANIFEST_PATH, factory=DATA_FACTORY):
+    manifest = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    manifest[factory] = dict(sorted(hashes.items()))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def fetch_live_hashes(adf_client, kinds, resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    """
+    Hash the live factory definitions with one list call per artifact type
+
+    The list calls run concurrently; paging is handled by the SDK iterator.
+    """
+    def list_kind(kind):
+        operations = getattr(adf_client, CLIENT_OPERATIONS[kind])
+        hashes = {}
+        for resource in operations.list_by_factory(resource_group, factory):
+            properties = resource.serialize()["properties"]
+            hashes[f"{kind}/{resource.name}"] = content_hash(properties)
+        return hashes
+
+    live = {}
+    with ThreadPoolExecutor(max_workers=len(kinds) or 1) as pool:
+        for hashes in pool.map(list_kind, sorted(kinds)):
+            live.update(hashes)
+    return live
+
+
+def changed_artifacts(artifacts, deployed_hashes):
+    """Artifacts whose content hash differs from (or is missing in) deployed_hashes"""
+    return [a for a in artifacts if deployed_hashes.get(manifest_key(a)) != a.content_hash()]
+
+
+def deploy_artifact(adf_client, artifact, resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    operations = getattr(adf_client, CLIENT_OPERATIONS[artifact.kind])
+    operations.create_or_update(resource_group, factory, artifact.name, artifact.resource())
+
+
+def deploy_levels(adf_client, levels, max_workers=MAX_WORKERS,
+                  resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    """
+    Deploy each level concurrently, one level after another
+
+    Returns {artifact_key: "deployed" | "failed: <error>" | "skipped: <dependency>"}.
+    """
+    results = {}
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for number, level in enumerate(levels):
+            print(f"Level {number}: {len(level)} artifacts")
+            runnable = []
+            for artifact in level:
+                blocked = sorted(r for r in artifact.references() if r in failed)
+                if blocked:
+                    results[artifact.key] = f"skipped: {blocked[0][1]} failed"
+                    failed.add(artifact.key)
+                    print(f"  SKIPPED: {artifact} (depends on {blocked[0][1]})")
+                else:
+                    runnable.append(artifact)
+
+            futures = {
+                artifact.key: pool.submit(deploy_artifact, adf_client, artifact, resource_group, factory)
+                for artifact in runnable
+            }
+            for artifact in runnable:
+                try:
+                    futures[artifact.key].result()
+                    results[artifact.key] = "deployed"
+                    print(f"  SUCCESS: {artifact}")
+                except Exception as e:
+                    results[artifact.key] = f"failed: {e}"
+                    failed.add(artifact.key)
+                    print(f"  ERROR: {artifact}")
+                    print(f"  {str(e)}")
+    return results
+
+
+def deployed_hashes(adf_client, artifacts, diff="manifest", resource_group=RESOURCE_GROUP,
+                    factory=DATA_FACTORY, manifest_path=MANIFEST_PATH):
+    """Hashes to diff against: the manifest, the live factory (read-only list calls) or none"""
+    if diff == "live":
+        return fetch_live_hashes(adf_client, {a.kind for a in artifacts}, resource_group, factory)
+    if diff == "manifest":
+        return read_manifest(manifest_path, factory)
+    return {}
+
+
+def deploy_changed(adf_client, artifacts, diff="manifest", max_workers=MAX_WORKERS,
+                   resource_group=RESOURCE_GROUP, factory=DATA_FACTORY, manifest_path=MANIFEST_PATH):
+    """
+    Deploy only the artifacts that differ, then record their hashes
+
+    diff: "manifest" (last deployed hashes), "live" (factory definitions)
+    or "none" (deploy everything). Returns the deploy_levels results.
+    """
+    manifest = read_manifest(manifest_path, factory)
+    deployed = deployed_hashes(adf_client, artifacts, diff, resource_group, factory, manifest_path)
+    changed = changed_artifacts(artifacts, deployed)
+    print(f"{len(changed)}/{len(artifacts)} artifacts changed ({diff} diff)")
+    if not changed:
+        return {}
+
+    results = deploy_levels(adf_client, build_levels(changed), max_workers, resource_group, factory)
+
+    by_key = {a.key: a for a in changed}
+    for key, status in results.items():
+        if status == "deployed":
+            manifest[manifest_key(by_key[key])] = by_key[key].content_hash()
+    write_manifest(manifest, manifest_path, factory)
+    return results
+
+
+def print_plan(levels):
+    for number, level in enumerate(levels):
+        print(f"Level {number}:")
+        for artifact in level:
+            deps = ", ".join(sorted(name for _, name in artifact.references())) or "-"
+            print(f"  {str(artifact):<45} refs: {deps}")
+
+
+def main():
+    """Deploy the JSON/ artifacts level by level"""
+    parser = argparse.ArgumentParser(description="Parallel dependency-aware ADF deployment")
+    parser.add_argument("--json-path", default=JSON_PATH)
+    parser.add_argument("--only", nargs="+", help="Deploy these artifacts (plus what they reference)")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--diff", choices=["manifest", "live"], default="manifest",
+                        help="Compare against the local manifest or the live factory")
+    parser.add_argument("--force", action="store_true", help="Deploy everything, ignoring hashes")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without deploying")
+    args = parser.parse_args()
+
+    artifacts = load_json_artifacts(args.json_path)
+    if args.only:
+        artifacts = select_with_dependencies(artifacts, args.only)
+    adf_client = None
+    if args.dry_run and not args.force:
+        if args.diff == "live":
+            print("Authenticating (read-only, to list the live definitions)...")
+            adf_client = session.adf_client()
+        artifacts = changed_artifacts(artifacts, deployed_hashes(adf_client, artifacts, args.diff))
+    levels = build_levels(artifacts)
+
+    print("=" * 80)
+    print(f"ADF DEPLOY: {len(artifacts)} artifacts in {len(levels)} levels → {DATA_FACTORY}")
+    print("=" * 80)
+    print()
+    print_plan(levels)
+    print()
+
+    if args.dry_run:
+        return
+
+    print("Authenticating...")
+    adf_client = session.adf_client()
+    print("Authenticated successfully")
+    print()
+
+    start = time.perf_counter()
+    diff = "none" if args.force else args.diff
+    results = deploy_changed(adf_client, artifacts, diff, args.max_workers)
+    elapsed = time.perf_counter() - start
+
+    deployed = sum(1 for status in results.values() if status == "deployed")
+    print()
+    print("=" * 80)
+    print(f"DEPLOY COMPLETE: {deployed}/{len(results)} artifacts in {elapsed:.1f}s")
+    print("=" * 80)
+    if deployed < len(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
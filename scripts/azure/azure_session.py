@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Shared Azure Session: One place for configuration, auth and clients
+
+Every script used to build its own AzureCliCredential() and
+DataFactoryManagementClient, and 06_create_linked_services.py shelled out to
+`az account show` and `az storage account keys list` at import time. Each of
+those is a multi-second Python/CLI start-up.
+
+This module:
+- Holds the shared configuration (subscription, resource group, resource names)
+- Resolves the subscription once (env var → configured value → az CLI)
+- Caches access tokens per scope until shortly before they expire (in
+  memory), so every client and thread in a script shares one token
+- Lazily creates and reuses the ADF, Storage and Data Lake clients
+- Builds the ODBC connection strings for SQL Database and Synapse serverless
+
+WHY THIS MATTERS:
+A script pays the CLI auth cost once instead of once per client or call.
+
+Usage (from any script in this folder):
+    import azure_session as session
+    adf_client = session.adf_client()
+    conn_str = session.sql_connection_string("synapse")
+"""
+
+import os
+import subprocess
+import threading
+import time
+
+# Configuration - Udacity Lab Environment (names match 01_create_infrastructure.py)
+SUBSCRIPTION_ID = "64e0993d-9026-4add-b0f9-284be5c9fcf3"
+RESOURCE_GROUP = "ODL-DataEng-292169"
+LOCATION = "westeurope"
+
+STORAGE_ACCOUNT = "adlsnycpayrollrodolfol"
+DATA_FACTORY = "adf-nycpayroll-rodolfo-l"
+SQL_SERVER = "sqlserver-nycpayroll-rodolfo-l"
+SQL_DATABASE = "db_nycpayroll"
+SQL_USERNAME = "sqladmin"
+SQL_PASSWORD = "P@ssw0rd1234!"
+SYNAPSE_WORKSPACE = "synapse-nycpayroll-rodolfo-l"
+SYNAPSE_DATABASE = "udacity"
+
+# Data flow integration runtime (warm clusters kept for DATAFLOW_TTL_MINUTES)
+INTEGRATION_RUNTIME = "ir-nycpayroll-dataflow"
+DATAFLOW_TTL_MINUTES = 10
+# Cluster size of that runtime: activities on it ignore their own compute
+DATAFLOW_COMPUTE = {"coreCount": 8, "computeType": "General"}
+
+ODBC_DRIVER = "ODBC Driver 18 for SQL Server"
+
+# Refresh tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+_lock = threading.Lock()  # guards _key_locks only
+_key_locks = {}
+_clients = {}
+
+
+class CachedCredential:
+    """
+    TokenCredential wrapper with expiry-aware caching
+
+    Tokens are cached per scope set, in memory for the life of the process
+    (never written to disk). A cached token is reused until
+    TOKEN_REFRESH_MARGIN seconds before its expiry, then the inner
+    credential is asked for a fresh one.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.tokens = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes, **kwargs):
+        from azure.core.credentials import AccessToken
+
+        key = " ".join(sorted(scopes))
+        if kwargs.get("claims") or kwargs.get("tenant_id"):
+            return self.inner.get_token(*scopes, **kwargs)
+
+        with self._lock:
+            cached = self.tokens.get(key)
+            if cached and cached[1] - TOKEN_REFRESH_MARGIN > time.time():
+                return AccessToken(cached[0], cached[1])
+
+            token = self.inner.get_token(*scopes, **kwargs)
+            self.tokens[key] = (token.token, token.expires_on)
+            return token
+
+    def close(self):
+        if hasattr(self.inner, "close"):
+            self.inner.close()
+
+
+def _cached(name, factory):
+    """
+    Create a client once per process and reuse it afterwards
+
+    Each name has its own lock, so a slow factory (a network lookup) only
+    blocks callers waiting for that same object.
+    """
+    if name in _clients:
+        return _clients[name]
+    with _lock:
+        key_lock = _key_locks.setdefault(name, threading.Lock())
+    with key_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def get_subscription_id():
+    """
+    Resolve the subscription once per process
+
+    AZURE_SUBSCRIPTION_ID overrides the configured value; if neither is set,
+    `az account show` is called a single time.
+    """
+    def resolve():
+        configured = os.environ.get("AZURE_SUBSCRIPTION_ID") or SUBSCRIPTION_ID
+        if configured:
+            return configured
+        result = subprocess.run(
+            "az account show --query id -o tsv",
+            shell=True, check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+
+    return _cached("subscription_id", resolve)
+
+
+def credential():
+    """Shared AzureCliCredential behind the token cache"""
+    def create():
+        from azure.identity import AzureCliCredential
+        return CachedCredential(AzureCliCredential())
+
+    return _cached("credential", create)
+
+
+def adf_client():
+    """DataFactoryManagementClient for the project subscription"""
+    def create():
+        from azure.mgmt.datafactory import DataFactoryManagementClient
+        return DataFactoryManagementClient(credential(), get_subscription_id())
+
+    return _cached("adf", create)
+
+
+def storage_mgmt_client():
+    """StorageManagementClient (account keys, account properties)"""
+    def create():
+        from azure.mgmt.storage import StorageManagementClient
+        return StorageManagementClient(credential(), get_subscription_id())
+
+    return _cached("storage_mgmt", create)
+
+
+def storage_account_key(account=STORAGE_ACCOUNT):
+    """First access key of a storage account (looked up once)"""
+    def lookup():
+        keys = storage_mgmt_client().storage_accounts.list_keys(RESOURCE_GROUP, account)
+        return keys.keys[0].value
+
+    return _cached(f"storage_key:{account}", lookup)
+
+
+def datalake_client(account=STORAGE_ACCOUNT):
+    """DataLakeServiceClient (dfs endpoint) using the shared credential"""
+    def create():
+        from azure.storage.filedatalake import DataLakeServiceClient
+        return DataLakeServiceClient(
+            account_url=f"https://{account}.dfs.core.windows.net",
+            credential=credential()
+        )
+
+    return _cached(f"datalake:{account}", create)
+
+
+def blob_service_client(account=STORAGE_ACCOUNT):
+    """BlobServiceClient (blob endpoint) using the shared credential"""
+    def create():
+        from azure.storage.blob import BlobServiceClient
+        return BlobServiceClient(
+            account_url=f"https://{account}.blob.core.windows.net",
+            credential=credential()
+        )
+
+    return _cached(f"blob:{account}", create)
+
+
+def sql_server_host(target="sql"):
+    """Fully qualified host name for "sql" (SQL Database) or "synapse" (serverless)"""
+    if target == "synapse":
+        return f"{SYNAPSE_WORKSPACE}-ondemand.sql.azuresynapse.net"
+    return f"{SQL_SERVER}.database.windows.net"
+
+
+def sql_connection_string(target="sql"):
+    """ODBC connection string for "sql" (db_nycpayroll) or "synapse" (udacity)"""
+    database = SYNAPSE_DATABASE if target == "synapse" else SQL_DATABASE
+    return (
+        f"DRIVER={{{ODBC_DRIVER}}};SERVER={sql_server_host(target)};DATABASE={database};"
+        f"UID={SQL_USERNAME};PWD={SQL_PASSWORD};Encrypt=yes;TrustServerCertificate=no"
+    )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Schema Benchmark: Heap profile vs indexed/columnstore profile
+
+Runs the SQL Database section of scripts/sql/03_verification_queries.sql
+against both physical designs of the same tables:
+- heap:    01_create_sqldb_tables.sql and 07_create_partitioned_payroll.sql
+           as is (no keys, no indexes)
+- indexed: + 06_create_sqldb_indexes.sql (clustered master-table keys,
+           clustered columnstore on NYC_Payroll_Data and its staging table,
+           or clustered rowstore on tiers without columnstore, covering
+           summary index)
+
+The payroll indexes are aligned to ps_FiscalYear and are always created or
+dropped together, so partition switches keep working in either profile.
+
+The tables are not reloaded between profiles: the heap profile drops every
+index that 06 creates, the indexed profile runs 06. Each query runs once to
+warm the cache, then --repeat times; the report shows the median elapsed
+time and the logical reads from SET STATISTICS IO.
+
+Run after the tables are loaded (e.g. bulk_loader.py --backend azure and the
+summary pipeline).
+
+Usage:
+    python benchmark_schema.py
+    python benchmark_schema.py --repeat 10 --profiles indexed
+"""
+
+import argparse
+import os
+import re
+import statistics
+import time
+
+import sql_pool
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+SQL_DIR = os.path.join(PROJECT_ROOT, "scripts", "sql")
+QUERIES_SCRIPT = os.path.join(SQL_DIR, "03_verification_queries.sql")
+INDEX_SCRIPT = os.path.join(SQL_DIR, "06_create_sqldb_indexes.sql")
+
+PROFILES = ["heap", "indexed"]
+REPEAT = 5
+
+GO_PATTERN = re.compile(r"^\s*GO\s*$", re.MULTILINE | re.IGNORECASE)
+INDEX_PATTERN = re.compile(r"CREATE (?:NON)?CLUSTERED (?:COLUMNSTORE )?INDEX \[(\w+)\]\s+ON \[dbo\]\.\[(\w+)\]")
+LOGICAL_READS_PATTERN = re.compile(r"logical reads (\d+)")
+SYNAPSE_SECTION = "Synapse Analytics Verification Queries"
+
+
+def split_batches(script):
+    """Split a script on GO lines; returns non-empty batches"""
+    return [batch.strip() for batch in GO_PATTERN.split(script) if batch.strip()]
+
+
+def load_benchmark_queries(path=QUERIES_SCRIPT):
+    """
+    [(label, sql)] for the SQL Database section of 03_verification_queries.sql
+
+    The label is the last -- comment above each statement.
+    """
+    with open(path, encoding="utf-8") as f:
+        script = f.read().split(SYNAPSE_SECTION)[0]
+
+    queries = []
+    for batch in split_batches(script):
+        comments = [line[2:].strip() for line in batch.splitlines() if line.startswith("--")]
+        sql = "\n".join(line for line in batch.splitlines() if not line.startswith("--")).strip()
+        if sql:
+            label = next((c for c in reversed(comments) if c and not c.startswith("-")), sql[:40])
+            queries.append((label, sql.rstrip(";")))
+    return queries
+
+
+def index_statements(path=INDEX_SCRIPT):
+    with open(path, encoding="utf-8") as f:
+        script = f.read()
+    return split_batches(script), INDEX_PATTERN.findall(script)
+
+
+def drain(cursor):
+    """
+    Read every result set of the last statement; returns (rows, messages)
+
+    SQL Server sends the STATISTICS IO / PRINT messages with the result set
+    they follow, so cursor.messages is only complete after nextset().
+    """
+    rows, messages = 0, []
+    while True:
+        if cursor.description is not None:
+            rows += len(cursor.fetchall())
+        messages.extend(str(m) for m in getattr(cursor, "messages", None) or [])
+        if not cursor.nextset():
+            return rows, messages
+
+
+def apply_profile(conn, profile):
+    """Switch the physical design in place"""
+    statements, indexes = index_statements()
+    cursor = conn.cursor()
+    if profile == "indexed":
+        for sql in statements:
+            sql = "\n".join(line for line in sql.splitlines() if not line.startswith("--")).strip()
+            if not sql:
+                continue
+            try:
+                cursor.execute(sql)
+                for message in drain(cursor)[1]:
+                    print(f"  {message}")
+            except Exception as e:
+                match = INDEX_PATTERN.search(sql)
+                print(f"  ✗ {match.group(1) if match else sql[:60]}: {e}")
+    else:
+        # Nonclustered before clustered, so dropping the clustered index does not rebuild them
+        for name, table in sorted(indexes, key=lambda i: not i[0].startswith("IX_")):
+            cursor.execute(f"DROP INDEX IF EXISTS [{name}] ON [dbo].[{table}]")
+
+
+def run_query(cursor, sql):
+    """Execute one query; returns (seconds, rows, logical reads or None)"""
+    start = time.perf_counter()
+    cursor.execute(sql)
+    rows, messages = drain(cursor)
+    elapsed = time.perf_counter() - start
+    reads = [int(n) for n in LOGICAL_READS_PATTERN.findall(" ".join(messages))]
+    return elapsed, rows, sum(reads) if reads else None
+
+
+def benchmark_profile(conn, queries, repeat=REPEAT):
+    """{label: {"median_ms", "rows", "logical_reads"}} for the current profile"""
+    cursor = conn.cursor()
+    cursor.execute("SET STATISTICS IO ON")
+    results = {}
+    for label, sql in queries:
+        run_query(cursor, sql)
+        timings, reads, rows = [], None, 0
+        for _ in range(repeat):
+            elapsed, rows, reads = run_query(cursor, sql)
+            timings.append(elapsed)
+        results[label] = {
+            "median_ms": statistics.median(timings) * 1000,
+            "rows": rows,
+            "logical_reads": reads,
+        }
+    cursor.execute("SET STATISTICS IO OFF")
+    return results
+
+
+def print_report(results, queries):
+    profiles = list(results)
+    header = f"{'Query':<42}" + "".join(f"{p + ' ms':>12}{p + ' reads':>14}" for p in profiles)
+    print(header)
+    print("-" * len(header))
+    for label, _ in queries:
+        line = f"{label[:41]:<42}"
+        for profile in profiles:
+            r = results[profile][label]
+            reads = "n/a" if r["logical_reads"] is None else f"{r['logical_reads']:,}"
+            line += f"{r['median_ms']:>12.1f}{reads:>14}"
+        print(line)
+
+
+def main():
+    """Benchmark 03_verification_queries.sql on both schema profiles"""
+    parser = argparse.ArgumentParser(description="Compare heap vs indexed/columnstore schema profiles")
+    parser.add_argument("--profiles", nargs="+", default=PROFILES, choices=PROFILES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    queries = load_benchmark_queries()
+
+    print("=" * 80)
+    print(f"SCHEMA BENCHMARK: {len(queries)} queries × {args.repeat} runs, profiles: {', '.join(args.profiles)}")
+    print("=" * 80)
+    print()
+
+    results = {}
+    with sql_pool.connection("sql") as conn:
+        for profile in args.profiles:
+            print(f"Applying profile: {profile}")
+            apply_profile(conn, profile)
+            results[profile] = benchmark_profile(conn, queries, args.repeat)
+    print()
+    print_report(results, queries)
+
+
+if __name__ == "__main__":
+    main()
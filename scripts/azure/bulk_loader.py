@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader: Stream CSV files into the SQL Database tables
+
+Replaces the load data flows created by 08_create_pipelines.py
+(df_Load_AgencyMaster, df_Load_EmpMaster, df_Load_TitleMaster and the
+payroll loads). Each of those starts a Spark cluster just to copy one CSV
+into one table.
+
+This loader does the same work directly:
+- Recreates each master table from scripts/sql/01_create_sqldb_tables.sql
+- Streams the CSV in fixed-size batches (never the whole file in memory)
+- Inserts each batch with one parameterized executemany call
+  (pyodbc fast_executemany sends the batch as a single bulk parameter array)
+- Reports rows/sec per table
+- Loads every nycpayroll_*.csv into the FiscalYear-partitioned
+  NYC_Payroll_Data through partitioned_load.py (stage, then switch)
+
+Backends:
+- sqlite: Local stand-in database for development (default)
+- azure:  Azure SQL Database via pyodbc + ODBC Driver 18
+
+Usage:
+    python bulk_loader.py                          # masters + payroll into SQLite
+    python bulk_loader.py --backend azure          # masters + payroll into Azure SQL
+    python bulk_loader.py --tables NYC_Payroll_Data
+    python bulk_loader.py --layout normalized      # integer-keyed fact + dimensions
+    python bulk_loader.py --data-path ../../data/synthetic  # generate_payroll.py output
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import azure_session as session
+from schema_registry import canonical_header, canonical_name
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+DDL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "01_create_sqldb_tables.sql")
+SQLITE_PATH = os.path.join(DATA_PATH, "nycpayroll_local.db")
+
+BATCH_ROWS = 10_000
+
+# Same source -> sink pairs as the master data flows in 08_create_pipelines.py
+LOAD_CONFIGS = [
+    ("AgencyMaster.csv", "NYC_Payroll_AGENCY_MD"),
+    ("EmpMaster.csv", "NYC_Payroll_EMP_MD"),
+    ("TitleMaster.csv", "NYC_Payroll_TITLE_MD"),
+]
+# Every payroll file, all years in one table (partitioned_load.py)
+PAYROLL_TABLE = "NYC_Payroll_Data"
+
+CREATE_TABLE_PATTERN = re.compile(
+    r"CREATE TABLE \[dbo\]\.\[(\w+)\]\((.*?)\n\)(?: ON [^;]+)?;", re.DOTALL
+)
+COLUMN_PATTERN = re.compile(r"\[(\w+)\]\s+\[(\w+)\](?:\((\d+)\))?")
+
+SQLITE_TYPES = {
+    "smallint": "INTEGER",
+    "int": "INTEGER",
+    "bigint": "INTEGER",
+    "float": "REAL",
+    "varchar": "TEXT",
+    "date": "TEXT",
+}
+
+
+def load_table_definitions(ddl_path=DDL_SCRIPT):
+    """
+    Parse CREATE TABLE statements from the SQL script
+
+    Returns {table: {"ddl": str, "columns": [(name, sql_type), ...]}}
+    so the loader always matches the schema the project actually deploys.
+    """
+    with open(ddl_path, encoding="utf-8") as f:
+        script = f.read()
+
+    tables = {}
+    for match in CREATE_TABLE_PATTERN.finditer(script):
+        table, body = match.group(1), match.group(2)
+        columns = [(name, sql_type.lower()) for name, sql_type, _ in COLUMN_PATTERN.findall(body)]
+        tables[table] = {"ddl": match.group(0).rstrip(";"), "columns": columns}
+    return tables
+
+
+def parse_date(value):
+    """CSV dates are M/D/YYYY; SQL date columns take ISO YYYY-MM-DD"""
+    return datetime.strptime(value, "%m/%d/%Y").date().isoformat()
+
+
+CONVERTERS = {
+    "smallint": int,
+    "int": int,
+    "bigint": int,
+    "float": float,
+    "varchar": str,
+    "date": parse_date,
+}
+
+
+def make_row_converter(header, columns):
+    """
+    Build a function that turns one CSV record into a typed parameter tuple
+
+    Columns are matched by name (like the data flow sink auto-mapping).
+    Both the CSV header and the table columns are resolved through
+    schema_registry, so AgencyCode and AgencyID match each other.
+    Table columns missing from the CSV are loaded as NULL; empty strings
+    are NULL as well.
+    """
+    positions = {name: i for i, name in enumerate(canonical_header(header))}
+    plan = [(positions.get(canonical_name(name)), CONVERTERS[sql_type]) for name, sql_type in columns]
+
+    def convert(record):
+        values = []
+        for i, converter in plan:
+            value = record[i] if i is not None else ""
+            values.append(converter(value) if value != "" else None)
+        return tuple(values)
+
+    return convert
+
+
+class SqliteBackend:
+    """Local stand-in for Azure SQL Database"""
+
+    name = "sqlite"
+    placeholder = "?"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+
+    def table_exists(self, table):
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        return row is not None
+
+    def create_table(self, table, definition):
+        columns = ", ".join(
+            f'"{name}" {SQLITE_TYPES[sql_type]}' for name, sql_type in definition["columns"]
+        )
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+
+    def recreate_table(self, table, definition):
+        self.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self.create_table(table, definition)
+
+    def execute(self, sql, params=()):
+        self.conn.execute(sql, params)
+
+    def fetchall(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def insert_batch(self, sql, rows):
+        self.conn.executemany(sql, rows)
+
+    def execute_many(self, sql, params):
+        """Run one statement per parameter tuple (e.g. a DELETE per key)"""
+        self.conn.executemany(sql, params)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class AzureSqlBackend:
+    """Azure SQL Database through pyodbc with fast_executemany"""
+
+    name = "azure"
+    placeholder = "?"
+
+    def __init__(self, conn_str=None):
+        import pyodbc
+
+        conn_str = conn_str or session.sql_connection_string("sql")
+        self.conn = pyodbc.connect(conn_str, autocommit=False)
+        self.cursor = self.conn.cursor()
+        self.cursor.fast_executemany = True
+
+    def table_exists(self, table):
+        self.cursor.execute("SELECT OBJECT_ID(?, 'U')", (f"dbo.{table}",))
+        return self.cursor.fetchone()[0] is not None
+
+    def create_table(self, table, definition):
+        if not self.table_exists(table):
+            self.cursor.execute(definition["ddl"])
+
+    def recreate_table(self, table, definition):
+        self.cursor.execute(f"IF OBJECT_ID('dbo.{table}', 'U') IS NOT NULL DROP TABLE [dbo].[{table}]")
+        self.cursor.execute(definition["ddl"])
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql, params)
+
+    def fetchall(self, sql, params=()):
+        self.cursor.execute(sql, params)
+        return [tuple(row) for row in self.cursor.fetchall()]
+
+    def insert_batch(self, sql, rows):
+        self.cursor.executemany(sql, rows)
+
+    def execute_many(self, sql, params):
+        """Run one statement per parameter tuple (e.g. a DELETE per key)"""
+        self.cursor.executemany(sql, params)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def make_backend(name, sqlite_path=SQLITE_PATH):
+    if name == "sqlite":
+        return SqliteBackend(sqlite_path)
+    if name == "azure":
+        return AzureSqlBackend()
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def iter_batches(reader, convert, batch_rows):
+    """Yield lists of converted rows, batch_rows at a time"""
+    while True:
+        batch = [convert(record) for record in itertools.islice(reader, batch_rows)]
+        if not batch:
+            return
+        yield batch
+
+
+def insert_statement(backend, table, columns):
+    names = ", ".join(f"[{name}]" if backend.name == "azure" else f'"{name}"' for name, _ in columns)
+    params = ", ".join(backend.placeholder for _ in columns)
+    return f"INSERT INTO {table} ({names}) VALUES ({params})"
+
+
+def load_file(backend, csv_path, table, definition, batch_rows=BATCH_ROWS, recreate=True):
+    """
+    Stream one CSV into one table
+
+    Returns a dict with rows loaded, elapsed seconds and rows/sec.
+    """
+    start = time.perf_counter()
+    if recreate:
+        backend.recreate_table(table, definition)
+
+    columns = definition["columns"]
+    sql = insert_statement(backend, table, columns)
+    rows = 0
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        convert = make_row_converter(next(reader), columns)
+        for batch in iter_batches(reader, convert, batch_rows):
+            backend.insert_batch(sql, batch)
+            rows += len(batch)
+
+    backend.commit()
+    elapsed = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def load_all(backend, configs=LOAD_CONFIGS, batch_rows=BATCH_ROWS, data_path=DATA_PATH):
+    """Load every (csv, table) pair and return the per-table stats"""
+    definitions = load_table_definitions()
+    results = []
+    for filename, table in configs:
+        print(f"Loading: {filename} → {table}")
+        stats = load_file(backend, os.path.join(data_path, filename), table, definitions[table], batch_rows)
+        print(f"  SUCCESS: {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+              f"({stats['rows_per_sec']:,.0f} rows/sec)")
+        results.append(stats)
+    return results
+
+
+def load_payroll(backend, data_path=DATA_PATH, batch_rows=BATCH_ROWS):
+    """
+    Load every payroll file in data_path into PAYROLL_TABLE
+
+    Returns the same stats as load_file, for all files together.
+    """
+    import partitioned_load
+
+    files = partitioned_load.payroll_files(data_path)
+    print(f"Loading: {', '.join(files)} → {PAYROLL_TABLE}")
+    results = partitioned_load.load_partitioned(backend, files, data_path, batch_rows)
+    rows = sum(r["rows"] for r in results)
+    elapsed = sum(r["stage_seconds"] for r in results) + (results[0]["switch_seconds"] if results else 0)
+    print(f"  SUCCESS: {rows:,} rows in {elapsed:.2f}s ({rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
+    return {
+        "table": PAYROLL_TABLE,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main():
+    """Run the master loads and the payroll load against the selected backend"""
+    parser = argparse.ArgumentParser(description="Stream payroll CSVs into SQL tables")
+    parser.add_argument("--backend", choices=["sqlite", "azure"], default="sqlite")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--tables", nargs="+", help="Only load these tables (--layout raw)")
+    parser.add_argument("--data-path", default=DATA_PATH,
+                        help="Folder holding the CSVs, e.g. generate_payroll.py output")
+    parser.add_argument("--layout", choices=["raw", "normalized"], default="raw",
+                        help="normalized: key-mapped NYC_Payroll_Fact (normalized_load.py)")
+    args = parser.parse_args()
+
+    if args.layout == "normalized":
+        if args.tables:
+            parser.error("--tables only applies to --layout raw (normalized loads every payroll file)")
+        import normalized_load
+        files = normalized_load.payroll_files(args.data_path)
+        normalized_load.run(args.backend, args.sqlite_path, args.batch_rows, files, args.data_path)
+        return
+
+    configs = [c for c in LOAD_CONFIGS if not args.tables or c[1] in args.tables]
+    payroll = not args.tables or PAYROLL_TABLE in args.tables
+
+    print("=" * 80)
+    print(f"BULK LOAD: {len(configs) + payroll} tables → {args.backend}")
+    print("=" * 80)
+    print()
+
+    backend = make_backend(args.backend, args.sqlite_path)
+    try:
+        results = load_all(backend, configs, args.batch_rows, args.data_path)
+        if payroll:
+            results.append(load_payroll(backend, args.data_path, args.batch_rows))
+    finally:
+        backend.close()
+
+    total_rows = sum(r["rows"] for r in results)
+    total_seconds = sum(r["seconds"] for r in results)
+    print()
+    print("=" * 80)
+    print(f"LOAD COMPLETE: {total_rows:,} rows in {total_seconds:.2f}s")
+    print("=" * 80)
+    for r in results:
+        print(f"  {r['table']:<25} {r['rows']:>12,} rows {r['rows_per_sec']:>14,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Compute Sizing: Core count and compute type per ExecuteDataFlow activity
+
+Every activity in pl_NYC_Payroll_Pipeline asked for the same cluster
+(8 cores, General), whether it loads the 154-row AgencyMaster.csv or
+aggregates every payroll year.
+
+This model sizes each activity from its inputs:
+- Source files (load_manifest.json entries, or data flow source → dataset →
+  lake file) are measured locally under data/ or in the lake; rows are
+  estimated from a 1 MiB sample
+- SQL sources inherit the size of the activity that loads that table, so the
+  aggregation is sized from the payroll files it ends up reading
+- Throughput (rows per core-second) and cluster start-up time are calibrated
+  from .pipeline_run_history.jsonl when it holds runs of at least
+  MIN_CALIBRATION_ROWS rows; otherwise DEFAULT_* values are used
+- The smallest core count whose estimated processing time meets
+  TARGET_PROCESSING_SECONDS wins; flows with a shuffle (aggregate, join,
+  union, window, sort) count their rows twice and switch to MemoryOptimized
+  once their input passes MEMORY_OPTIMIZED_BYTES
+- Every choice comes with a one-line reason
+
+8 cores is the smallest data flow cluster ADF offers, so small flows stay
+there; the model decides when a flow has outgrown it.
+
+Activity-level compute only applies on AutoResolve; on the dedicated
+integration runtime the runtime's own size (azure_session.DATAFLOW_COMPUTE)
+applies. So an activity whose sizing fits that runtime runs there (warm
+cluster), and one that has outgrown it runs on AutoResolve with its sizing
+(pipeline_scheduler.placement). The ForEach loads share the runtime; a load
+sized above it is only reported, as a reason to grow DATAFLOW_COMPUTE.
+
+WHY THIS MATTERS:
+Cluster cost scales with cores × minutes. Sizing from the data keeps the
+master loads on the cheapest cluster and gives the aggregation more cores
+only once the payroll volume needs them.
+
+Usage:
+    python compute_sizing.py                       # size from data/
+    python compute_sizing.py --source lake         # size from the lake files
+    python compute_sizing.py --history runs.jsonl  # calibrate from another history
+"""
+
+import argparse
+import json
+import os
+import statistics
+
+from pipeline_scheduler import (
+    ACTIVITIES,
+    HISTORY_PATH,
+    POST_LOAD_ACTIVITIES,
+    PROJECT_ROOT,
+    dataflow_io,
+    derive_manifest_dependencies,
+    load_definitions,
+    load_manifest,
+    manifest_io,
+    placement,
+    simulate_manifest,
+)
+
+# Configuration
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+
+CORE_COUNTS = [8, 16, 32, 48, 80, 144, 272]
+SHUFFLE_TRANSFORMS = ("aggregate(", "join(", "union(", "window(", "sort(")
+TARGET_PROCESSING_SECONDS = 120
+MEMORY_OPTIMIZED_BYTES = 4 * 1024 ** 3
+
+DEFAULT_ROWS_PER_CORE_SECOND = 20_000
+DEFAULT_STARTUP_SECONDS = 240
+DEFAULT_ROW_BYTES = 180
+MIN_CALIBRATION_ROWS = 100_000
+SAMPLE_BYTES = 1024 * 1024
+
+
+def estimate_rows(path, size):
+    """Data rows in a CSV: counted if it fits in the sample, else extrapolated"""
+    with open(path, "rb") as f:
+        sample = f.read(SAMPLE_BYTES)
+    lines = sample.count(b"\n")
+    if size <= SAMPLE_BYTES or lines == 0:
+        return max(lines - 1, 0) + (1 if sample and not sample.endswith(b"\n") else 0)
+    return int(size / (len(sample) / lines)) - 1
+
+
+def local_file_stats(file_name, data_path=DATA_PATH):
+    path = os.path.join(data_path, file_name)
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    return {"bytes": size, "rows": estimate_rows(path, size)}
+
+
+def lake_file_stats(container, blob_name, data_path=DATA_PATH):
+    """Size from the lake listing; rows from the local copy's row width if there is one"""
+    from lake_inventory import list_container
+
+    blob = list_container(container, prefix=blob_name).get(blob_name)
+    if blob is None:
+        return None
+    local = local_file_stats(os.path.basename(blob_name), data_path)
+    row_bytes = local["bytes"] / local["rows"] if local and local["rows"] else DEFAULT_ROW_BYTES
+    return {"bytes": blob["size"], "rows": int(blob["size"] / row_bytes)}
+
+
+def has_shuffle(dataflow):
+    type_properties = dataflow["typeProperties"]
+    script = type_properties.get("script") or "\n".join(type_properties.get("scriptLines", []))
+    return any(transform in script for transform in SHUFFLE_TRANSFORMS)
+
+
+def dataflow_units(activities=ACTIVITIES):
+    """[(activity, reads, writes, shuffle)] for data flow activities (JSON/ definitions)"""
+    dataflows, datasets = load_definitions()
+    return [
+        (name, *dataflow_io(dataflows[dataflow], datasets), has_shuffle(dataflows[dataflow]))
+        for name, dataflow in activities
+    ]
+
+
+def manifest_units(manifest):
+    """[(entry activity, reads, writes, shuffle)] for the load_manifest.json entries"""
+    return [(entry["activity"], *manifest_io(entry), False) for entry in manifest["loads"]]
+
+
+def measure_units(units, source="local", data_path=DATA_PATH):
+    """
+    {activity: {"bytes", "rows", "shuffle", "inputs"}} in units order
+
+    File sources are measured; a table source takes the input size of the
+    earlier units that write it (every year loaded into NYC_Payroll_Data).
+    """
+    written_by, inputs = {}, {}
+
+    for name, reads, writes, shuffle in units:
+        stats = {"bytes": 0, "rows": 0, "shuffle": shuffle, "inputs": []}
+        for target in sorted(reads, key=str):
+            if len(target) == 4:
+                _, container, folder, file_name = target
+                blob_name = "/".join(part for part in (folder, file_name) if part)
+                found = (lake_file_stats(container, blob_name, data_path) if source == "lake"
+                         else local_file_stats(file_name, data_path))
+                label = f"{container}/{blob_name}"
+            elif target in written_by:
+                writers = written_by[target]
+                found = {"bytes": sum(inputs[w]["bytes"] for w in writers),
+                         "rows": sum(inputs[w]["rows"] for w in writers)}
+                label = f"{target[-1]} (loaded by {', '.join(writers)})"
+            else:
+                found, label = None, str(target[-1])
+            if found:
+                stats["bytes"] += found["bytes"]
+                stats["rows"] += found["rows"]
+            stats["inputs"].append(label if found else f"{label} (not found)")
+
+        for target in writes:
+            written_by.setdefault(target, []).append(name)
+        inputs[name] = stats
+    return inputs
+
+
+def activity_inputs(activities=ACTIVITIES, source="local", data_path=DATA_PATH):
+    return measure_units(dataflow_units(activities), source, data_path)
+
+
+def calibrate(history_path=HISTORY_PATH):
+    """
+    (rows per core-second, start-up seconds, number of runs used)
+
+    Uses succeeded runs that recorded rows_read, core_count and duration; the
+    start-up and queue time are taken off before computing throughput.
+    """
+    rates, startups = [], []
+    if os.path.exists(history_path):
+        with open(history_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                r = json.loads(line)
+                if r.get("status") != "Succeeded":
+                    continue
+                if r.get("cluster_startup_seconds") is not None:
+                    startups.append(r["cluster_startup_seconds"])
+                overhead = (r.get("cluster_startup_seconds") or 0) + (r.get("queue_seconds") or 0)
+                processing = (r.get("duration_seconds") or 0) - overhead
+                if (r.get("rows_read") or 0) >= MIN_CALIBRATION_ROWS and r.get("core_count") and processing > 0:
+                    rates.append(r["rows_read"] / (r["core_count"] * processing))
+
+    rate = statistics.median(rates) if rates else DEFAULT_ROWS_PER_CORE_SECOND
+    startup = statistics.median(startups) if startups else DEFAULT_STARTUP_SECONDS
+    return rate, startup, len(rates)
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def choose(stats, rate, startup):
+    """Sizing for one activity: {"coreCount", "computeType", "predicted_seconds", "reason"}"""
+    work = stats["rows"] * (2 if stats["shuffle"] else 1)
+    for cores in CORE_COUNTS:
+        processing = work / (rate * cores)
+        if processing <= TARGET_PROCESSING_SECONDS:
+            break
+
+    memory = stats["shuffle"] and stats["bytes"] >= MEMORY_OPTIMIZED_BYTES
+    size = f"{stats['rows']:,} rows / {format_bytes(stats['bytes'])}"
+    if cores == CORE_COUNTS[0]:
+        reason = f"{size}: smallest cluster already meets the {TARGET_PROCESSING_SECONDS}s target"
+    elif processing > TARGET_PROCESSING_SECONDS:
+        reason = f"{size}: largest cluster, still ~{processing:.0f}s of processing"
+    else:
+        reason = f"{size}: {cores} cores bring processing to ~{processing:.0f}s"
+    if stats["shuffle"]:
+        reason += "; shuffle counted twice"
+    if memory:
+        reason += f"; MemoryOptimized above {MEMORY_OPTIMIZED_BYTES / 1024 ** 3:.0f} GiB shuffled"
+
+    return {
+        "coreCount": cores,
+        "computeType": "MemoryOptimized" if memory else "General",
+        "predicted_seconds": startup + processing,
+        "reason": reason,
+    }
+
+
+def size_units(units, source="local", history_path=HISTORY_PATH):
+    rate, startup, _ = calibrate(history_path)
+    inputs = measure_units(units, source)
+    return {name: choose(inputs[name], rate, startup) for name, _, _, _ in units}
+
+
+def size_activities(activities=ACTIVITIES, source="local", history_path=HISTORY_PATH):
+    """{activity: sizing} for the one-data-flow-per-file layout"""
+    return size_units(dataflow_units(activities), source, history_path)
+
+
+def size_manifest(manifest, post_activities=POST_LOAD_ACTIVITIES, source="local", history_path=HISTORY_PATH):
+    """{entry activity or post-load activity: sizing} for the ForEach layout"""
+    return size_units(manifest_units(manifest) + dataflow_units(post_activities), source, history_path)
+
+
+def compute_settings(sizing):
+    """{activity: compute block} for pipeline_scheduler.build_pipeline"""
+    return {name: {"coreCount": s["coreCount"], "computeType": s["computeType"]} for name, s in sizing.items()}
+
+
+def main():
+    """Size every activity and show the reason for each choice"""
+    parser = argparse.ArgumentParser(description="Pick data flow compute per activity from input size")
+    parser.add_argument("--source", choices=["local", "lake"], default="local")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSONL activity run history")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    units = manifest_units(manifest) + dataflow_units(POST_LOAD_ACTIVITIES)
+    rate, startup, runs = calibrate(args.history)
+    inputs = measure_units(units, source=args.source)
+    sizing = {name: choose(inputs[name], rate, startup) for name in inputs}
+
+    print("=" * 80)
+    print(f"COMPUTE SIZING: {len(sizing)} activities ({args.source} inputs)")
+    print("=" * 80)
+    calibration = f"calibrated from {runs} runs" if runs else "defaults, no calibration runs"
+    print(f"Throughput: {rate:,.0f} rows/core-second, start-up {startup:.0f}s ({calibration})")
+    print()
+    for name, s in sizing.items():
+        _, runtime = placement(compute_settings({name: s})[name])
+        print(f"{name:<28} {s['coreCount']:>4} cores {s['computeType']:<16} ~{s['predicted_seconds']:.0f}s"
+              f"  on {runtime or 'AutoResolve'}")
+        print(f"  {s['reason']}")
+        print(f"  inputs: {', '.join(inputs[name]['inputs'])}")
+    print()
+
+    durations = {name: s["predicted_seconds"] for name, s in sizing.items()}
+    result = simulate_manifest(manifest, derive_manifest_dependencies(manifest), durations)
+    print(f"✓ Predicted pipeline makespan: {result['makespan']:.0f}s (ForEach batchCount {manifest['batchCount']})")
+
+
+if __name__ == "__main__":
+    main()
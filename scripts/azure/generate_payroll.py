@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Synthetic Payroll Generator: nycpayroll_<year>.csv at benchmark scale
+
+data/nycpayroll_2020.csv and nycpayroll_2021.csv hold about 100 rows each,
+too few to measure a loader, a data flow or an index.
+
+This generator writes payroll extracts of any size (1M, 10M, 100M rows)
+spread evenly over N fiscal years, shaped like the real files:
+- AgencyID, TitleCode and EmployeeID (with their names) are drawn from
+  AgencyMaster.csv, TitleMaster.csv and EmpMaster.csv with Zipf skew: a few
+  agencies and titles hold most rows, as in the city payroll
+- BaseSalary belongs to the title; PayBasis is mixed (per Annum / per Day /
+  per Hour) and BaseSalary is quoted in that basis
+- Each employee keeps one AgencyStartDate, each agency one PayrollNumber
+- TotalOtherPay is sometimes negative (retroactive adjustments)
+- The 2021 file has the AgencyCode header instead of AgencyID
+
+Rows are generated column-wise with NumPy, CHUNK_ROWS at a time, and
+streamed to disk through the pyarrow CSV writer, so memory stays flat at any
+row count. Each chunk has its own seed (seed, year, chunk), so a file is
+reproducible. String values are quoted, so a name with a comma stays one
+field. The master files are copied next to the extracts, so the output folder
+can stand in for data/.
+
+WHY THIS MATTERS:
+Loader, engine and index benchmarks need volumes where the differences show.
+The output folder is read like data/ by bulk_loader.py --data-path,
+partitioned_load.py --data-path and payroll_engine.py (files as arguments);
+the data flows read the extracts once they are uploaded to the lake.
+
+Usage:
+    python generate_payroll.py --rows 1M                 # 2020 and 2021 into data/synthetic/
+    python generate_payroll.py --rows 100M --years 5     # fiscal years 2020..2024
+    python generate_payroll.py --rows 10M --output /tmp/payroll --seed 7
+    python partitioned_load.py --data-path ../../data/synthetic
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from schema_registry import CANONICAL_SCHEMAS
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+OUTPUT_PATH = os.path.join(DATA_PATH, "synthetic")
+
+ROWS = 1_000_000
+FIRST_FISCAL_YEAR = 2020
+YEARS = 2
+CHUNK_ROWS = 500_000
+SEED = 2020
+SUFFIXES = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+MASTER_FILES = ["AgencyMaster.csv", "EmpMaster.csv", "TitleMaster.csv"]
+
+# Years whose extract uses the AgencyCode header (drift seen in nycpayroll_2021.csv)
+AGENCY_CODE_YEARS = {2021}
+
+# Zipf exponents: weight of the k-th most common key is 1 / k ** s
+AGENCY_SKEW = 1.2
+TITLE_SKEW = 1.1
+EMPLOYEE_SKEW = 0.6
+
+BOROUGHS = {"MANHATTAN": 0.45, "BROOKLYN": 0.2, "QUEENS": 0.15, "BRONX": 0.1, "RICHMOND": 0.05, "OTHER": 0.05}
+LEAVE_STATUSES = {"ACTIVE": 0.88, "CEASED": 0.1, "ON LEAVE": 0.01, "ON SEPARATION LEAVE": 0.01}
+PAY_BASES = {"per Annum": 0.78, "per Day": 0.14, "per Hour": 0.08}
+BASIS_DIVISORS = {"per Annum": 1, "per Day": 261, "per Hour": 2080}
+
+MEDIAN_SALARY = 68_000
+STANDARD_HOURS = (1820, 2080)
+OT_SHARE = 0.4
+OTHER_PAY_SHARE = 0.6
+NEGATIVE_OTHER_PAY_SHARE = 0.04
+START_DATES = (date(1970, 1, 1), date(FIRST_FISCAL_YEAR - 1, 6, 30))
+
+
+def parse_rows(text):
+    """'100M' -> 100_000_000 (K, M, B suffixes, or a plain number)"""
+    text = text.strip().upper().replace("_", "")
+    if text[-1:] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def read_master(name, data_path=DATA_PATH):
+    """{column: list of values} of a master CSV"""
+    with open(os.path.join(data_path, name), newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row]
+    return {column: [row[i] for row in rows] for i, column in enumerate(header)}
+
+
+def zipf_cdf(count, skew, rng):
+    """Cumulative Zipf weights over count keys, ranks assigned in random order"""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    weights = weights[rng.permutation(count)]
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def choice_cdf(options):
+    values = list(options)
+    cdf = np.cumsum([options[v] for v in values])
+    return pa.array(values), cdf / cdf[-1]
+
+
+def draw(cdf, rng, size):
+    """Indices drawn with the probabilities behind cdf"""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), len(cdf) - 1)
+
+
+def format_date(d):
+    return f"{d.month}/{d.day}/{d.year}"
+
+
+def build_keys(data_path=DATA_PATH, seed=SEED):
+    """
+    Master keys with their per-key attributes and skew
+
+    Per-key attributes stay fixed across chunks and years: a title's annual
+    salary, an agency's payroll number, an employee's start date.
+    """
+    rng = np.random.default_rng([seed, 0])
+    agencies, employees, titles = (read_master(name, data_path) for name in MASTER_FILES)
+
+    first, last = START_DATES
+    days = (last - first).days + 1
+    start_dates = pa.array([format_date(first + timedelta(days=i)) for i in range(days)])
+    start_day = rng.integers(0, days, len(employees["EmployeeID"]))
+
+    return {
+        "agency": {name: pa.array(values) for name, values in agencies.items()},
+        "agency_cdf": zipf_cdf(len(agencies["AgencyID"]), AGENCY_SKEW, rng),
+        "payroll_number": pa.array(rng.integers(1, 1000, len(agencies["AgencyID"])).astype(np.int32)),
+        "title": {name: pa.array(values) for name, values in titles.items()},
+        "title_cdf": zipf_cdf(len(titles["TitleCode"]), TITLE_SKEW, rng),
+        "title_salary": np.round(rng.lognormal(np.log(MEDIAN_SALARY), 0.45, len(titles["TitleCode"]))),
+        "employee": {name: pa.array(values) for name, values in employees.items()},
+        "employee_cdf": zipf_cdf(len(employees["EmployeeID"]), EMPLOYEE_SKEW, rng),
+        "start_date": start_dates.take(pa.array(start_day)),
+    }
+
+
+def generate_chunk(keys, year, size, rng):
+    """One chunk of payroll rows as an Arrow table (canonical column names)"""
+    agency = pa.array(draw(keys["agency_cdf"], rng, size))
+    title = draw(keys["title_cdf"], rng, size)
+    employee = pa.array(draw(keys["employee_cdf"], rng, size))
+
+    boroughs, borough_cdf = choice_cdf(BOROUGHS)
+    statuses, status_cdf = choice_cdf(LEAVE_STATUSES)
+    bases, basis_cdf = choice_cdf(PAY_BASES)
+    status = draw(status_cdf, rng, size)
+    basis = draw(basis_cdf, rng, size)
+
+    # Annual rate from the title, quoted per day / per hour for those bases
+    annual = keys["title_salary"][title] * rng.uniform(0.9, 1.1, size)
+    divisors = np.array([BASIS_DIVISORS[b] for b in PAY_BASES])[basis]
+    base_salary = np.where(divisors == 1, np.round(annual), np.round(annual / divisors, 2))
+
+    # Full year for active staff, part of it for everyone else
+    standard = np.array(STANDARD_HOURS, dtype=np.float64)[rng.integers(0, len(STANDARD_HOURS), size)]
+    worked = np.where(status == 0, 1.0, rng.uniform(0.05, 1.0, size))
+    regular_hours = np.round(standard * worked * 4) / 4
+    regular_gross = np.round(annual * worked * rng.uniform(0.97, 1.0, size), 2)
+
+    hourly = annual / standard
+    ot_hours = np.where(rng.random(size) < OT_SHARE, np.round(rng.exponential(180, size) * 4) / 4, 0.0)
+    ot_paid = np.round(ot_hours * hourly * 1.5, 2)
+
+    other = np.where(rng.random(size) < OTHER_PAY_SHARE, np.round(rng.lognormal(7, 1.5, size), 2), 0.0)
+    other = np.where(rng.random(size) < NEGATIVE_OTHER_PAY_SHARE, -np.round(rng.lognormal(8, 0.8, size), 2), other)
+
+    title = pa.array(title)
+    columns = {
+        "FiscalYear": pa.array(np.full(size, year, dtype=np.int32)),
+        "PayrollNumber": keys["payroll_number"].take(agency),
+        "AgencyID": keys["agency"]["AgencyID"].take(agency),
+        "AgencyName": keys["agency"]["AgencyName"].take(agency),
+        "EmployeeID": keys["employee"]["EmployeeID"].take(employee),
+        "LastName": keys["employee"]["LastName"].take(employee),
+        "FirstName": keys["employee"]["FirstName"].take(employee),
+        "AgencyStartDate": keys["start_date"].take(employee),
+        "WorkLocationBorough": boroughs.take(pa.array(draw(borough_cdf, rng, size))),
+        "TitleCode": keys["title"]["TitleCode"].take(title),
+        "TitleDescription": keys["title"]["TitleDescription"].take(title),
+        "LeaveStatusasofJune30": statuses.take(pa.array(status)),
+        "BaseSalary": pa.array(base_salary),
+        "PayBasis": bases.take(pa.array(basis)),
+        "RegularHours": pa.array(regular_hours),
+        "RegularGrossPaid": pa.array(regular_gross),
+        "OTHours": pa.array(ot_hours),
+        "TotalOTPaid": pa.array(ot_paid),
+        "TotalOtherPay": pa.array(other),
+    }
+    return pa.table([columns[name] for name, _ in CANONICAL_SCHEMAS["payroll"]],
+                    names=[name for name, _ in CANONICAL_SCHEMAS["payroll"]])
+
+
+def file_header(year):
+    """Header of a year's extract (AgencyCode in AGENCY_CODE_YEARS)"""
+    header = [name for name, _ in CANONICAL_SCHEMAS["payroll"]]
+    if year in AGENCY_CODE_YEARS:
+        header[header.index("AgencyID")] = "AgencyCode"
+    return header
+
+
+def write_year(keys, year, rows, path, chunk_rows=CHUNK_ROWS, seed=SEED):
+    """Stream rows of one fiscal year to path, chunk by chunk"""
+    with open(path, "wb") as f:
+        # The header is written as is; Arrow would quote the column names
+        f.write((",".join(file_header(year)) + "\n").encode("utf-8"))
+        writer = None
+        for chunk, offset in enumerate(range(0, rows, chunk_rows)):
+            rng = np.random.default_rng([seed, year, chunk + 1])
+            table = generate_chunk(keys, year, min(chunk_rows, rows - offset), rng)
+            if writer is None:
+                options = pacsv.WriteOptions(include_header=False, quoting_style="needed")
+                writer = pacsv.CSVWriter(f, table.schema, write_options=options)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+
+
+def generate(rows=ROWS, years=YEARS, first_year=FIRST_FISCAL_YEAR, output_path=OUTPUT_PATH,
+             chunk_rows=CHUNK_ROWS, seed=SEED, data_path=DATA_PATH):
+    """
+    Write nycpayroll_<year>.csv for each year, plus copies of the master
+    files; returns [(path, rows, bytes, seconds)] of the extracts
+    """
+    os.makedirs(output_path, exist_ok=True)
+    keys = build_keys(data_path, seed)
+    for name in MASTER_FILES:
+        target = os.path.join(output_path, name)
+        if not os.path.exists(target) or not os.path.samefile(os.path.join(data_path, name), target):
+            shutil.copyfile(os.path.join(data_path, name), target)
+    results = []
+    for i in range(years):
+        year = first_year + i
+        year_rows = rows // years + (1 if i < rows % years else 0)
+        path = os.path.join(output_path, f"nycpayroll_{year}.csv")
+        start = time.perf_counter()
+        write_year(keys, year, year_rows, path, chunk_rows, seed)
+        results.append((path, year_rows, os.path.getsize(path), time.perf_counter() - start))
+    return results
+
+
+def main():
+    """Generate synthetic payroll extracts"""
+    parser = argparse.ArgumentParser(description="Generate synthetic NYC payroll CSVs at scale")
+    parser.add_argument("--rows", type=parse_rows, default=ROWS, help="Total rows, e.g. 1M, 10M, 100M")
+    parser.add_argument("--years", type=int, default=YEARS, help="Number of fiscal years")
+    parser.add_argument("--first-year", type=int, default=FIRST_FISCAL_YEAR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"SYNTHETIC PAYROLL: {args.rows:,} rows over {args.years} fiscal years → {args.output}")
+    print("=" * 80)
+    print()
+
+    results = generate(args.rows, args.years, args.first_year, args.output, args.chunk_rows, args.seed)
+    for path, rows, size, elapsed in results:
+        print(f"✓ {os.path.basename(path):<22} {rows:>12,} rows  {size / 1024 ** 2:>10,.1f} MiB  "
+              f"{elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    total_rows = sum(r[1] for r in results)
+    total_seconds = sum(r[3] for r in results)
+    print()
+    print(f"✓ {total_rows:,} rows in {total_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
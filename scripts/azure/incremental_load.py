@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Incremental Load: Watermark-based payroll refresh
+
+The df_Load_* data flows (and bulk_loader.py) reload their tables in full on
+every run because the sink uses recreate:true, even when only one new payroll
+cycle arrived.
+
+This loader keeps state in two control tables
+(scripts/sql/04_create_etl_control_tables.sql):
+- ETL_File_Watermark: modified time + size of each source file
+  -> an unchanged file is skipped without being read
+- ETL_Payroll_Slice: row count + digest per (FiscalYear, PayrollNumber)
+  -> only fiscal years with a new, changed or removed slice are rewritten
+
+The payroll files (every nycpayroll_*.csv) go to the FiscalYear-partitioned
+NYC_Payroll_Data (07_create_partitioned_payroll.sql). Slices are digested
+over all files together, since a file may carry late records for an earlier
+year, and a changed year is restaged and switched in as a whole with
+partitioned_load.py's prepare/switch steps: no row-by-row DELETE, and the
+other years' partitions are not touched. Master files reload in full.
+
+WHY THIS MATTERS:
+Daily refresh cost follows the size of the change, not the size of the
+history. Changed payroll files are read twice (digest pass + load pass), but
+only the rows of changed years are written to the database.
+
+Usage:
+    python incremental_load.py                     # SQLite stand-in
+    python incremental_load.py --backend azure
+    python incremental_load.py --full              # reset state, reload all
+    python incremental_load.py --tables NYC_Payroll_Data
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+
+from bulk_loader import (
+    BATCH_ROWS,
+    DATA_PATH,
+    LOAD_CONFIGS,
+    PROJECT_ROOT,
+    SQLITE_PATH,
+    insert_statement,
+    iter_batches,
+    load_file,
+    load_table_definitions,
+    make_backend,
+    make_row_converter,
+)
+from partitioned_load import (
+    PARTITIONED_DDL_SCRIPT,
+    STAGE_TABLE,
+    TABLE as PAYROLL_TABLE,
+    deploy_schema,
+    payroll_files,
+    prepare_year,
+    stage_batches,
+    switch_years,
+)
+
+# Configuration
+CONTROL_DDL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "04_create_etl_control_tables.sql")
+WATERMARK_TABLE = "ETL_File_Watermark"
+SLICE_TABLE = "ETL_Payroll_Slice"
+
+# Master files (LOAD_CONFIGS) reload in full; payroll files are refreshed year by year
+SLICE_KEY = ("FiscalYear", "PayrollNumber")
+DIGEST_MODULUS = 1 << 128
+
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def file_watermark(path):
+    """(LastModifiedUtc, FileSize) for a local file"""
+    stat = os.stat(path)
+    modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+    return modified, stat.st_size
+
+
+def ensure_control_tables(backend):
+    for table, definition in load_table_definitions(CONTROL_DDL_SCRIPT).items():
+        backend.create_table(table, definition)
+
+
+def read_watermark(backend, source_file, table):
+    rows = backend.fetchall(
+        f"SELECT LastModifiedUtc, FileSize FROM {WATERMARK_TABLE} WHERE SourceFile = ? AND TableName = ?",
+        (source_file, table),
+    )
+    return tuple(rows[0]) if rows else None
+
+
+def save_watermark(backend, source_file, table, watermark):
+    backend.execute(
+        f"DELETE FROM {WATERMARK_TABLE} WHERE SourceFile = ? AND TableName = ?",
+        (source_file, table),
+    )
+    backend.execute(
+        f"INSERT INTO {WATERMARK_TABLE} (SourceFile, TableName, LastModifiedUtc, FileSize, LoadedAtUtc) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (source_file, table, watermark[0], watermark[1], utc_now()),
+    )
+
+
+def read_table_watermarks(backend, table):
+    """{SourceFile: (LastModifiedUtc, FileSize)} of every file loaded into table"""
+    rows = backend.fetchall(
+        f"SELECT SourceFile, LastModifiedUtc, FileSize FROM {WATERMARK_TABLE} WHERE TableName = ?",
+        (table,),
+    )
+    return {source_file: (modified, size) for source_file, modified, size in rows}
+
+
+def read_slice_digests(backend, table):
+    rows = backend.fetchall(
+        f"SELECT FiscalYear, PayrollNumber, SliceRows, Digest FROM {SLICE_TABLE} WHERE TableName = ?",
+        (table,),
+    )
+    return {(year, number): (count, digest) for year, number, count, digest in rows}
+
+
+def reset_table_state(backend, table):
+    backend.execute(f"DELETE FROM {SLICE_TABLE} WHERE TableName = ?", (table,))
+    backend.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE TableName = ?", (table,))
+
+
+def row_hash(row):
+    return int.from_bytes(hashlib.blake2b(repr(row).encode("utf-8"), digest_size=16).digest(), "big")
+
+
+def compute_slice_digests(csv_path, columns):
+    """
+    Stream a payroll file and digest it per (FiscalYear, PayrollNumber)
+
+    The digest is the sum of per-row hashes modulo 2^128, so it does not
+    depend on row order inside the file. Returns {key: (rows, hex_digest)}.
+    """
+    names = [name for name, _ in columns]
+    key_positions = [names.index(k) for k in SLICE_KEY]
+    sums, counts = {}, {}
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        convert = make_row_converter(next(reader), columns)
+        for record in reader:
+            row = convert(record)
+            key = tuple(row[i] for i in key_positions)
+            sums[key] = (sums.get(key, 0) + row_hash(row)) % DIGEST_MODULUS
+            counts[key] = counts.get(key, 0) + 1
+
+    return {key: (counts[key], f"{sums[key]:032x}") for key in sums}
+
+
+def slice_sort_key(key):
+    """Sort key for slice keys that may hold None (blank FiscalYear / PayrollNumber)"""
+    return tuple((value is None, value if value is not None else 0) for value in key)
+
+
+def merge_slice_digests(digests):
+    """
+    Combine the {key: (rows, hex_digest)} of several files into one
+
+    The digest is a sum of row hashes, so a slice spread over several
+    files digests the same as if all its rows were in one file.
+    """
+    merged = {}
+    for file_digests in digests:
+        for key, (rows, digest) in file_digests.items():
+            count, total = merged.get(key, (0, 0))
+            merged[key] = (count + rows, (total + int(digest, 16)) % DIGEST_MODULUS)
+    return {key: (count, f"{total:032x}") for key, (count, total) in merged.items()}
+
+
+def year_batches(csv_path, columns, years, batch_rows):
+    """Batches of the file's rows whose FiscalYear is in years"""
+    year_index = [name for name, _ in columns].index("FiscalYear")
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        convert = make_row_converter(next(reader), columns)
+        for batch in iter_batches(reader, convert, batch_rows):
+            rows = [row for row in batch if row[year_index] in years]
+            if rows:
+                yield rows
+
+
+def refresh_payroll_years(backend, csv_paths, definition, batch_rows=BATCH_ROWS):
+    """
+    Bring PAYROLL_TABLE up to date with the payroll files
+
+    Every fiscal year with a new, changed or removed slice is prepared,
+    restaged from all files and switched in; a year whose slices all
+    disappeared is switched in empty. Returns a dict describing what was done.
+    """
+    columns = definition["columns"]
+    stored = read_slice_digests(backend, PAYROLL_TABLE)
+    current = merge_slice_digests(compute_slice_digests(path, columns) for path in csv_paths)
+
+    changed = {key for key, value in current.items() if stored.get(key) != value}
+    removed = set(stored) - set(current)
+    years = {year for year, _ in changed | removed}
+    if None in years:
+        raise ValueError(f"{PAYROLL_TABLE}: row without FiscalYear")
+
+    for year in sorted(years):
+        prepare_year(backend, year)
+    inserted = 0
+    for path in csv_paths:
+        staged = stage_batches(backend, year_batches(path, columns, years, batch_rows), definition,
+                               os.path.basename(path), years)
+        inserted += sum(staged.values())
+    switch_years(backend, years)
+
+    if years:
+        backend.execute_many(f"DELETE FROM {SLICE_TABLE} WHERE TableName = ? AND FiscalYear = ?",
+                             [(PAYROLL_TABLE, year) for year in sorted(years)])
+    slices = [(PAYROLL_TABLE,) + key + current[key]
+              for key in sorted(current, key=slice_sort_key) if key[0] in years]
+    if slices:
+        backend.insert_batch(
+            f"INSERT INTO {SLICE_TABLE} (TableName, FiscalYear, PayrollNumber, SliceRows, Digest) "
+            "VALUES (?, ?, ?, ?, ?)",
+            slices,
+        )
+
+    return {
+        "slices": len(current),
+        "changed": len(changed),
+        "removed": len(removed),
+        "years": sorted(years),
+        "rows": inserted,
+    }
+
+
+def refresh_payroll(backend, files, data_path=DATA_PATH, batch_rows=BATCH_ROWS, full=False):
+    """
+    Refresh PAYROLL_TABLE from the payroll files as one unit
+
+    Skipped when no file was added, removed or changed since the last load.
+    full ignores the stored digests, so every year in the files is rewritten.
+    """
+    watermarks = {filename: file_watermark(os.path.join(data_path, filename)) for filename in files}
+    start = time.perf_counter()
+
+    if full:
+        reset_table_state(backend, PAYROLL_TABLE)
+    elif read_table_watermarks(backend, PAYROLL_TABLE) == watermarks:
+        print(f"SKIPPED: {len(files)} payroll files → {PAYROLL_TABLE} (unchanged since last load)")
+        return {"table": PAYROLL_TABLE, "status": "skipped", "rows": 0}
+
+    print(f"Loading: {', '.join(files)} → {PAYROLL_TABLE}")
+    definitions = load_table_definitions(PARTITIONED_DDL_SCRIPT)
+    deploy_schema(backend, definitions)
+    stats = refresh_payroll_years(backend, [os.path.join(data_path, filename) for filename in files],
+                                  definitions[STAGE_TABLE], batch_rows)
+    years = ", ".join(map(str, stats["years"])) or "none"
+    print(f"  {stats['changed']}/{stats['slices']} slices changed, {stats['removed']} removed, "
+          f"years switched: {years}, {stats['rows']:,} rows staged")
+
+    backend.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE TableName = ?", (PAYROLL_TABLE,))
+    for filename, watermark in watermarks.items():
+        save_watermark(backend, filename, PAYROLL_TABLE, watermark)
+    backend.commit()
+    stats.update({"table": PAYROLL_TABLE, "status": "loaded", "seconds": time.perf_counter() - start})
+    return stats
+
+
+def incremental_load(backend, configs=LOAD_CONFIGS, data_path=DATA_PATH, batch_rows=BATCH_ROWS, full=False,
+                     files=None):
+    """
+    Run the incremental refresh for every (csv, table) pair, then the payroll files
+
+    files: payroll files under data_path (default: every nycpayroll_*.csv,
+    [] to leave PAYROLL_TABLE alone). Each table is committed on its own,
+    so a failure leaves earlier tables (and their watermarks) consistent.
+    """
+    ensure_control_tables(backend)
+    definitions = load_table_definitions()
+    results = []
+
+    for filename, table in configs:
+        csv_path = os.path.join(data_path, filename)
+        watermark = file_watermark(csv_path)
+        start = time.perf_counter()
+
+        if full:
+            reset_table_state(backend, table)
+        elif read_watermark(backend, filename, table) == watermark:
+            print(f"SKIPPED: {filename} → {table} (unchanged since last load)")
+            results.append({"table": table, "status": "skipped", "rows": 0})
+            continue
+
+        print(f"Loading: {filename} → {table}")
+        stats = load_file(backend, csv_path, table, definitions[table], batch_rows)
+        print(f"  Full reload: {stats['rows']:,} rows")
+
+        save_watermark(backend, filename, table, watermark)
+        backend.commit()
+        stats.update({"table": table, "status": "loaded", "seconds": time.perf_counter() - start})
+        results.append(stats)
+
+    files = payroll_files(data_path) if files is None else files
+    if files:
+        results.append(refresh_payroll(backend, files, data_path, batch_rows, full))
+    return results
+
+
+def main():
+    """Refresh the master tables and NYC_Payroll_Data incrementally"""
+    parser = argparse.ArgumentParser(description="Watermark-based incremental payroll loads")
+    parser.add_argument("--backend", choices=["sqlite", "azure"], default="sqlite")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--tables", nargs="+", help="Only refresh these tables")
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and reload everything")
+    args = parser.parse_args()
+
+    configs = [c for c in LOAD_CONFIGS if not args.tables or c[1] in args.tables]
+    files = None if not args.tables or PAYROLL_TABLE in args.tables else []
+
+    print("=" * 80)
+    print(f"INCREMENTAL LOAD: {len(configs) + (files is None)} tables → {args.backend}")
+    print("=" * 80)
+    print()
+
+    backend = make_backend(args.backend, args.sqlite_path)
+    try:
+        results = incremental_load(backend, configs, batch_rows=args.batch_rows, full=args.full, files=files)
+    finally:
+        backend.close()
+
+    loaded = [r for r in results if r["status"] == "loaded"]
+    print()
+    print(f"✓ {len(loaded)} tables refreshed, {len(results) - len(loaded)} skipped, "
+          f"{sum(r['rows'] for r in loaded):,} rows written")
+
+
+if __name__ == "__main__":
+    main()
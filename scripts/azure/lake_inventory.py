@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Lake Inventory: One concurrent listing pass to verify uploads
+
+verify_uploads in 02_upload_data.py used to start one `az storage blob list`
+subprocess per container, in sequence, and only printed names. With the
+Parquet landing zone that is hundreds of files nobody actually compares.
+
+This module:
+- Lists every container concurrently through the SDK (paged, optional
+  name-prefix filter), collecting size, ETag and Content-MD5
+- Builds a local manifest of the expected blobs (FILE_MAPPINGS + the Parquet
+  landing zone) with size and MD5; MD5s are cached in
+  .lake_local_manifest.json and only recomputed when size/mtime change
+- Returns a structured diff: missing, mismatched (size/MD5), remote blobs
+  whose ETag changed since the last verification, and extra blobs
+
+WHY THIS MATTERS:
+Confirming that every partition file landed intact is one fast pass instead
+of N slow CLI start-ups and a manual read of the output.
+
+Usage:
+    python lake_inventory.py                        # verify 02's uploads
+    python lake_inventory.py --prefix payroll_parquet/FiscalYear=2021
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import azure_session as session
+from lake_uploader import DATA_PATH, FILE_MAPPINGS, PROJECT_ROOT, file_md5
+from parquet_landing import LANDING_CONTAINER, LANDING_FOLDER, LANDING_PATH
+
+# Configuration
+CONTAINERS = ["dirpayrollfiles", "dirhistoryfiles", "dirstaging"]
+LOCAL_MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".lake_local_manifest.json")
+PAGE_SIZE = 5000
+
+
+def list_container(container, prefix=None, account=session.STORAGE_ACCOUNT, page_size=PAGE_SIZE):
+    """{blob_name: {"size", "etag", "md5"}} for one container, page by page"""
+    client = session.blob_service_client(account).get_container_client(container)
+    blobs = {}
+    pages = client.list_blobs(name_starts_with=prefix, results_per_page=page_size).by_page()
+    for page in pages:
+        for blob in page:
+            md5 = blob.content_settings.content_md5
+            blobs[blob.name] = {
+                "size": blob.size,
+                "etag": blob.etag.strip('"'),
+                "md5": bytes(md5).hex() if md5 else None,
+            }
+    return blobs
+
+
+def list_inventory(containers=CONTAINERS, prefix=None, account=session.STORAGE_ACCOUNT):
+    """List all containers concurrently; returns {container: {blob: props}}"""
+    if not containers:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(containers)) as pool:
+        listings = pool.map(lambda c: list_container(c, prefix, account), containers)
+        return dict(zip(containers, listings))
+
+
+def expected_blobs(mappings=FILE_MAPPINGS, data_path=DATA_PATH, trees=None):
+    """
+    {(container, blob_name): local_path} for everything 02 uploads
+
+    trees is a list of (local_dir, container, blob_prefix) folders uploaded
+    recursively; it defaults to the Parquet landing zone when it exists.
+    """
+    if trees is None:
+        trees = [(LANDING_PATH, LANDING_CONTAINER, LANDING_FOLDER)] if os.path.isdir(LANDING_PATH) else []
+
+    expected = {}
+    for name, containers in mappings.items():
+        for container in containers:
+            expected[(container, name)] = os.path.join(data_path, name)
+    for local_dir, container, prefix in trees:
+        for root, _, files in os.walk(local_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+                expected[(container, f"{prefix}/{relative}")] = path
+    return expected
+
+
+def read_local_manifest(path=LOCAL_MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_local_manifest(manifest, path=LOCAL_MANIFEST_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def build_local_manifest(expected, cached=None):
+    """
+    {"container/blob": {"path", "size", "mtime", "md5", "etag"}}
+
+    Entries from the cached manifest are reused while size and mtime match,
+    so unchanged files are not hashed again. "etag" is the remote ETag seen
+    at the last successful verification.
+    """
+    cached = cached or {}
+    manifest = {}
+    for (container, blob), path in sorted(expected.items()):
+        key = f"{container}/{blob}"
+        if not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        previous = cached.get(key)
+        if previous and previous["size"] == stat.st_size and previous["mtime"] == stat.st_mtime:
+            manifest[key] = dict(previous, path=path)
+        else:
+            manifest[key] = {"path": path, "size": stat.st_size, "mtime": stat.st_mtime,
+                             "md5": file_md5(path).hex(), "etag": None}
+    return manifest
+
+
+def diff_inventory(manifest, inventory, prefix=None):
+    """
+    Compare the local manifest with the remote inventory
+
+    Returns {"matched": [...], "missing": [...], "mismatched": [...],
+    "etag_changed": [...], "extra": [...]}; mismatched entries carry the
+    field name with local and remote values. Only containers present in
+    the inventory (the ones that were listed) are compared.
+    """
+    diff = {"matched": [], "missing": [], "mismatched": [], "etag_changed": [], "extra": []}
+    seen = set()
+
+    for key, local in manifest.items():
+        container, blob = key.split("/", 1)
+        if container not in inventory:
+            continue
+        if prefix and not blob.startswith(prefix):
+            continue
+        remote = inventory.get(container, {}).get(blob)
+        seen.add(key)
+        if remote is None:
+            diff["missing"].append(key)
+            continue
+
+        problems = [
+            {"blob": key, "field": field, "local": local[field], "remote": remote[field]}
+            for field in ("size", "md5") if local[field] != remote[field]
+        ]
+        if problems:
+            diff["mismatched"].extend(problems)
+        elif local.get("etag") and local["etag"] != remote["etag"]:
+            diff["etag_changed"].append(key)
+        else:
+            diff["matched"].append(key)
+
+    expected_containers = {key.split("/", 1)[0] for key in manifest}
+    for container, blobs in inventory.items():
+        if container not in expected_containers:
+            continue
+        diff["extra"].extend(f"{container}/{b}" for b in sorted(blobs) if f"{container}/{b}" not in seen)
+    return diff
+
+
+def verify(mappings=FILE_MAPPINGS, data_path=DATA_PATH, containers=CONTAINERS, prefix=None,
+           account=session.STORAGE_ACCOUNT, manifest_path=LOCAL_MANIFEST_PATH):
+    """
+    One-pass upload verification
+
+    Returns (diff, inventory). Matched blobs have their ETag recorded in the
+    local manifest so later runs can tell if the lake copy was rewritten.
+    """
+    expected = expected_blobs(mappings, data_path)
+    manifest = build_local_manifest(expected, read_local_manifest(manifest_path))
+    inventory = list_inventory(containers, prefix, account)
+    diff = diff_inventory(manifest, inventory, prefix)
+
+    for key in diff["matched"]:
+        container, blob = key.split("/", 1)
+        manifest[key]["etag"] = inventory[container][blob]["etag"]
+    write_local_manifest(manifest, manifest_path)
+    return diff, inventory
+
+
+def print_report(diff, inventory):
+    for container, blobs in inventory.items():
+        size = sum(b["size"] for b in blobs.values())
+        print(f"  {container:<20} {len(blobs):>6,} blobs {size / 1_048_576:>10,.1f} MB")
+    print()
+    print(f"✓ {len(diff['matched'])} blobs match the local files")
+    for key in diff["missing"]:
+        print(f"✗ missing:      {key}")
+    for problem in diff["mismatched"]:
+        print(f"✗ {problem['field']} differs: {problem['blob']} "
+              f"(local {problem['local']}, remote {problem['remote']})")
+    for key in diff["etag_changed"]:
+        print(f"! rewritten since last verification: {key}")
+    if diff["extra"]:
+        print(f"  {len(diff['extra'])} extra blobs not uploaded by 02 (e.g. pipeline output)")
+
+
+def main():
+    """Verify the lake against the local data/ folder"""
+    parser = argparse.ArgumentParser(description="Concurrent lake inventory and upload verification")
+    parser.add_argument("--prefix", help="Only list blobs whose name starts with this prefix")
+    parser.add_argument("--containers", nargs="+", default=CONTAINERS)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"LAKE INVENTORY: {session.STORAGE_ACCOUNT}")
+    print("=" * 70)
+
+    diff, inventory = verify(containers=args.containers, prefix=args.prefix)
+    print_report(diff, inventory)
+    if diff["missing"] or diff["mismatched"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
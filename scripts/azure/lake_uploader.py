@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Lake Uploader: Parallel block uploads with skip-if-unchanged
+
+02_upload_data.py used to call `az storage blob upload` once per
+(file, container) pair, so the master files were read and sent twice
+(dirpayrollfiles and dirhistoryfiles) and each upload went out as one
+sequential stream.
+
+This uploader:
+- Reads each local file once, computing its MD5 while the blocks are sent
+- Stages blocks on a thread pool (max_concurrency in flight) and commits the
+  block list with Content-MD5 set
+- Skips a blob whose remote size and Content-MD5 already match the local file
+  (the local MD5 is only computed up front when the sizes match)
+- Fills every extra container with a server-side copy of the first upload,
+  so the bytes cross the network once
+- Records staged block IDs in a local checkpoint (.lake_upload_checkpoint.json),
+  written every CHECKPOINT_EVERY_BLOCKS blocks / CHECKPOINT_EVERY_SECONDS and
+  on exit, so an interrupted upload resumes with only the missing blocks
+
+WHY THIS MATTERS:
+Multi-GB payroll extracts saturate the link instead of one TCP stream, and
+re-running 02 after a partial failure costs only what actually changed.
+
+Usage:
+    python lake_uploader.py                         # same files as 02
+    python lake_uploader.py --max-concurrency 16 --block-mb 16
+    python lake_uploader.py --no-resume             # ignore the checkpoint
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import azure_session as session
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+
+BLOCK_SIZE = 8 * 1024 * 1024
+MAX_CONCURRENCY = 8
+FILE_WORKERS = 4
+COPY_POLL_SECONDS = 1.0
+CHECKPOINT_PATH = os.path.join(PROJECT_ROOT, ".lake_upload_checkpoint.json")
+CHECKPOINT_EVERY_BLOCKS = 64
+CHECKPOINT_EVERY_SECONDS = 10.0
+
+# Files to upload and their destinations (02_upload_data.py and lake_inventory.py use these)
+FILE_MAPPINGS = {
+    # Master data files - go to both directories for reference
+    "AgencyMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
+    "EmpMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
+    "TitleMaster.csv": ["dirpayrollfiles", "dirhistoryfiles"],
+    # Historical payroll data
+    "nycpayroll_2020.csv": ["dirhistoryfiles"],
+    # Current payroll data
+    "nycpayroll_2021.csv": ["dirpayrollfiles"],
+}
+
+
+def file_md5(path, block_size=BLOCK_SIZE):
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            md5.update(block)
+    return md5.digest()
+
+
+def block_id(index):
+    """Fixed-width block IDs (all IDs of a blob must have the same length)"""
+    return base64.b64encode(f"block-{index:08d}".encode("ascii")).decode("ascii")
+
+
+class UploadCheckpoint:
+    """
+    Staged block IDs per destination blob, persisted in batches
+
+    Marked blocks are written out every save_every blocks or save_seconds,
+    whichever comes first, and by flush() (called when an upload ends,
+    fails or is interrupted). A crash loses at most the last batch, whose
+    blocks are simply staged again.
+
+    An entry is only reused while the local file (size, mtime) and the block
+    size are unchanged, and only for IDs the service still lists as
+    uncommitted (uncommitted blocks are discarded after 7 days or when a
+    different block list is committed). Entries are removed once the block
+    list is committed.
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH, save_every=CHECKPOINT_EVERY_BLOCKS,
+                 save_seconds=CHECKPOINT_EVERY_SECONDS):
+        self.path = path
+        self.entries = {}
+        self.save_every = save_every
+        self.save_seconds = save_seconds
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def fingerprint(path, block_size):
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime, "block_size": block_size}
+
+    def staged(self, key, fingerprint):
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry or entry["fingerprint"] != fingerprint:
+                self.entries[key] = {"fingerprint": fingerprint, "blocks": []}
+                self._save()
+                return set()
+            return set(entry["blocks"])
+
+    def mark(self, key, block):
+        with self._lock:
+            self.entries[key]["blocks"].append(block)
+            self._unsaved += 1
+            if self._unsaved >= self.save_every or time.monotonic() - self._saved_at >= self.save_seconds:
+                self._save()
+
+    def flush(self):
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def clear(self, key):
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+
+
+def uncommitted_blocks(blob_client):
+    """IDs of blocks staged on the service but not yet committed"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        _, uncommitted = blob_client.get_block_list("uncommitted")
+    except ResourceNotFoundError:
+        return set()
+    return {block.id for block in uncommitted}
+
+
+def remote_properties(blob_client):
+    """(size, content_md5) of a blob, or None if it does not exist"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        props = blob_client.get_blob_properties()
+    except ResourceNotFoundError:
+        return None
+    md5 = props.content_settings.content_md5
+    return props.size, bytes(md5) if md5 else None
+
+
+def is_unchanged(blob_client, path, size):
+    """True if the blob already holds this file (size first, then MD5)"""
+    remote = remote_properties(blob_client)
+    if remote is None or remote[0] != size or remote[1] is None:
+        return False
+    return remote[1] == file_md5(path)
+
+
+def upload_blocks(blob_client, path, block_size=BLOCK_SIZE, max_concurrency=MAX_CONCURRENCY,
+                  checkpoint=None):
+    """
+    Single read pass: hash each block and stage it on the thread pool
+
+    At most max_concurrency blocks are held in memory at once. With a
+    checkpoint, blocks staged by an earlier interrupted run are hashed but
+    not sent again. Returns the MD5 of the whole file, which is stored as
+    the blob's Content-MD5.
+    """
+    from azure.storage.blob import BlobBlock, ContentSettings
+
+    key = blob_client.url
+    done = set()
+    if checkpoint is not None:
+        fingerprint = UploadCheckpoint.fingerprint(path, block_size)
+        done = checkpoint.staged(key, fingerprint)
+        if done:
+            done &= uncommitted_blocks(blob_client)
+            print(f"  Resuming {blob_client.blob_name}: {len(done)} blocks already staged")
+
+    md5 = hashlib.md5()
+    in_flight = threading.BoundedSemaphore(max_concurrency)
+    futures = []
+    block_ids = []
+
+    def stage(block, data):
+        try:
+            blob_client.stage_block(block, data, length=len(data))
+            if checkpoint is not None:
+                checkpoint.mark(key, block)
+        finally:
+            in_flight.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool, open(path, "rb") as f:
+            for index, data in enumerate(iter(lambda: f.read(block_size), b"")):
+                md5.update(data)
+                block = block_id(index)
+                block_ids.append(block)
+                if block in done:
+                    continue
+                in_flight.acquire()
+                futures.append(pool.submit(stage, block, data))
+            for future in futures:
+                future.result()
+    finally:
+        # Keep what was staged, also on errors and Ctrl+C
+        if checkpoint is not None:
+            checkpoint.flush()
+
+    digest = md5.digest()
+    blob_client.commit_block_list(
+        [BlobBlock(block_id=b) for b in block_ids],
+        content_settings=ContentSettings(content_md5=bytearray(digest)),
+    )
+    if checkpoint is not None:
+        checkpoint.clear(key)
+    return digest
+
+
+def copy_blob(source_client, dest_client, poll_seconds=COPY_POLL_SECONDS):
+    """Server-side copy within the account; waits until the copy finishes"""
+    dest_client.start_copy_from_url(source_client.url)
+    while True:
+        copy = dest_client.get_blob_properties().copy
+        if copy.status != "pending":
+            break
+        time.sleep(poll_seconds)
+    if copy.status != "success":
+        raise RuntimeError(f"Copy to {dest_client.container_name}/{dest_client.blob_name} {copy.status}")
+
+
+def upload_file(path, blob_name, containers, account=session.STORAGE_ACCOUNT,
+                block_size=BLOCK_SIZE, max_concurrency=MAX_CONCURRENCY, checkpoint=None):
+    """
+    Upload one file to the first container and copy it to the others
+
+    Returns one result dict per container:
+    {"container", "blob", "action": uploaded|copied|skipped, "bytes", "seconds"}
+    """
+    service = session.blob_service_client(account)
+    size = os.path.getsize(path)
+    source = service.get_blob_client(containers[0], blob_name)
+    results = []
+
+    start = time.perf_counter()
+    if is_unchanged(source, path, size):
+        action = "skipped"
+    else:
+        upload_blocks(source, path, block_size, max_concurrency, checkpoint)
+        action = "uploaded"
+    results.append({"container": containers[0], "blob": blob_name, "action": action,
+                    "bytes": size, "seconds": time.perf_counter() - start})
+
+    for container in containers[1:]:
+        start = time.perf_counter()
+        dest = service.get_blob_client(container, blob_name)
+        if action == "skipped" and is_unchanged(dest, path, size):
+            copy_action = "skipped"
+        else:
+            copy_blob(source, dest)
+            copy_action = "copied"
+        results.append({"container": container, "blob": blob_name, "action": copy_action,
+                        "bytes": size, "seconds": time.perf_counter() - start})
+    return results
+
+
+def upload_files(mappings=FILE_MAPPINGS, data_path=DATA_PATH, account=session.STORAGE_ACCOUNT,
+                 file_workers=FILE_WORKERS, blob_prefix="", **kwargs):
+    """
+    Upload {relative_path: [containers]} with file_workers files in parallel
+
+    Relative paths (under data_path) become the blob names, optionally under
+    blob_prefix. Returns the flat list of per-container results; a file that
+    fails is reported with action "failed" instead of stopping the others.
+    """
+    def run(item):
+        name, containers = item
+        path = os.path.join(data_path, name)
+        blob_name = "/".join(p for p in (blob_prefix, name.replace(os.sep, "/")) if p)
+        try:
+            results = upload_file(path, blob_name, containers, account, **kwargs)
+        except Exception as e:
+            results = [{"container": c, "blob": blob_name, "action": "failed",
+                        "bytes": 0, "seconds": 0.0, "error": str(e)} for c in containers]
+        for r in results:
+            marker = "✗" if r["action"] == "failed" else "✓"
+            detail = r.get("error") or f"{r['bytes'] / 1_048_576:,.1f} MB in {r['seconds']:.1f}s"
+            print(f"  {marker} {r['action']:<8} {r['container']}/{r['blob']} ({detail})")
+        return results
+
+    with ThreadPoolExecutor(max_workers=file_workers) as pool:
+        return [r for results in pool.map(run, mappings.items()) for r in results]
+
+
+def upload_tree(local_dir, container, blob_prefix, suffix=".parquet", **kwargs):
+    """Upload every *suffix file under local_dir to container/blob_prefix/..."""
+    mappings = {}
+    for root, _, files in os.walk(local_dir):
+        for filename in sorted(files):
+            if filename.endswith(suffix):
+                mappings[os.path.relpath(os.path.join(root, filename), local_dir)] = [container]
+    return upload_files(mappings, local_dir, blob_prefix=blob_prefix, **kwargs)
+
+
+def summarize(results):
+    counts = {}
+    for r in results:
+        counts[r["action"]] = counts.get(r["action"], 0) + 1
+    sent = sum(r["bytes"] for r in results if r["action"] == "uploaded")
+    return counts, sent
+
+
+def main():
+    """Upload the 5 source files to the Data Lake"""
+    parser = argparse.ArgumentParser(description="Parallel block uploads to ADLS Gen2")
+    parser.add_argument("--data-path", default=DATA_PATH)
+    parser.add_argument("--block-mb", type=int, default=BLOCK_SIZE // 1_048_576)
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--file-workers", type=int, default=FILE_WORKERS)
+    parser.add_argument("--no-resume", action="store_true", help="Do not use the block checkpoint")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"UPLOAD: {len(FILE_MAPPINGS)} files → {session.STORAGE_ACCOUNT}")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    results = upload_files(
+        FILE_MAPPINGS, args.data_path, file_workers=args.file_workers,
+        block_size=args.block_mb * 1_048_576, max_concurrency=args.max_concurrency,
+        checkpoint=None if args.no_resume else UploadCheckpoint(),
+    )
+    counts, sent = summarize(results)
+    print()
+    print(f"{counts} — {sent / 1_048_576:,.1f} MB sent in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Normalized Load: Payroll rows as integer-keyed facts + dictionary dimensions
+
+NYC_Payroll_Data stores EmployeeID, TitleCode and AgencyID as
+varchar(10) and repeats LastName, FirstName, AgencyName and
+TitleDescription on every row.
+
+This loader adds a key-mapping stage in front of the inserts
+(scripts/sql/05_create_normalized_payroll.sql):
+- Every distinct attribute combination (e.g. AgencyID + AgencyName) gets an
+  integer surrogate key; the dimension row is stored once
+- Low-cardinality text (borough, leave status, pay basis) is
+  dictionary-encoded into smallint keys the same way
+- Keys already in the database are reused, so surrogate keys stay stable
+  across reloads; only the fact table is rebuilt
+- vw_NYC_Payroll_Data rebuilds the original 19-column layout for existing queries
+
+Dimensions hold full attribute combinations, so the view returns exactly the
+rows that were loaded (an employee whose name changed gets two keys).
+
+WHY THIS MATTERS:
+A fact row shrinks from ~200 bytes of varchar to ~80 bytes of fixed-width
+numbers, and joins/aggregations compare integers instead of strings.
+
+Usage:
+    python normalized_load.py                      # SQLite stand-in
+    python normalized_load.py --backend azure
+    python bulk_loader.py --layout normalized      # same thing
+    python normalized_load.py --data-path ../../data/synthetic  # generate_payroll.py output
+"""
+
+import argparse
+import csv
+import os
+import re
+import time
+
+from bulk_loader import (
+    BATCH_ROWS,
+    DATA_PATH,
+    PROJECT_ROOT,
+    SQLITE_PATH,
+    insert_statement,
+    iter_batches,
+    load_table_definitions,
+    make_backend,
+    make_row_converter,
+)
+from partitioned_load import payroll_files
+from schema_registry import CANONICAL_SCHEMAS
+
+# Configuration
+NORMALIZED_DDL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "05_create_normalized_payroll.sql")
+FACT_TABLE = "NYC_Payroll_Fact"
+VIEW_NAME = "vw_NYC_Payroll_Data"
+CREATE_VIEW_PATTERN = re.compile(r"CREATE VIEW .*?;", re.DOTALL)
+
+PAYROLL_FILES = ["nycpayroll_2020.csv", "nycpayroll_2021.csv"]
+
+# (dimension table, surrogate key column, attribute columns)
+DIMENSIONS = [
+    ("NYC_Payroll_Agency_Dim", "AgencyKey", ("AgencyID", "AgencyName")),
+    ("NYC_Payroll_Employee_Dim", "EmployeeKey", ("EmployeeID", "LastName", "FirstName")),
+    ("NYC_Payroll_Title_Dim", "TitleKey", ("TitleCode", "TitleDescription")),
+    ("NYC_Payroll_Borough_Dim", "BoroughKey", ("WorkLocationBorough",)),
+    ("NYC_Payroll_LeaveStatus_Dim", "LeaveStatusKey", ("LeaveStatusasofJune30",)),
+    ("NYC_Payroll_PayBasis_Dim", "PayBasisKey", ("PayBasis",)),
+]
+
+
+class KeyMap:
+    """
+    Dictionary encoder for one dimension
+
+    Maps an attribute tuple to its integer key, assigning the next key to
+    unseen tuples. New dimension rows are buffered until flush().
+    """
+
+    def __init__(self, table, key_column, attributes):
+        self.table = table
+        self.key_column = key_column
+        self.attributes = attributes
+        self.keys = {}
+        self.next_key = 1
+        self.pending = []
+
+    def load_existing(self, backend):
+        columns = ", ".join((self.key_column,) + self.attributes)
+        for row in backend.fetchall(f"SELECT {columns} FROM {self.table}"):
+            self.keys[tuple(row[1:])] = row[0]
+            self.next_key = max(self.next_key, row[0] + 1)
+
+    def key_for(self, values):
+        key = self.keys.get(values)
+        if key is None:
+            key = self.next_key
+            self.next_key += 1
+            self.keys[values] = key
+            self.pending.append((key,) + values)
+        return key
+
+    def flush(self, backend, definition):
+        if self.pending:
+            backend.insert_batch(insert_statement(backend, self.table, definition["columns"]), self.pending)
+            self.pending = []
+
+
+def make_fact_mapper(key_maps, fact_columns, source_columns):
+    """
+    Build a function that turns a typed payroll row into a fact row
+
+    Attribute columns are replaced by their dimension key; every other fact
+    column is copied from the source row by name.
+    """
+    source_positions = {name: i for i, name in enumerate(source_columns)}
+    key_plans = {
+        km.key_column: (km, [source_positions[a] for a in km.attributes]) for km in key_maps
+    }
+    plan = []
+    for name, _ in fact_columns:
+        if name in key_plans:
+            plan.append(key_plans[name])
+        else:
+            plan.append((None, source_positions[name]))
+
+    def to_fact(row):
+        return tuple(
+            km.key_for(tuple(row[i] for i in positions)) if km is not None else row[positions]
+            for km, positions in plan
+        )
+
+    return to_fact
+
+
+def create_view(backend, ddl_path=NORMALIZED_DDL_SCRIPT):
+    """(Re)create the compatibility view; [dbo]. is dropped for SQLite"""
+    with open(ddl_path, encoding="utf-8") as f:
+        statement = CREATE_VIEW_PATTERN.search(f.read()).group(0).rstrip(";")
+    if backend.name == "sqlite":
+        statement = statement.replace("[dbo].", "")
+    backend.execute(f"DROP VIEW IF EXISTS {VIEW_NAME}")
+    backend.execute(statement)
+
+
+def load_normalized(backend, files=PAYROLL_FILES, data_path=DATA_PATH, batch_rows=BATCH_ROWS):
+    """
+    Rebuild NYC_Payroll_Fact from the payroll files
+
+    Dimensions are kept (and extended), so existing surrogate keys never
+    change. Returns a stats dict per file.
+    """
+    definitions = load_table_definitions(NORMALIZED_DDL_SCRIPT)
+    for table, _, _ in DIMENSIONS:
+        backend.create_table(table, definitions[table])
+    backend.recreate_table(FACT_TABLE, definitions[FACT_TABLE])
+
+    key_maps = [KeyMap(*dimension) for dimension in DIMENSIONS]
+    for km in key_maps:
+        km.load_existing(backend)
+
+    source_columns = CANONICAL_SCHEMAS["payroll"]
+    fact_columns = definitions[FACT_TABLE]["columns"]
+    to_fact = make_fact_mapper(key_maps, fact_columns, [name for name, _ in source_columns])
+    fact_sql = insert_statement(backend, FACT_TABLE, fact_columns)
+    results = []
+
+    for filename in files:
+        start = time.perf_counter()
+        rows = 0
+        with open(os.path.join(data_path, filename), newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            convert = make_row_converter(next(reader), source_columns)
+            for batch in iter_batches(reader, convert, batch_rows):
+                facts = [to_fact(row) for row in batch]
+                for km in key_maps:
+                    km.flush(backend, definitions[km.table])
+                backend.insert_batch(fact_sql, facts)
+                rows += len(facts)
+        backend.commit()
+        elapsed = time.perf_counter() - start
+        results.append({"file": filename, "rows": rows, "seconds": elapsed,
+                        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf")})
+
+    create_view(backend)
+    backend.commit()
+    for km in key_maps:
+        print(f"  {km.table:<30} {len(km.keys):>8,} keys")
+    return results
+
+
+def run(backend_name="sqlite", sqlite_path=SQLITE_PATH, batch_rows=BATCH_ROWS, files=PAYROLL_FILES,
+        data_path=DATA_PATH):
+    """Load files under data_path into the selected backend and print the per-file stats"""
+    print("=" * 80)
+    print(f"NORMALIZED LOAD: payroll → {FACT_TABLE} + dimensions ({backend_name})")
+    print("=" * 80)
+    print()
+
+    backend = make_backend(backend_name, sqlite_path)
+    try:
+        results = load_normalized(backend, files, data_path, batch_rows)
+    finally:
+        backend.close()
+
+    print()
+    for r in results:
+        print(f"✓ {r['file']:<25} {r['rows']:>12,} rows {r['rows_per_sec']:>14,.0f} rows/sec")
+    print(f"✓ Compatibility view: {VIEW_NAME}")
+    return results
+
+
+def main():
+    """Load the payroll files into the normalized layout"""
+    parser = argparse.ArgumentParser(description="Load payroll files as integer-keyed facts")
+    parser.add_argument("--backend", choices=["sqlite", "azure"], default="sqlite")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--data-path", default=DATA_PATH,
+                        help="Folder holding the payroll CSVs, e.g. generate_payroll.py output")
+    parser.add_argument("files", nargs="*", help="Payroll CSVs under --data-path (default: every nycpayroll_*.csv)")
+    args = parser.parse_args()
+
+    files = args.files or payroll_files(args.data_path)
+    run(args.backend, args.sqlite_path, args.batch_rows, files, args.data_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+OPENROWSET Cache: Local results for repeat Synapse serverless queries
+
+Synapse serverless bills by bytes scanned, and the OPENROWSET queries in
+13_query_synapse_openrowset.py re-scan every dirstaging/part-*.csv file on
+each call, even when nothing in the lake has changed.
+
+This cache:
+- Keys each result on the normalized SQL text (comments stripped,
+  whitespace collapsed outside string literals and quoted identifiers)
+  plus the name + ETag of every lake file the BULK paths match
+- Lists the matched files with one prefix-filtered blob listing per path
+  (metadata only, nothing is scanned)
+- Stores results as Parquet files under .openrowset_cache/
+- Evicts least-recently-used results once the cache exceeds MAX_CACHE_BYTES
+
+When the pipeline rewrites the staging folder the ETags change, so the key
+changes and the next call goes to Synapse; the stale entry ages out.
+
+WHY THIS MATTERS:
+Repeat dashboard queries are served instantly and cost nothing.
+
+Usage (from any script in this folder):
+    import openrowset_cache
+    df, hit = openrowset_cache.read_sql(query)
+
+    python openrowset_cache.py --stats
+    python openrowset_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+
+import azure_session as session
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".openrowset_cache")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+BULK_PATTERN = re.compile(r"BULK\s+'([^']+)'", re.IGNORECASE)
+URL_PATTERN = re.compile(r"https://([^.]+)\.(?:dfs|blob)\.core\.windows\.net/([^/]+)/(.*)")
+# String literals and quoted identifiers are kept verbatim, comments dropped
+SQL_TOKEN_PATTERN = re.compile(
+    r"""'(?:[^']|'')*'|\[(?:[^\]]|\]\])*\]|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/|\s+|[^'"\[\s/-]+|.""",
+    re.DOTALL,
+)
+WILDCARDS = "*?["
+
+
+def normalize_sql(sql):
+    """
+    Strip comments and collapse whitespace so formatting does not change the key
+
+    '...' literals, [...] and "..." identifiers are left untouched, so
+    WHERE AgencyName = 'A  B' and 'A B' stay different queries and a --
+    inside a literal is not a comment.
+    """
+    tokens = []
+    for token in SQL_TOKEN_PATTERN.findall(sql):
+        if token.startswith(("--", "/*")) or token.isspace():
+            if tokens and tokens[-1] != " ":
+                tokens.append(" ")
+        else:
+            tokens.append(token)
+    return "".join(tokens).strip()
+
+
+def bulk_paths(sql):
+    """(account, container, path pattern) for every BULK '...' in the query"""
+    paths = []
+    for url in BULK_PATTERN.findall(sql):
+        match = URL_PATTERN.match(url)
+        if not match:
+            raise ValueError(f"Unsupported BULK location: {url}")
+        paths.append(match.groups())
+    return paths
+
+
+def path_regex(pattern):
+    """
+    OPENROWSET wildcard semantics: * stays inside one folder, ** crosses folders
+
+    A pattern ending in / (a folder) matches everything below it.
+    """
+    if pattern.endswith("/"):
+        pattern += "**"
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+        c = pattern[i]
+        negate = c == "[" and pattern[i + 1:i + 2] in ("!", "^")
+        # A ] right after [ (or [!) is part of the set, as in fnmatch
+        close = pattern.find("]", i + 2 + negate) if c == "[" else -1
+        if c == "*":
+            regex.append("[^/]*")
+        elif c == "?":
+            regex.append("[^/]")
+        elif close != -1:
+            body = pattern[i + 1 + negate:close].replace("\\", "\\\\").replace("[", "\\[")
+            regex.append(("[^" if negate else "[") + body + "]")
+            i = close
+        else:
+            regex.append(re.escape(c))
+        i += 1
+    return re.compile("^" + "".join(regex) + "$")
+
+
+def listing_prefix(pattern):
+    """Longest literal prefix, used as name_starts_with"""
+    cut = min((pattern.index(c) for c in WILDCARDS if c in pattern), default=len(pattern))
+    return pattern[:cut]
+
+
+def matched_files(sql):
+    """Sorted [(account/container/blob, etag)] for all files the query reads"""
+    files = []
+    for account, container, pattern in bulk_paths(sql):
+        client = session.blob_service_client(account).get_container_client(container)
+        regex = path_regex(pattern)
+        for blob in client.list_blobs(name_starts_with=listing_prefix(pattern)):
+            if regex.match(blob.name):
+                files.append((f"{account}/{container}/{blob.name}", blob.etag.strip('"')))
+    return sorted(files)
+
+
+def cache_key(sql, files):
+    payload = json.dumps({"sql": normalize_sql(sql), "files": files})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+
+def load(key, cache_dir=CACHE_DIR):
+    """Cached DataFrame for a key (marking it recently used), or None"""
+    import pyarrow.parquet as pq
+
+    path = cache_path(key, cache_dir)
+    if not os.path.exists(path):
+        return None
+    os.utime(path)
+    return pq.read_table(path).to_pandas()
+
+
+def store(key, df, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(key, cache_dir)
+    tmp = f"{path}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="snappy")
+    os.replace(tmp, path)
+    evict(cache_dir, max_bytes)
+
+
+def entries(cache_dir=CACHE_DIR):
+    """[(path, size, last_used)] oldest first"""
+    if not os.path.isdir(cache_dir):
+        return []
+    found = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            path = os.path.join(cache_dir, name)
+            stat = os.stat(path)
+            found.append((path, stat.st_size, stat.st_mtime))
+    return sorted(found, key=lambda e: e[2])
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Delete least-recently-used results until the cache fits in max_bytes"""
+    cached = entries(cache_dir)
+    total = sum(size for _, size, _ in cached)
+    removed = 0
+    for path, size, _ in cached:
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def read_sql(sql, target="synapse", cache_dir=CACHE_DIR):
+    """
+    Run an OPENROWSET query through the cache
+
+    Returns (DataFrame, hit). A miss runs the query on a pooled connection
+    (sql_pool.py) and stores the result.
+    """
+    import pandas as pd
+
+    import sql_pool
+
+    key = cache_key(sql, matched_files(sql))
+    df = load(key, cache_dir)
+    if df is not None:
+        return df, True
+
+    df = sql_pool.run(target, lambda conn: pd.read_sql(sql, conn))
+    store(key, df, cache_dir)
+    return df, False
+
+
+def main():
+    """Show or clear the local OPENROWSET cache"""
+    parser = argparse.ArgumentParser(description="Local OPENROWSET result cache")
+    parser.add_argument("--stats", action="store_true", help="Show cached results")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached result")
+    args = parser.parse_args()
+
+    cached = entries()
+    if args.clear:
+        for path, _, _ in cached:
+            os.remove(path)
+        print(f"✓ Removed {len(cached)} cached results")
+        return
+
+    total = sum(size for _, size, _ in cached)
+    print(f"{len(cached)} cached results, {total / 1_048_576:.1f} MB of {MAX_CACHE_BYTES / 1_048_576:.0f} MB")
+    if args.stats:
+        for path, size, _ in reversed(cached):
+            print(f"  {os.path.basename(path)[:16]}  {size:>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Parquet Landing Zone: Convert payroll CSVs to partitioned Parquet
+
+02_upload_data.py lands raw CSV text, so every reader (Data Flows, Synapse
+OPENROWSET, the SQL loaders) re-parses every byte of every file.
+
+This stage converts data/nycpayroll_*.csv into a Parquet landing zone:
+- Hive-style partitions: FiscalYear=<year>/AgencyID=<id>/part-<n>.parquet
+- Snappy compression, typed columns, row-group min/max statistics
+- Headers are resolved through schema_registry (the 2021 AgencyCode header
+  becomes AgencyID) so every year shares one schema
+
+WHY THIS MATTERS:
+- Partition folders let Synapse prune by year/agency with filepath()
+- Columnar storage lets readers fetch only the columns they need
+- Row-group statistics let readers skip row groups that cannot match a filter
+
+partitioned_load.py --from-parquet loads NYC_Payroll_Data from the landing
+zone instead of the CSVs, reading only the FiscalYear partitions it reloads.
+
+The landing zone is uploaded to dirpayrollfiles/payroll_parquet by
+02_upload_data.py and queried by 13_query_synapse_openrowset.py.
+
+Usage:
+    python parquet_landing.py
+    python parquet_landing.py --output /tmp/landing data/nycpayroll_2021.csv
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+from schema_registry import CANONICAL_SCHEMAS, canonical_header, read_header
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+PAYROLL_PATTERN = "nycpayroll_*.csv"
+LANDING_PATH = os.path.join(DATA_PATH, "landing", "payroll")
+
+# Data Lake location of the landing zone (used by 02 and 13)
+LANDING_CONTAINER = "dirpayrollfiles"
+LANDING_FOLDER = "payroll_parquet"
+
+PARTITION_COLUMNS = ["FiscalYear", "AgencyID"]
+COMPRESSION = "snappy"
+READ_BLOCK_BYTES = 16 << 20
+ROW_GROUP_ROWS = 1_000_000
+
+ARROW_TYPES = {
+    "int": pa.int32(),
+    "float": pa.float64(),
+    "varchar": pa.string(),
+    "date": pa.date32(),
+}
+
+PAYROLL_SCHEMA = pa.schema([(name, ARROW_TYPES[t]) for name, t in CANONICAL_SCHEMAS["payroll"]])
+
+
+def csv_column_types(header):
+    """Arrow types for the raw CSV columns (dates parsed as timestamps first)"""
+    types = {}
+    for name, canonical in zip(header, canonical_header(header)):
+        if canonical not in PAYROLL_SCHEMA.names:
+            continue
+        field = PAYROLL_SCHEMA.field(canonical)
+        types[name] = pa.timestamp("s") if pa.types.is_date(field.type) else field.type
+    return types
+
+
+def iter_payroll_batches(path):
+    """
+    Stream one payroll CSV as record batches in PAYROLL_SCHEMA
+
+    Renames drifted headers and casts dates, one block at a time.
+    """
+    header = read_header(path)
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=READ_BLOCK_BYTES),
+        convert_options=pacsv.ConvertOptions(
+            column_types=csv_column_types(header),
+            timestamp_parsers=["%m/%d/%Y"],
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        names = canonical_header(batch.schema.names)
+        table = pa.Table.from_batches([batch]).rename_columns(names)
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in names
+            else pa.nulls(table.num_rows, field.type)
+            for field in PAYROLL_SCHEMA
+        ]
+        yield from pa.Table.from_arrays(columns, schema=PAYROLL_SCHEMA).to_batches()
+
+
+def convert_to_parquet(paths, output_path=LANDING_PATH):
+    """
+    Write all payroll files into one partitioned Parquet dataset
+
+    All files go through a single write so partitions shared by several
+    files (e.g. late records for an earlier year) are written together.
+    Partitions present in this run replace the previous copy.
+    """
+    def all_batches():
+        for path in paths:
+            yield from iter_payroll_batches(path)
+
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression=COMPRESSION,
+        write_statistics=True,
+    )
+    ds.write_dataset(
+        all_batches(),
+        output_path,
+        schema=PAYROLL_SCHEMA,
+        format="parquet",
+        file_options=file_options,
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=ROW_GROUP_ROWS,
+        existing_data_behavior="delete_matching",
+    )
+
+
+def open_landing(landing_path=LANDING_PATH):
+    """The landing zone as a pyarrow dataset (partition columns typed as in PAYROLL_SCHEMA)"""
+    partitioning = ds.partitioning(
+        pa.schema([PAYROLL_SCHEMA.field(name) for name in PARTITION_COLUMNS]), flavor="hive"
+    )
+    return ds.dataset(landing_path, format="parquet", partitioning=partitioning)
+
+
+def iter_landing_batches(landing_path=LANDING_PATH, years=None, columns=None, batch_rows=None):
+    """
+    Stream record batches from the landing zone
+
+    With years, only the FiscalYear=<year> folders are opened (partition
+    pruning); the other partitions are never read.
+    """
+    dataset = open_landing(landing_path)
+    scan_filter = ds.field("FiscalYear").isin(list(years)) if years else None
+    options = {"batch_size": batch_rows} if batch_rows else {}
+    yield from dataset.to_batches(columns=columns, filter=scan_filter, **options)
+
+
+def summarize_landing(output_path=LANDING_PATH):
+    """Return (file_count, total_bytes, partition_count) for the landing zone"""
+    files = glob.glob(os.path.join(output_path, "**", "*.parquet"), recursive=True)
+    partitions = {os.path.dirname(f) for f in files}
+    return len(files), sum(os.path.getsize(f) for f in files), len(partitions)
+
+
+def main():
+    """Convert the local payroll CSVs into the Parquet landing zone"""
+    parser = argparse.ArgumentParser(description="Convert payroll CSVs to partitioned Parquet")
+    parser.add_argument("files", nargs="*", help="Payroll CSVs (default: data/nycpayroll_*.csv)")
+    parser.add_argument("--output", default=LANDING_PATH)
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(os.path.join(DATA_PATH, PAYROLL_PATTERN)))
+
+    print("=" * 80)
+    print("PARQUET LANDING ZONE: CSV → Parquet (snappy, partitioned)")
+    print("=" * 80)
+    print()
+    for path in paths:
+        print(f"Source: {os.path.basename(path)}")
+    print(f"Target: {args.output}")
+    print(f"Partitions: {'/'.join(c + '=' for c in PARTITION_COLUMNS)}")
+    print()
+
+    start = time.perf_counter()
+    convert_to_parquet(paths, args.output)
+    elapsed = time.perf_counter() - start
+
+    csv_bytes = sum(os.path.getsize(p) for p in paths)
+    files, parquet_bytes, partitions = summarize_landing(args.output)
+    print(f"✓ {files} Parquet files in {partitions} partitions ({elapsed:.2f}s)")
+    print(f"✓ CSV bytes: {csv_bytes:,} → Parquet bytes: {parquet_bytes:,}")
+    print()
+    print(f"Next: Upload with 02_upload_data.py (→ {LANDING_CONTAINER}/{LANDING_FOLDER})")
+
+
+if __name__ == "__main__":
+    main()
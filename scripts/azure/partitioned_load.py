@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Partitioned Load: Every payroll year into one FiscalYear-partitioned table
+
+The per-year tables NYC_Payroll_Data_2020 and NYC_Payroll_Data_2021 (now
+retired) meant a new table, dataset and data flow for every new year.
+
+This loader uses scripts/sql/07_create_partitioned_payroll.sql instead
+(bulk_loader.py runs it for the payroll files):
+- NYC_Payroll_Data holds all years, one partition per FiscalYear
+- Rows are streamed into NYC_Payroll_Data_Stage (same partition scheme)
+- usp_Prepare_Payroll_Year adds the partition for a year the first time it
+  is seen and empties its staging partition
+- usp_Switch_Payroll_Year truncates the year's partition and switches the
+  staging partition in: a metadata operation, not DELETE + INSERT
+- Only the years present in the loaded files are replaced, once every file
+  is staged, so a year spread over several files keeps all its rows
+
+With --from-parquet the rows come from the Parquet landing zone
+(parquet_landing.py) instead; --years limits the read to those FiscalYear
+partition folders, so reloading one year never opens the others.
+
+The SQLite stand-in has no partitions; there the switch is emulated with
+DELETE + INSERT ... SELECT of the year inside one transaction.
+
+WHY THIS MATTERS:
+Reloading a year no longer logs a delete of every old row, a new year is a
+new file (not a new table), and WHERE FiscalYear = ... reads one partition.
+
+Usage:
+    python partitioned_load.py                     # SQLite stand-in
+    python partitioned_load.py --backend azure
+    python partitioned_load.py nycpayroll_2021.csv # reload one year
+    python partitioned_load.py --from-parquet --years 2021
+    python partitioned_load.py --data-path ../../data/synthetic  # generate_payroll.py output
+"""
+
+import argparse
+import csv
+import glob
+import os
+import re
+import time
+
+from bulk_loader import (
+    BATCH_ROWS,
+    DATA_PATH,
+    PAYROLL_TABLE,
+    PROJECT_ROOT,
+    SQLITE_PATH,
+    insert_statement,
+    iter_batches,
+    load_table_definitions,
+    make_backend,
+    make_row_converter,
+)
+from parquet_landing import LANDING_PATH, iter_landing_batches
+
+# Configuration
+PARTITIONED_DDL_SCRIPT = os.path.join(PROJECT_ROOT, "scripts", "sql", "07_create_partitioned_payroll.sql")
+TABLE = PAYROLL_TABLE
+STAGE_TABLE = "NYC_Payroll_Data_Stage"
+GO_PATTERN = re.compile(r"^\s*GO\s*$", re.MULTILINE | re.IGNORECASE)
+
+PAYROLL_FILES = ["nycpayroll_2020.csv", "nycpayroll_2021.csv"]
+PAYROLL_PATTERN = "nycpayroll_*.csv"
+
+
+def deploy_schema(backend, definitions, ddl_path=PARTITIONED_DDL_SCRIPT):
+    """Create the partitioned objects (Azure: run the whole idempotent script)"""
+    if backend.name == "azure":
+        with open(ddl_path, encoding="utf-8") as f:
+            for batch in GO_PATTERN.split(f.read()):
+                sql = "\n".join(line for line in batch.splitlines() if not line.startswith("--")).strip()
+                if sql:
+                    backend.execute(sql)
+    else:
+        backend.create_table(TABLE, definitions[TABLE])
+        backend.create_table(STAGE_TABLE, definitions[STAGE_TABLE])
+    backend.commit()
+
+
+def prepare_year(backend, year):
+    """Give the year its own partition and an empty staging partition"""
+    if backend.name == "azure":
+        backend.execute("EXEC [dbo].[usp_Prepare_Payroll_Year] ?", (year,))
+    else:
+        backend.execute(f'DELETE FROM "{STAGE_TABLE}" WHERE FiscalYear = ?', (year,))
+
+
+def switch_year(backend, year):
+    """Replace the year's rows in NYC_Payroll_Data with the staged rows"""
+    if backend.name == "azure":
+        backend.execute("EXEC [dbo].[usp_Switch_Payroll_Year] ?", (year,))
+    else:
+        backend.execute(f'DELETE FROM "{TABLE}" WHERE FiscalYear = ?', (year,))
+        backend.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{STAGE_TABLE}" WHERE FiscalYear = ?', (year,))
+        backend.execute(f'DELETE FROM "{STAGE_TABLE}" WHERE FiscalYear = ?', (year,))
+    backend.commit()
+
+
+def stage_batches(backend, batches, definition, label, prepared=()):
+    """
+    Insert batches of typed rows into the staging table
+
+    A year is prepared the first time one of its rows is seen, so the input
+    may hold any number of fiscal years; years in prepared were already
+    staged by an earlier input of the same load and keep their rows.
+    Returns {year: rows}.
+    """
+    year_index = [name for name, _ in definition["columns"]].index("FiscalYear")
+    sql = insert_statement(backend, STAGE_TABLE, definition["columns"])
+    years = {}
+
+    for batch in batches:
+        for row in batch:
+            year = row[year_index]
+            if year not in years:
+                if year is None:
+                    raise ValueError(f"{label}: row without FiscalYear")
+                if year not in prepared:
+                    prepare_year(backend, year)
+                years[year] = 0
+            years[year] += 1
+        backend.insert_batch(sql, batch)
+    backend.commit()
+    return years
+
+
+def stage_file(backend, csv_path, definition, batch_rows=BATCH_ROWS, prepared=()):
+    """Stream one CSV into the staging table; returns {year: rows}"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        convert = make_row_converter(next(reader), definition["columns"])
+        return stage_batches(backend, iter_batches(reader, convert, batch_rows), definition,
+                             os.path.basename(csv_path), prepared)
+
+
+def parquet_rows(batches, columns):
+    """Arrow record batches → lists of parameter tuples in table column order"""
+    for batch in batches:
+        values = []
+        for name, sql_type in columns:
+            column = batch.column(name).to_pylist()
+            if sql_type == "date":
+                column = [None if d is None else d.isoformat() for d in column]
+            values.append(column)
+        yield list(zip(*values))
+
+
+def stage_parquet(backend, landing_path, definition, years=None, batch_rows=BATCH_ROWS):
+    """
+    Stream the Parquet landing zone into the staging table; returns {year: rows}
+
+    With years, only those FiscalYear partitions are read.
+    """
+    columns = definition["columns"]
+    batches = iter_landing_batches(landing_path, years, [name for name, _ in columns], batch_rows)
+    return stage_batches(backend, parquet_rows(batches, columns), definition, landing_path)
+
+
+def switch_years(backend, years):
+    for year in sorted(years):
+        switch_year(backend, year)
+
+
+def payroll_files(data_path=DATA_PATH):
+    """Names of every payroll extract in data_path, oldest year first"""
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(data_path, PAYROLL_PATTERN)))
+
+
+def load_partitioned(backend, files=PAYROLL_FILES, data_path=DATA_PATH, batch_rows=BATCH_ROWS):
+    """
+    Stage every file, then switch in every year they contained; returns stats per file
+
+    The switch runs once, after the last file: a year spread over several
+    files (late records for an earlier year) is switched in with all its
+    rows. switch_seconds is that one switch, shared by every file.
+    """
+    definitions = load_table_definitions(PARTITIONED_DDL_SCRIPT)
+    deploy_schema(backend, definitions)
+    results, staged_years = [], set()
+
+    for filename in files:
+        start = time.perf_counter()
+        years = stage_file(backend, os.path.join(data_path, filename), definitions[STAGE_TABLE], batch_rows,
+                           staged_years)
+        staged_years.update(years)
+        results.append({
+            "file": filename,
+            "years": years,
+            "rows": sum(years.values()),
+            "stage_seconds": time.perf_counter() - start,
+        })
+
+    start = time.perf_counter()
+    switch_years(backend, staged_years)
+    switch_seconds = time.perf_counter() - start
+    for r in results:
+        r["switch_seconds"] = switch_seconds
+    return results
+
+
+def load_from_parquet(backend, landing_path=LANDING_PATH, years=None, batch_rows=BATCH_ROWS):
+    """Stage the landing zone (only the given years, if any) and switch them in; stats as one result"""
+    definitions = load_table_definitions(PARTITIONED_DDL_SCRIPT)
+    deploy_schema(backend, definitions)
+
+    start = time.perf_counter()
+    staged_years = stage_parquet(backend, landing_path, definitions[STAGE_TABLE], years, batch_rows)
+    staged = time.perf_counter()
+    switch_years(backend, staged_years)
+    end = time.perf_counter()
+    return [{
+        "file": landing_path.replace(PROJECT_ROOT + os.sep, ""),
+        "years": staged_years,
+        "rows": sum(staged_years.values()),
+        "stage_seconds": staged - start,
+        "switch_seconds": end - staged,
+    }]
+
+
+def run(backend_name="sqlite", sqlite_path=SQLITE_PATH, batch_rows=BATCH_ROWS, files=PAYROLL_FILES,
+        parquet_path=None, years=None, data_path=DATA_PATH):
+    """Load into the selected backend (from CSVs, or the landing zone with parquet_path) and print the stats"""
+    print("=" * 80)
+    print(f"PARTITIONED LOAD: payroll → {TABLE} by FiscalYear ({backend_name})")
+    print("=" * 80)
+    print()
+
+    backend = make_backend(backend_name, sqlite_path)
+    try:
+        if parquet_path:
+            results = load_from_parquet(backend, parquet_path, years, batch_rows)
+        else:
+            results = load_partitioned(backend, files, data_path, batch_rows)
+    finally:
+        backend.close()
+
+    for r in results:
+        years = ", ".join(f"{year}: {rows:,}" for year, rows in sorted(r["years"].items()))
+        print(f"✓ {r['file']:<25} {r['rows']:>10,} rows  staged {r['stage_seconds']:.2f}s  ({years})")
+    switched = sorted(set().union(*(r["years"] for r in results)))
+    if results:
+        print(f"✓ switched {', '.join(map(str, switched))} in {results[0]['switch_seconds']:.3f}s")
+    return results
+
+
+def main():
+    """Load payroll files into the FiscalYear-partitioned table"""
+    parser = argparse.ArgumentParser(description="Load payroll files into NYC_Payroll_Data by partition switch")
+    parser.add_argument("--backend", choices=["sqlite", "azure"], default="sqlite")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--from-parquet", nargs="?", const=LANDING_PATH, metavar="PATH",
+                        help="Read the Parquet landing zone (parquet_landing.py) instead of CSVs")
+    parser.add_argument("--years", nargs="+", type=int, help="With --from-parquet: only these fiscal years")
+    parser.add_argument("--data-path", default=DATA_PATH,
+                        help="Folder holding the payroll CSVs, e.g. generate_payroll.py output")
+    parser.add_argument("files", nargs="*", help="Payroll CSVs under --data-path (default: every nycpayroll_*.csv)")
+    args = parser.parse_args()
+
+    if args.years and not args.from_parquet:
+        parser.error("--years needs --from-parquet")
+    files = args.files or payroll_files(args.data_path)
+    run(args.backend, args.sqlite_path, args.batch_rows, files, args.from_parquet, args.years, args.data_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local Summary Engine: Reproduce Dataflow_Summary_Aggregate without Spark
+
+Runs the same logic as the Dataflow_Summary_Aggregate data flow created by
+09_create_aggregation_dataflow.py, but on a single machine:
+- Union source2020 + source2021 by column name
+- Derive TotalPaid = RegularGrossPaid + TotalOTPaid + TotalOtherPay
+- Aggregate: Group by AgencyName, FiscalYear -> Sum TotalPaid
+
+WHY THIS MATTERS:
+Validating NYC_Payroll_Summary through ADF means waiting minutes for a Spark
+cluster to start. This engine reads data/nycpayroll_*.csv in fixed-size
+chunks of columnar NumPy arrays, so a recompute takes seconds and memory
+stays flat no matter how many rows the payroll files hold (only one chunk
+plus one accumulator per AgencyName/FiscalYear group is ever in memory).
+
+Usage:
+    python payroll_engine.py                         # print the summary
+    python payroll_engine.py --output summary.csv    # write it as CSV
+    python payroll_engine.py --expected part-0.csv   # check an ADF output
+"""
+
+import argparse
+import csv
+import glob
+import itertools
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from schema_registry import canonical_header
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+PAYROLL_PATTERN = "nycpayroll_*.csv"
+
+CHUNK_ROWS = 100_000
+
+# Columns used by Dataflow_Summary_Aggregate
+GROUP_BY = ("AgencyName", "FiscalYear")
+TOTAL_PAID_COLUMNS = ("RegularGrossPaid", "TotalOTPaid", "TotalOtherPay")
+
+# Tolerance when comparing against Spark output (different summation order)
+ABS_TOLERANCE = 0.005
+REL_TOLERANCE = 1e-9
+
+
+def default_payroll_files():
+    """Return the local payroll extracts in fiscal year order"""
+    return sorted(glob.glob(os.path.join(DATA_PATH, PAYROLL_PATTERN)))
+
+
+def iter_column_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a CSV file as columnar chunks
+
+    Yields one dict per chunk mapping canonical column name -> NumPy string
+    array. The header is resolved through schema_registry, so drifted names
+    (e.g. AgencyCode) still land in their canonical column. Columns missing
+    from the file yield None, which mirrors union(byName: true) filling
+    absent columns with nulls.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = canonical_header(next(reader))
+        positions = {name: i for i, name in enumerate(header)}
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                break
+
+            transposed = list(zip(*rows))
+            chunk = {}
+            for name in columns:
+                i = positions.get(name)
+                chunk[name] = None if i is None else np.array(transposed[i])
+            yield chunk
+
+
+def to_float(values, length):
+    """Convert a string column to float64, empty strings and nulls become NaN"""
+    if values is None:
+        return np.full(length, np.nan)
+    return np.where(values == "", "nan", values).astype(np.float64)
+
+
+def derive_total_paid(chunk, length):
+    """derive(TotalPaid = RegularGrossPaid + TotalOTPaid + TotalOtherPay)"""
+    total = np.zeros(length)
+    for name in TOTAL_PAID_COLUMNS:
+        total += to_float(chunk[name], length)
+    return total
+
+
+def parse_fiscal_year(value):
+    """FiscalYear as integer; empty strings become null like Spark"""
+    return int(value) if value != "" else None
+
+
+class SummaryAccumulator:
+    """
+    Running SUM(TotalPaid) per (AgencyName, FiscalYear)
+
+    Each chunk is reduced with np.unique + np.bincount, so the Python-level
+    work per chunk is proportional to the number of groups, not rows.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.rows = 0
+
+    def add_chunk(self, agency_names, fiscal_years, total_paid):
+        length = len(total_paid)
+        self.rows += length
+
+        if agency_names is None:
+            agency_names = np.full(length, "")
+        if fiscal_years is None:
+            fiscal_years = np.full(length, "")
+
+        # Dictionary-encode both keys within the chunk
+        names, name_codes = np.unique(agency_names, return_inverse=True)
+        years, year_codes = np.unique(fiscal_years, return_inverse=True)
+        group_keys = name_codes.astype(np.int64) * len(years) + year_codes
+        groups, group_codes = np.unique(group_keys, return_inverse=True)
+
+        # Spark's sum() ignores nulls; an all-null group stays null
+        valid = ~np.isnan(total_paid)
+        sums = np.bincount(group_codes[valid], weights=total_paid[valid], minlength=len(groups))
+        counts = np.bincount(group_codes[valid], minlength=len(groups))
+
+        for group, total, count in zip(groups, sums, counts):
+            name = str(names[group // len(years)])
+            year = parse_fiscal_year(str(years[group % len(years)]))
+            key = (name, year)
+            current = self.totals.get(key)
+            if count == 0:
+                self.totals.setdefault(key, None)
+            elif current is None:
+                self.totals[key] = float(total)
+            else:
+                self.totals[key] = current + float(total)
+
+    def results(self):
+        """Rows of (FiscalYear, AgencyName, TotalPaid) ordered like 03_verification_queries.sql"""
+        rows = [(year, name, total) for (name, year), total in self.totals.items()]
+        rows.sort(key=lambda r: (
+            r[0] is None, r[0] or 0,
+            r[2] is None, -(r[2] or 0.0),
+            r[1],
+        ))
+        return rows
+
+
+def compute_summary(paths=None, chunk_rows=CHUNK_ROWS):
+    """
+    Run union -> derive -> aggregate over the given payroll files
+
+    Returns (rows, row_count) where rows are (FiscalYear, AgencyName, TotalPaid).
+    """
+    paths = paths or default_payroll_files()
+    columns = GROUP_BY + TOTAL_PAID_COLUMNS
+    accumulator = SummaryAccumulator()
+
+    for path in paths:
+        for chunk in iter_column_chunks(path, columns, chunk_rows):
+            length = len(next(v for v in chunk.values() if v is not None))
+            accumulator.add_chunk(
+                chunk["AgencyName"],
+                chunk["FiscalYear"],
+                derive_total_paid(chunk, length),
+            )
+
+    return accumulator.results(), accumulator.rows
+
+
+def write_summary(rows, path):
+    """Write the summary in the NYC_Payroll_Summary column order"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["FiscalYear", "AgencyName", "TotalPaid"])
+        for year, name, total in rows:
+            writer.writerow(["" if year is None else year, name, "" if total is None else repr(total)])
+
+
+def read_summary(paths):
+    """Read one or more summary CSVs (e.g. dirstaging part files) into a dict"""
+    expected = {}
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                key = (record["AgencyName"], parse_fiscal_year(record["FiscalYear"]))
+                value = record["TotalPaid"]
+                expected[key] = float(value) if value != "" else None
+    return expected
+
+
+def compare_summary(rows, expected):
+    """
+    Compare computed rows against an expected summary
+
+    Returns a list of (key, computed, expected) for every mismatch,
+    including keys present on only one side.
+    """
+    computed = {(name, year): total for year, name, total in rows}
+    mismatches = []
+    for key in sorted(set(computed) | set(expected), key=lambda k: (k[1] or 0, k[0])):
+        a = computed.get(key, "missing")
+        b = expected.get(key, "missing")
+        if isinstance(a, float) and isinstance(b, float):
+            if math.isclose(a, b, rel_tol=REL_TOLERANCE, abs_tol=ABS_TOLERANCE):
+                continue
+        elif a == b:
+            continue
+        mismatches.append((key, a, b))
+    return mismatches
+
+
+def main():
+    """Recompute NYC_Payroll_Summary locally and optionally check it"""
+    parser = argparse.ArgumentParser(description="Local Dataflow_Summary_Aggregate engine")
+    parser.add_argument("files", nargs="*", help="Payroll CSVs (default: data/nycpayroll_*.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--output", help="Write the summary to this CSV file")
+    parser.add_argument("--expected", nargs="+", help="Summary CSV(s) to check against")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("LOCAL SUMMARY ENGINE: Dataflow_Summary_Aggregate")
+    print("=" * 80)
+    print()
+
+    start = time.perf_counter()
+    rows, row_count = compute_summary(args.files, args.chunk_rows)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Rows processed: {row_count:,}")
+    print(f"✓ Summary records: {len(rows)}")
+    print(f"✓ Elapsed: {elapsed:.2f}s ({row_count / max(elapsed, 1e-9):,.0f} rows/sec)")
+    print()
+
+    if args.output:
+        write_summary(rows, args.output)
+        print(f"✓ Summary written to {args.output}")
+    else:
+        print(f"{'FiscalYear':<12}{'AgencyName':<45}{'TotalPaid':>18}")
+        for year, name, total in rows:
+            total_text = "NULL" if total is None else f"{total:,.2f}"
+            print(f"{str(year):<12}{name:<45}{total_text:>18}")
+    print()
+
+    if args.expected:
+        mismatches = compare_summary(rows, read_summary(args.expected))
+        if mismatches:
+            print(f"✗ {len(mismatches)} mismatches against expected summary:")
+            for (name, year), computed, expected in mismatches:
+                print(f"  {year} | {name} | computed={computed} expected={expected}")
+            sys.exit(1)
+        print("✓ Summary matches expected output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Pipeline Monitor: Per-activity metrics of pl_NYC_Payroll_Pipeline runs
+
+After a debug run the only record of where the time went is the ADF Monitor
+UI, and pipeline_scheduler.py / compute_sizing.py have no history to learn from.
+
+This monitor:
+1. Triggers a run (or attaches to one with --run-id) and polls its status
+   with exponential backoff (POLL_INITIAL_SECONDS doubling up to POLL_MAX_SECONDS)
+2. Queries every activity run of the pipeline run, ForEach iterations included
+3. Reads each data flow activity's output: rows read and written, stage
+   timings per sink, sink processing time, cluster start-up (compute
+   acquisition) and queue time where ADF reports one
+4. Appends one JSON object per activity run to .pipeline_run_history.jsonl,
+   optionally mirrored to Parquet (--parquet)
+
+Load_File iterations are recorded under their load_manifest.json activity
+label (resolved from the sink table the iteration wrote), so every entry has
+its own history although all of them run the same df_Load_Generic flow.
+Each record carries the content hash of the live pipeline definition
+(`deploy`), so runs before and after a deploy can be compared. A run attached
+with --run-id only gets the hash if the pipeline was last published before
+the run started; otherwise the definition it ran is unknown and deploy is None.
+
+WHY THIS MATTERS:
+The history shows which stage dominates wall-clock time (cluster start-up,
+a shuffle stage, the sink write) and catches regressions between deploys.
+pipeline_scheduler.py reads the durations and compute_sizing.py calibrates
+throughput and start-up time from the same records.
+
+Usage:
+    python pipeline_monitor.py                     # trigger a run and record it
+    python pipeline_monitor.py --run-id <run id>   # attach to an existing run
+    python pipeline_monitor.py --parquet           # also rewrite the Parquet copy
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import azure_session as session
+from adf_deploy import content_hash
+from pipeline_scheduler import (
+    LOAD_ACTIVITIES,
+    HISTORY_PATH,
+    INTEGRATION_RUNTIME,
+    PIPELINE_NAME,
+    PROJECT_ROOT,
+    RUNTIME_COMPUTE,
+    load_manifest,
+)
+
+# Configuration
+RESOURCE_GROUP = session.RESOURCE_GROUP
+DATA_FACTORY = session.DATA_FACTORY
+PARQUET_PATH = os.path.join(PROJECT_ROOT, ".pipeline_run_history.parquet")
+
+POLL_INITIAL_SECONDS = 10
+POLL_BACKOFF = 2.0
+POLL_MAX_SECONDS = 120
+RUN_TIMEOUT_SECONDS = 4 * 3600
+TERMINAL_STATUSES = {"Succeeded", "Failed", "Cancelled"}
+
+# Where a queue duration (ms) may appear in an activity output
+QUEUE_KEYS = ("queueDuration", "queueingDuration", "queuingDuration")
+
+
+def seconds(ms):
+    return None if ms is None else ms / 1000
+
+
+def trigger_run(adf_client, pipeline=PIPELINE_NAME, resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    return adf_client.pipelines.create_run(resource_group, factory, pipeline).run_id
+
+
+def pipeline_definition(adf_client, pipeline=PIPELINE_NAME, resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    """
+    (short content hash, last publish time or None) of the live pipeline definition
+
+    The hash is the one adf_deploy.py computes; lastPublishTime is left out
+    of it, since it changes on every publish.
+    """
+    properties = dict(adf_client.pipelines.get(resource_group, factory, pipeline).serialize()["properties"])
+    published = properties.pop("lastPublishTime", None)
+    if isinstance(published, str):
+        published = datetime.fromisoformat(published.replace("Z", "+00:00"))
+    return content_hash(properties)[:12], published
+
+
+def attached_deploy(deploy, published, run_start):
+    """
+    deploy label of a run started elsewhere (--run-id)
+
+    The live definition is the one the run executed only if it was published
+    before the run started; None when it changed later or the time is unknown.
+    """
+    if published is None or run_start is None or published > run_start:
+        return None
+    return deploy
+
+
+def wait_for_run(adf_client, run_id, timeout=RUN_TIMEOUT_SECONDS,
+                 resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    """
+    Poll the pipeline run until it reaches a terminal status
+
+    The delay doubles from POLL_INITIAL_SECONDS up to POLL_MAX_SECONDS and
+    starts over when the status changes. Raises TimeoutError after timeout.
+    """
+    deadline = time.monotonic() + timeout
+    attempt, status = 0, None
+    while True:
+        run = adf_client.pipeline_runs.get(resource_group, factory, run_id)
+        if run.status != status:
+            print(f"  {datetime.now():%H:%M:%S}  {run.status}")
+            attempt, status = 0, run.status
+        if run.status in TERMINAL_STATUSES:
+            return run
+        delay = min(POLL_MAX_SECONDS, POLL_INITIAL_SECONDS * POLL_BACKOFF ** attempt)
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(f"run {run_id} still {run.status} after {timeout}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+def query_activity_runs(adf_client, run, resource_group=RESOURCE_GROUP, factory=DATA_FACTORY):
+    """Every activity run of a pipeline run, following continuation tokens"""
+    from azure.mgmt.datafactory.models import RunFilterParameters
+
+    start = run.run_start or datetime.now(timezone.utc)
+    filters = RunFilterParameters(
+        last_updated_after=start - timedelta(hours=1),
+        last_updated_before=(run.run_end or datetime.now(timezone.utc)) + timedelta(hours=1),
+    )
+    activity_runs = []
+    while True:
+        response = adf_client.activity_runs.query_by_pipeline_run(resource_group, factory, run.run_id, filters)
+        activity_runs.extend(response.value)
+        if not response.continuation_token:
+            return activity_runs
+        filters.continuation_token = response.continuation_token
+
+
+def dataflow_metrics(output):
+    """
+    Metrics of one ExecuteDataFlow output (runStatus)
+
+    Rows read are counted once per source, although each sink reports the
+    sources feeding it.
+    """
+    run_status = (output or {}).get("runStatus") or {}
+    rows_read, rows_written, stages, sink_ms = {}, 0, [], 0
+    for sink, metrics in (run_status.get("metrics") or {}).items():
+        for source, source_metrics in (metrics.get("sources") or {}).items():
+            rows_read[source] = max(rows_read.get(source, 0), source_metrics.get("rowsRead") or 0)
+        rows_written += metrics.get("rowsWritten") or 0
+        sink_ms += (metrics.get("sinkProcessingTime") or 0) + (metrics.get("sinkPostProcessingTime") or 0)
+        for stage in metrics.get("stages") or []:
+            stages.append({"sink": sink, "stage": stage.get("stage"), "seconds": seconds(stage.get("time"))})
+
+    queue_ms = next((run_status[key] for key in QUEUE_KEYS if run_status.get(key) is not None), None)
+    for detail in (output or {}).get("executionDetails") or []:
+        durations = detail.get("detailedDurations") or {}
+        queue_ms = next((durations[key] * 1000 for key in QUEUE_KEYS if durations.get(key) is not None), queue_ms)
+
+    return {
+        "rows_read": sum(rows_read.values()) if run_status else None,
+        "rows_written": rows_written if run_status else None,
+        "stages": stages,
+        "sink_seconds": seconds(sink_ms) if run_status else None,
+        "cluster_startup_seconds": seconds(run_status.get("computeAcquisitionDuration")),
+        "queue_seconds": seconds(queue_ms),
+        "integration_runtime": (output or {}).get("effectiveIntegrationRuntime"),
+    }
+
+
+def dataflow_input(activity_run):
+    """
+    (dataset parameters, compute) the activity run was started with
+
+    Activities on the dedicated runtime carry no compute block; theirs is
+    the runtime's size.
+    """
+    run_input = activity_run.input or {}
+    dataflow = run_input.get("dataflow") or run_input.get("dataFlow") or {}
+    compute = run_input.get("compute")
+    if not compute and (run_input.get("integrationRuntime") or {}).get("referenceName") == INTEGRATION_RUNTIME:
+        compute = RUNTIME_COMPUTE
+    return dataflow.get("datasetParameters") or {}, compute or {}
+
+
+def manifest_activity(activity_run, manifest):
+    """
+    load_manifest.json activity label of a Load_File / Load_Year iteration
+
+    Matched on the source file, since every payroll year stages into the
+    same table; falls back to the activity's own name if unresolved.
+    """
+    parameters, _ = dataflow_input(activity_run)
+    table = (parameters.get("sink") or {}).get("tableName")
+    file_name = (parameters.get("source") or {}).get("fileName")
+    for entry in manifest["loads"]:
+        if entry["fileName"] == file_name or (file_name is None and entry["tableName"] == table):
+            return entry["activity"]
+    return activity_run.activity_name
+
+
+def run_records(run, activity_runs, manifest, deploy=None):
+    """History records (one per activity run) in start order"""
+    never = datetime.max.replace(tzinfo=timezone.utc)
+    records = []
+    for activity_run in sorted(activity_runs, key=lambda a: a.activity_run_start or never):
+        record = {
+            "run_id": run.run_id,
+            "pipeline": run.pipeline_name,
+            "deploy": deploy,
+            "run_start": run.run_start.isoformat() if run.run_start else None,
+            "activity": activity_run.activity_name,
+            "activity_type": activity_run.activity_type,
+            "status": activity_run.status,
+            "start": activity_run.activity_run_start.isoformat() if activity_run.activity_run_start else None,
+            "duration_seconds": seconds(activity_run.duration_in_ms),
+        }
+        if activity_run.activity_type == "ExecuteDataFlow":
+            if activity_run.activity_name in LOAD_ACTIVITIES:
+                record["activity"] = manifest_activity(activity_run, manifest)
+            _, compute = dataflow_input(activity_run)
+            record.update(core_count=compute.get("coreCount"), compute_type=compute.get("computeType"))
+            record.update(dataflow_metrics(activity_run.output))
+        if activity_run.error and activity_run.error.get("message"):
+            record["error"] = activity_run.error["message"]
+        records.append(record)
+    return records
+
+
+def append_history(records, path=HISTORY_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def export_parquet(history_path=HISTORY_PATH, parquet_path=PARQUET_PATH):
+    """Rewrite the Parquet copy of the whole JSONL history; stages stay a JSON string column"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with open(history_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    rows = [{**{column: record.get(column) for column in columns},
+             "stages": json.dumps(record.get("stages") or [])} for record in records]
+    tmp = f"{parquet_path}.tmp"
+    pq.write_table(pa.Table.from_pylist(rows), tmp, compression="snappy")
+    os.replace(tmp, parquet_path)
+    return len(records)
+
+
+def breakdown(record):
+    """[(component, seconds)] of one data flow record, largest first"""
+    parts = [
+        ("cluster start-up", record.get("cluster_startup_seconds")),
+        ("queue", record.get("queue_seconds")),
+        ("sink write", record.get("sink_seconds")),
+    ]
+    parts += [(f"stage {s['stage']} ({s['sink']})", s["seconds"]) for s in record.get("stages") or []]
+    parts = [(name, value) for name, value in parts if value]
+    return sorted(parts, key=lambda part: -part[1])
+
+
+def print_report(run, records):
+    print(f"Run {run.run_id}: {run.status} in {seconds(run.duration_in_ms) or 0:.0f}s")
+    print()
+    for r in records:
+        duration = f"{r['duration_seconds']:.0f}s" if r["duration_seconds"] is not None else "-"
+        line = f"  {r['activity']:<28} {r['status']:<10} {duration:>7}"
+        if r["activity_type"] == "ExecuteDataFlow":
+            rows = "-" if r["rows_read"] is None else f"{r['rows_read']:,} → {r['rows_written']:,} rows"
+            line += f"  {r['core_count'] or '-'} cores  {rows}"
+        print(line)
+        parts = breakdown(r)
+        if parts and r["duration_seconds"]:
+            name, value = parts[0]
+            print(f"    dominated by {name}: {value:.0f}s ({value / r['duration_seconds']:.0%})")
+        if r.get("error"):
+            print(f"    ✗ {r['error'][:200]}")
+    print()
+
+
+def main():
+    """Trigger or attach to a pipeline run and record its activity metrics"""
+    parser = argparse.ArgumentParser(description="Monitor a pipeline run and record per-activity metrics")
+    parser.add_argument("--run-id", help="Attach to this run instead of triggering one")
+    parser.add_argument("--pipeline", default=PIPELINE_NAME)
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSONL activity run history")
+    parser.add_argument("--parquet", nargs="?", const=PARQUET_PATH, help="Also write the history as Parquet")
+    parser.add_argument("--timeout", type=int, default=RUN_TIMEOUT_SECONDS)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"PIPELINE MONITOR: {args.pipeline} ({DATA_FACTORY})")
+    print("=" * 80)
+    print()
+
+    print("Authenticating...")
+    adf_client = session.adf_client()
+    print("Authenticated successfully")
+    print()
+
+    deploy, published = pipeline_definition(adf_client, args.pipeline)
+    if args.run_id:
+        run_id = args.run_id
+        print(f"Attaching to run {run_id}")
+    else:
+        run_id = trigger_run(adf_client, args.pipeline)
+        print(f"✓ Triggered run {run_id} (deploy {deploy})")
+    run = wait_for_run(adf_client, run_id, args.timeout)
+    if args.run_id:
+        deploy = attached_deploy(deploy, published, run.run_start)
+        print(f"  deploy {deploy}" if deploy else
+              "  deploy not recorded: the pipeline was published after the run started (or at an unknown time)")
+    print()
+
+    records = run_records(run, query_activity_runs(adf_client, run), load_manifest(), deploy)
+    print_report(run, records)
+
+    append_history(records, args.history)
+    print(f"✓ {len(records)} activity runs appended to {args.history}")
+    if args.parquet:
+        total = export_parquet(args.history, args.parquet)
+        print(f"✓ {total} records written to {args.parquet}")
+
+    if run.status != "Succeeded":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Pipeline Scheduler: Derive pl_NYC_Payroll_Pipeline from data flow reads/writes
+
+10_create_main_pipeline.py used to chain the activities by hand:
+Load_2021_Payroll waited for Load_2020_Payroll and both payroll loads waited
+for the three master loads, although none of them reads what the others write.
+
+This scheduler:
+1. Reads each data flow's sources and sinks from JSON/dataflow and resolves
+   the datasets (JSON/dataset) to the physical table or lake file
+2. Adds an edge A → B only when B reads what A writes, or both write the
+   same target (in ACTIVITIES order), then drops transitively implied edges
+3. Emits the pipeline with that (widest legal) parallelism
+4. Simulates the makespan from past activity durations
+   (.pipeline_run_history.jsonl, one JSON object per activity run) for the
+   deployed pipeline (JSON/pipeline, either layout) and the derived manifest
+   pipeline, with an optional cap on concurrently running activities
+
+Manifest layout (what 10_create_main_pipeline.py deploys): the file loads are
+the entries of load_manifest.json, run by one ForEach (batchCount at a time);
+each entry's reads/writes are its file and table. Master files go through the
+parameterized df_Load_Generic flow. Entries with fiscalYears are payroll
+files: they are staged by df_Load_Payroll_Year and every year they list is
+switched into the FiscalYear-partitioned NYC_Payroll_Data
+(07_create_partitioned_payroll.sql), so a new year is a new manifest line.
+fiscalYears lists every year the file carries (late records for earlier
+years included); the flow fails on a row of an unlisted year rather than
+staging it where no switch would pick it up. Activities after the loads
+(POST_LOAD_ACTIVITIES) wait for the ForEach only if they read one of its
+tables. Entries must load distinct tables (or distinct years of
+NYC_Payroll_Data), since ForEach iterations run concurrently.
+
+WHY THIS MATTERS:
+Every data flow activity spends minutes on cluster start-up. Running the five
+independent loads side by side leaves only load → aggregate on the critical path.
+
+Usage:
+    python pipeline_scheduler.py                   # derived edges + simulated makespan
+    python pipeline_scheduler.py --max-parallel 2
+    python pipeline_scheduler.py --write-json      # write the manifest pipeline to JSON/pipeline/
+"""
+
+import argparse
+import json
+import os
+import statistics
+
+import azure_session as session
+from adf_deploy import JSON_PATH, PROJECT_ROOT, load_json_artifacts
+from partitioned_load import STAGE_TABLE as PAYROLL_STAGE_TABLE, TABLE as PAYROLL_TABLE
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOAD_MANIFEST_PATH = os.path.join(SCRIPT_DIR, "load_manifest.json")
+PIPELINE_NAME = "pl_NYC_Payroll_Pipeline"
+PIPELINE_JSON = os.path.join(JSON_PATH, "pipeline", f"{PIPELINE_NAME}.json")
+HISTORY_PATH = os.path.join(PROJECT_ROOT, ".pipeline_run_history.jsonl")
+DEFAULT_DURATION = 300.0  # seconds, for activities without history
+
+# Activity -> data flow it runs, in program order (order decides write/write conflicts)
+# One-data-flow-per-file layout (08 --per-file); payroll files only load through the manifest
+ACTIVITIES = [
+    ("Load_AgencyMaster", "df_Load_AgencyMaster"),
+    ("Load_EmpMaster", "df_Load_EmpMaster"),
+    ("Load_TitleMaster", "df_Load_TitleMaster"),
+    ("Aggregate_Payroll_Summary", "Dataflow_Summary_Aggregate"),
+]
+
+# Manifest layout: one ForEach over load_manifest.json, then these activities
+LOAD_DATAFLOW = "df_Load_Generic"
+YEAR_DATAFLOW = "df_Load_Payroll_Year"
+FOREACH_ACTIVITY = "Load_Manifest_Files"
+FOREACH_INNER_ACTIVITY = "Load_File"
+# Payroll-year branch inside the ForEach: prepare partition → stage → switch
+YEAR_BRANCH_ACTIVITY = "If_Payroll_Year"
+YEAR_LOAD_ACTIVITY = "Load_Year"
+PREPARE_YEAR_ACTIVITY = ("Prepare_Years", "[dbo].[usp_Prepare_Payroll_Years]")
+SWITCH_YEAR_ACTIVITY = ("Switch_Years", "[dbo].[usp_Switch_Payroll_Years]")
+# Pipeline expression for the procedures and the flow: the item's years as "2020,1998"
+ITEM_YEARS = "@join(item().fiscalYears, ',')"
+LOAD_ACTIVITIES = (FOREACH_INNER_ACTIVITY, YEAR_LOAD_ACTIVITY)
+POST_LOAD_ACTIVITIES = [
+    ("Aggregate_Payroll_Summary", "Dataflow_Summary_Aggregate"),
+]
+SOURCE_LINKED_SERVICE = "ls_AdlsGen2"
+SINK_LINKED_SERVICE = "ls_SqlDatabase"
+MAX_BATCH_COUNT = 50  # ADF limit for a parallel ForEach
+
+ACTIVITY_POLICY = {
+    "timeout": "0.12:00:00",
+    "retry": 0,
+    "retryIntervalInSeconds": 30,
+    "secureOutput": False,
+    "secureInput": False,
+}
+DEFAULT_COMPUTE = {"coreCount": 8, "computeType": "General"}
+# Data flow runtime with cluster TTL (01_create_infrastructure.py / provision_async.py)
+# and its fixed cluster size; ADF applies activity-level compute on AutoResolve only
+INTEGRATION_RUNTIME = session.INTEGRATION_RUNTIME
+RUNTIME_COMPUTE = session.DATAFLOW_COMPUTE
+
+
+def load_definitions(json_path=JSON_PATH):
+    """({data flow: properties}, {dataset: properties}) from the JSON/ folder"""
+    dataflows, datasets = {}, {}
+    for artifact in load_json_artifacts(json_path):
+        if artifact.kind == "dataflow":
+            dataflows[artifact.name] = artifact.properties
+        elif artifact.kind == "dataset":
+            datasets[artifact.name] = artifact.properties
+    return dataflows, datasets
+
+
+def dataset_target(name, datasets):
+    """
+    Physical object behind a dataset
+
+    Two datasets pointing at the same table or file are the same target.
+    Unknown datasets fall back to their own name.
+    """
+    properties = datasets.get(name)
+    if properties is None:
+        return ("dataset", name)
+    linked_service = properties["linkedServiceName"]["referenceName"]
+    type_properties = properties.get("typeProperties", {})
+    if "location" in type_properties:
+        location = type_properties["location"]
+        return (linked_service, location.get("fileSystem"), location.get("folderPath"), location.get("fileName"))
+    return (linked_service, type_properties.get("schema", "dbo"), type_properties.get("table"))
+
+
+def dataflow_io(dataflow, datasets):
+    """(reads, writes): sets of targets of a data flow's sources and sinks"""
+    type_properties = dataflow["typeProperties"]
+    reads = {dataset_target(s["dataset"]["referenceName"], datasets) for s in type_properties.get("sources", [])}
+    writes = {dataset_target(s["dataset"]["referenceName"], datasets) for s in type_properties.get("sinks", [])}
+    return reads, writes
+
+
+def transitive_reduction(dependencies):
+    """Drop edges already implied by a longer path; dependencies must be acyclic"""
+    ancestors = {}
+
+    def reach(name):
+        if name not in ancestors:
+            ancestors[name] = set()
+            for dep in dependencies[name]:
+                ancestors[name] |= {dep} | reach(dep)
+        return ancestors[name]
+
+    reduced = {}
+    for name, deps in dependencies.items():
+        implied = set().union(*(reach(dep) for dep in deps)) if deps else set()
+        reduced[name] = [dep for dep in deps if dep not in implied]
+    return reduced
+
+
+def conflict_dependencies(order, io):
+    """
+    {activity: [activities it must wait for]}
+
+    B waits for an earlier A if B reads A's output (read after write), writes
+    what A reads (write after read) or writes what A writes (write after write).
+    """
+    dependencies = {}
+    for i, name in enumerate(order):
+        reads, writes = io[name]
+        dependencies[name] = [
+            earlier for earlier in order[:i]
+            if io[earlier][1] & (reads | writes) or io[earlier][0] & writes
+        ]
+    return transitive_reduction(dependencies)
+
+
+def derive_dependencies(activities=ACTIVITIES, json_path=JSON_PATH):
+    """Dependencies of the one-data-flow-per-file layout"""
+    dataflows, datasets = load_definitions(json_path)
+    io = {name: dataflow_io(dataflows[dataflow], datasets) for name, dataflow in activities}
+    return conflict_dependencies([name for name, _ in activities], io)
+
+
+def load_manifest(path=LOAD_MANIFEST_PATH):
+    """
+    {"batchCount", "loads": [{"activity", "fileSystem", "fileName", "tableName"[, "fiscalYears"]}]}
+
+    Raises ValueError if two entries load the same table (or the same year
+    of PAYROLL_TABLE), entries with fiscalYears and entries loading
+    PAYROLL_TABLE are not the same entries, fiscalYears is not a non-empty
+    list of years, or batchCount is outside 1..MAX_BATCH_COUNT.
+    """
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    for entry in manifest["loads"]:
+        if ("fiscalYears" in entry) != (entry["tableName"] == PAYROLL_TABLE):
+            raise ValueError(f"{name}: {entry['activity']}: fiscalYears is required for {PAYROLL_TABLE} "
+                             f"and only allowed there (it loads {entry['tableName']})")
+        years = entry.get("fiscalYears", [0])
+        if not years or not all(isinstance(year, int) for year in years):
+            raise ValueError(f"{name}: {entry['activity']}: fiscalYears must be a non-empty list of years")
+    targets = [
+        f"{entry['tableName']} FiscalYear {year}" if "fiscalYears" in entry else entry["tableName"]
+        for entry in manifest["loads"]
+        for year in entry.get("fiscalYears", [None])
+    ]
+    duplicates = sorted({target for target in targets if targets.count(target) > 1})
+    if duplicates:
+        raise ValueError(f"{name}: tables loaded by more than one entry: {', '.join(duplicates)}")
+    if not 1 <= manifest["batchCount"] <= MAX_BATCH_COUNT:
+        raise ValueError(f"{name}: batchCount must be 1..{MAX_BATCH_COUNT}")
+    return manifest
+
+
+def manifest_io(entry):
+    """(reads, writes) of one manifest entry, as dataset_target tuples"""
+    reads = {(SOURCE_LINKED_SERVICE, entry["fileSystem"], None, entry["fileName"])}
+    writes = {(SINK_LINKED_SERVICE, "dbo", entry["tableName"])}
+    if "fiscalYears" in entry:
+        writes.add((SINK_LINKED_SERVICE, "dbo", PAYROLL_STAGE_TABLE))
+    return reads, writes
+
+
+def derive_manifest_dependencies(manifest, post_activities=POST_LOAD_ACTIVITIES, json_path=JSON_PATH):
+    """Dependencies of the ForEach layout: FOREACH_ACTIVITY + post-load activities"""
+    dataflows, datasets = load_definitions(json_path)
+    entries = [manifest_io(entry) for entry in manifest["loads"]]
+    io = {FOREACH_ACTIVITY: (set().union(*(r for r, _ in entries)), set().union(*(w for _, w in entries)))}
+    io.update({name: dataflow_io(dataflows[dataflow], datasets) for name, dataflow in post_activities})
+    return conflict_dependencies([FOREACH_ACTIVITY] + [name for name, _ in post_activities], io)
+
+
+def pipeline_dependencies(pipeline):
+    """{activity: [activities it waits for]} of an existing pipeline's properties"""
+    return {
+        activity["name"]: [d["activity"] for d in activity.get("dependsOn", [])]
+        for activity in pipeline["activities"]
+    }
+
+
+def fits_runtime(compute, runtime_compute=RUNTIME_COMPUTE):
+    """True if the dedicated runtime's clusters are at least as big as compute (None = no sizing)"""
+    return compute is None or (
+        compute["computeType"] == runtime_compute["computeType"]
+        and compute["coreCount"] <= runtime_compute["coreCount"]
+    )
+
+
+def placement(compute, integration_runtime=INTEGRATION_RUNTIME):
+    """
+    (compute, integration_runtime) to emit for one sized activity
+
+    An activity whose sizing fits the dedicated runtime runs there without a
+    compute block (the runtime's size applies and the warm cluster is
+    reused). A bigger one runs on AutoResolve with its own compute: a cold
+    cluster, but the size it was given.
+    """
+    if integration_runtime and fits_runtime(compute):
+        return None, integration_runtime
+    return compute, None
+
+
+def build_activity(name, dataflow, depends_on, compute=None, integration_runtime=INTEGRATION_RUNTIME):
+    """
+    ExecuteDataFlow activity on integration_runtime, or on AutoResolve with
+    compute (DEFAULT_COMPUTE if None) when integration_runtime is None
+
+    Never both: on a named runtime ADF ignores activity-level compute.
+    """
+    activity = {
+        "name": name,
+        "type": "ExecuteDataFlow",
+        "dependsOn": [{"activity": dep, "dependencyConditions": ["Succeeded"]} for dep in depends_on],
+        "policy": dict(ACTIVITY_POLICY),
+        "typeProperties": {
+            "dataFlow": {"referenceName": dataflow, "type": "DataFlowReference"},
+            "traceLevel": "Fine",
+        },
+    }
+    if integration_runtime:
+        activity["typeProperties"]["integrationRuntime"] = {
+            "referenceName": integration_runtime,
+            "type": "IntegrationRuntimeReference",
+        }
+    else:
+        activity["typeProperties"]["compute"] = dict(compute or DEFAULT_COMPUTE)
+    return activity
+
+
+def build_sized_activity(name, dataflow, depends_on, compute, integration_runtime=INTEGRATION_RUNTIME):
+    """build_activity on the runtime placement() picks for compute"""
+    compute, integration_runtime = placement(compute, integration_runtime)
+    return build_activity(name, dataflow, depends_on, compute, integration_runtime)
+
+
+def build_pipeline(dependencies, activities=ACTIVITIES, compute=None, integration_runtime=INTEGRATION_RUNTIME):
+    """
+    Pipeline resource for create_or_update
+
+    compute: optional {activity: {"coreCount", "computeType"}}. Activities
+    that fit the integration_runtime's size (or have no sizing) run on it;
+    bigger ones run on AutoResolve with their compute (see placement()).
+    integration_runtime=None puts every activity on AutoResolve.
+    """
+    compute = compute or {}
+    return {
+        "properties": {
+            "activities": [
+                build_sized_activity(name, dataflow, dependencies[name], compute.get(name), integration_runtime)
+                for name, dataflow in activities
+            ],
+            "annotations": [],
+        }
+    }
+
+
+def build_procedure_activity(name, procedure, depends_on):
+    """SqlServerStoredProcedure activity called with @FiscalYears = ITEM_YEARS (e.g. '2020,1998')"""
+    return {
+        "name": name,
+        "type": "SqlServerStoredProcedure",
+        "dependsOn": [{"activity": dep, "dependencyConditions": ["Succeeded"]} for dep in depends_on],
+        "policy": dict(ACTIVITY_POLICY),
+        "linkedServiceName": {"referenceName": SINK_LINKED_SERVICE, "type": "LinkedServiceReference"},
+        "typeProperties": {
+            "storedProcedureName": procedure,
+            "storedProcedureParameters": {
+                "FiscalYears": {"value": {"value": ITEM_YEARS, "type": "Expression"}, "type": "String"},
+            },
+        },
+    }
+
+
+def build_load_activity(name, dataflow, depends_on, table, integration_runtime=INTEGRATION_RUNTIME):
+    """
+    ExecuteDataFlow for one manifest item: file from @item(), sink table as given
+
+    Runs on integration_runtime; with None, on AutoResolve with the compute
+    from @item() (a runtime reference cannot vary per item).
+    """
+    activity = build_activity(
+        name, dataflow, depends_on,
+        {
+            "coreCount": {"value": "@item().coreCount", "type": "Expression"},
+            "computeType": {"value": "@item().computeType", "type": "Expression"},
+        },
+        integration_runtime,
+    )
+    activity["typeProperties"]["dataFlow"]["datasetParameters"] = {
+        "source": {
+            "fileSystem": {"value": "@item().fileSystem", "type": "Expression"},
+            "fileName": {"value": "@item().fileName", "type": "Expression"},
+        },
+        "sink": {"tableName": table},
+    }
+    return activity
+
+
+def build_manifest_pipeline(manifest, dependencies, post_activities=POST_LOAD_ACTIVITIES, compute=None,
+                            integration_runtime=INTEGRATION_RUNTIME):
+    """
+    Pipeline resource for the ForEach layout
+
+    The manifest becomes the loadManifest array parameter. The loads run on
+    integration_runtime, whose cluster size applies to every item (use
+    oversized() to find entries whose sizing exceeds it); with
+    integration_runtime=None each item carries its coreCount/computeType
+    (compute[entry activity] or DEFAULT_COMPUTE) for AutoResolve instead.
+    Post-load activities are placed by their own sizing (see placement()).
+    Items with fiscalYears take the payroll-year branch: prepare each
+    year's partition, stage the whole file, switch the partitions in. The
+    procedures take schema locks, so concurrent items wait on each other
+    there, never during the staging load itself.
+    """
+    compute = compute or {}
+    items = [
+        dict(entry) if integration_runtime else {**entry, **(compute.get(entry["activity"]) or DEFAULT_COMPUTE)}
+        for entry in manifest["loads"]
+    ]
+    load_file = build_load_activity(
+        FOREACH_INNER_ACTIVITY, LOAD_DATAFLOW, [],
+        {"value": "@item().tableName", "type": "Expression"}, integration_runtime,
+    )
+    prepare_name, prepare_procedure = PREPARE_YEAR_ACTIVITY
+    switch_name, switch_procedure = SWITCH_YEAR_ACTIVITY
+    load_year = build_load_activity(
+        YEAR_LOAD_ACTIVITY, YEAR_DATAFLOW, [prepare_name], PAYROLL_STAGE_TABLE, integration_runtime,
+    )
+    load_year["typeProperties"]["dataFlow"]["parameters"] = {
+        "fiscalYears": {"value": ITEM_YEARS, "type": "Expression"},
+    }
+    branch = {
+        "name": YEAR_BRANCH_ACTIVITY,
+        "type": "IfCondition",
+        "dependsOn": [],
+        "typeProperties": {
+            "expression": {"value": "@contains(item(), 'fiscalYears')", "type": "Expression"},
+            "ifTrueActivities": [
+                build_procedure_activity(prepare_name, prepare_procedure, []),
+                load_year,
+                build_procedure_activity(switch_name, switch_procedure, [YEAR_LOAD_ACTIVITY]),
+            ],
+            "ifFalseActivities": [load_file],
+        },
+    }
+    foreach = {
+        "name": FOREACH_ACTIVITY,
+        "type": "ForEach",
+        "dependsOn": [{"activity": dep, "dependencyConditions": ["Succeeded"]}
+                      for dep in dependencies[FOREACH_ACTIVITY]],
+        "typeProperties": {
+            "items": {"value": "@pipeline().parameters.loadManifest", "type": "Expression"},
+            "isSequential": False,
+            "batchCount": manifest["batchCount"],
+            "activities": [branch],
+        },
+    }
+    return {
+        "properties": {
+            "activities": [foreach] + [
+                build_sized_activity(name, dataflow, dependencies[name], compute.get(name), integration_runtime)
+                for name, dataflow in post_activities
+            ],
+            "parameters": {
+                "loadManifest": {"type": "array", "defaultValue": items},
+            },
+            "annotations": [],
+        }
+    }
+
+
+def oversized(manifest, compute, runtime_compute=RUNTIME_COMPUTE):
+    """Manifest entries whose sizing needs more than the runtime the ForEach loads share"""
+    return [
+        entry["activity"] for entry in manifest["loads"]
+        if not fits_runtime(compute.get(entry["activity"]), runtime_compute)
+    ]
+
+
+def load_history(path=HISTORY_PATH):
+    """{activity: [durations in seconds]} of succeeded runs in the JSONL history"""
+    history = {}
+    if not os.path.exists(path):
+        return history
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("status") == "Succeeded" and record.get("duration_seconds") is not None:
+                history.setdefault(record["activity"], []).append(float(record["duration_seconds"]))
+    return history
+
+
+def estimate_durations(names, history, default=DEFAULT_DURATION):
+    """Median past duration per activity (default when never seen)"""
+    return {name: statistics.median(history[name]) if history.get(name) else default for name in names}
+
+
+def critical_path(dependencies, durations):
+    """(length in seconds, [activities]) of the longest dependency chain"""
+    finish, previous = {}, {}
+
+    def finish_time(name):
+        if name not in finish:
+            deps = dependencies[name]
+            slowest = max(deps, key=finish_time) if deps else None
+            previous[name] = slowest
+            finish[name] = (finish_time(slowest) if slowest else 0.0) + durations[name]
+        return finish[name]
+
+    last = max(dependencies, key=finish_time)
+    path = [last]
+    while previous[path[-1]]:
+        path.append(previous[path[-1]])
+    return finish[last], path[::-1]
+
+
+def simulate(dependencies, durations, max_parallel=None):
+    """
+    List-schedule the activities
+
+    Ready activities start in order of their remaining critical path, at most
+    max_parallel at a time (None = unlimited). Returns {"makespan",
+    "schedule": {activity: (start, end)}}.
+    """
+    dependents = {name: [] for name in dependencies}
+    for name, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(name)
+
+    remaining = {}
+
+    def tail(name):
+        if name not in remaining:
+            remaining[name] = durations[name] + max((tail(d) for d in dependents[name]), default=0.0)
+        return remaining[name]
+
+    waiting = {name: set(deps) for name, deps in dependencies.items()}
+    ready = [name for name, deps in waiting.items() if not deps]
+    running, schedule, clock = [], {}, 0.0
+
+    while ready or running:
+        ready.sort(key=tail, reverse=True)
+        while ready and (max_parallel is None or len(running) < max_parallel):
+            name = ready.pop(0)
+            schedule[name] = (clock, clock + durations[name])
+            running.append(name)
+        clock = min(schedule[name][1] for name in running)
+        for name in [n for n in running if schedule[n][1] == clock]:
+            running.remove(name)
+            for child in dependents[name]:
+                waiting[child].discard(name)
+                if not waiting[child]:
+                    ready.append(child)
+
+    return {"makespan": max(end for _, end in schedule.values()), "schedule": schedule}
+
+
+def simulate_manifest(manifest, dependencies, durations, max_parallel=None):
+    """
+    Simulate the ForEach layout
+
+    The ForEach lasts as long as its entries take batchCount at a time
+    (entry durations keyed by entry activity); it is then scheduled like any
+    other activity. Returns simulate()'s result plus "foreach" (the entries'
+    schedule) and "durations" (including the ForEach's own duration).
+    """
+    entries = {entry["activity"]: [] for entry in manifest["loads"]}
+    foreach = simulate(entries, durations, manifest["batchCount"])
+    durations = {**durations, FOREACH_ACTIVITY: foreach["makespan"]}
+    result = simulate(dependencies, durations, max_parallel)
+    result.update(foreach=foreach["schedule"], durations=durations)
+    return result
+
+
+def simulate_pipeline(pipeline, durations, max_parallel=None):
+    """
+    Simulate a pipeline definition's properties (e.g. JSON/pipeline)
+
+    A ForEach over the loadManifest parameter is simulated like
+    simulate_manifest() with the definition's own items and batchCount
+    (sequential = 1, ADF's default is 20); a flat pipeline like simulate().
+    Activities without a duration get DEFAULT_DURATION. Returns
+    (dependencies, result) with result["durations"] set in both cases.
+    """
+    dependencies = pipeline_dependencies(pipeline)
+    foreach = next((a for a in pipeline["activities"] if a["type"] == "ForEach"), None)
+    if foreach is None:
+        durations = {name: durations.get(name, DEFAULT_DURATION) for name in dependencies}
+        result = simulate(dependencies, durations, max_parallel)
+        result.update(foreach={}, durations=durations)
+        return dependencies, result
+
+    type_properties = foreach["typeProperties"]
+    manifest = {
+        "batchCount": 1 if type_properties.get("isSequential") else type_properties.get("batchCount", 20),
+        "loads": pipeline.get("parameters", {}).get("loadManifest", {}).get("defaultValue", []),
+    }
+    names = [entry["activity"] for entry in manifest["loads"]] + [n for n in dependencies if n != foreach["name"]]
+    durations = {name: durations.get(name, DEFAULT_DURATION) for name in names}
+    dependencies = {(FOREACH_ACTIVITY if name == foreach["name"] else name):
+                    [FOREACH_ACTIVITY if dep == foreach["name"] else dep for dep in deps]
+                    for name, deps in dependencies.items()}
+    return dependencies, simulate_manifest(manifest, dependencies, durations, max_parallel)
+
+
+def print_schedule(title, dependencies, durations, max_parallel=None, result=None):
+    result = result or simulate(dependencies, durations, max_parallel)
+    length, path = critical_path(dependencies, durations)
+    print(title)
+    for name, (start, end) in sorted(result["schedule"].items(), key=lambda item: item[1]):
+        waits = ", ".join(dependencies[name]) or "-"
+        print(f"  {name:<28} {start:>7.0f}s → {end:>7.0f}s   after: {waits}")
+    print(f"  Makespan: {result['makespan']:.0f}s   critical path: {' → '.join(path)} ({length:.0f}s)")
+    print()
+    return result
+
+
+def main():
+    """Derive the pipeline's dependencies and compare simulated makespans"""
+    parser = argparse.ArgumentParser(description="Derive pl_NYC_Payroll_Pipeline from data flow reads/writes")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSONL activity run history")
+    parser.add_argument("--max-parallel", type=int, help="Cap on concurrently running activities")
+    parser.add_argument("--write-json", action="store_true", help=f"Write the manifest pipeline to {PIPELINE_JSON}")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    manifest_dependencies = derive_manifest_dependencies(manifest)
+    history = load_history(args.history)
+    deployed = None
+    if os.path.exists(PIPELINE_JSON):
+        with open(PIPELINE_JSON, encoding="utf-8") as f:
+            deployed = json.load(f)["properties"]
+
+    # Every activity either pipeline runs: manifest entries, post-load and deployed activities
+    names = [entry["activity"] for entry in manifest["loads"]] + [name for name, _ in POST_LOAD_ACTIVITIES]
+    if deployed:
+        names += [entry["activity"] for entry in deployed.get("parameters", {}).get("loadManifest", {})
+                  .get("defaultValue", [])]
+        names += [a["name"] for a in deployed["activities"] if a["type"] != "ForEach"]
+    durations = estimate_durations(dict.fromkeys(names), history)
+
+    print("=" * 80)
+    print(f"PIPELINE SCHEDULER: {PIPELINE_NAME} ({len(durations)} activities)")
+    print("=" * 80)
+    print()
+    for name in durations:
+        source = f"median of {len(history[name])} runs" if history.get(name) else "default"
+        print(f"  {name:<28} {durations[name]:>7.0f}s  ({source})")
+    print()
+
+    before = None
+    if deployed:
+        current, before = simulate_pipeline(deployed, durations, args.max_parallel)
+        print_schedule("Deployed pipeline (JSON/):", current, before["durations"], result=before)
+
+    after = simulate_manifest(manifest, manifest_dependencies, durations, args.max_parallel)
+    print_schedule(f"Derived pipeline (ForEach, batchCount {manifest['batchCount']}):",
+                   manifest_dependencies, after["durations"], result=after)
+    for name, (start, end) in sorted(after["foreach"].items(), key=lambda item: item[1]):
+        print(f"    {name:<26} {start:>7.0f}s → {end:>7.0f}s   (inside {FOREACH_ACTIVITY})")
+    print()
+
+    if before:
+        saved = before["makespan"] - after["makespan"]
+        print(f"✓ Estimated saving: {saved:.0f}s per run ({saved / before['makespan']:.0%})")
+
+    if args.write_json:
+        definition = {"name": PIPELINE_NAME, **build_manifest_pipeline(manifest, manifest_dependencies),
+                      "type": "Microsoft.DataFactory/factories/pipelines"}
+        with open(PIPELINE_JSON, "w", encoding="utf-8") as f:
+            json.dump(definition, f, indent="\t")
+        print(f"✓ Written: {PIPELINE_JSON}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Concurrent Infrastructure Provisioning (async management SDKs)
+
+01_create_infrastructure.py creates every resource in strict order, each as
+a blocking `az` subprocess. Most of these resources do not depend on each
+other, so this provisioner starts everything that is ready at once and polls
+all long-running operations concurrently with asyncio.
+
+Dependency edges (a resource starts as soon as its parents finish):
+    storage_account ─→ containers
+    sql_server ──────→ sql_firewall
+               └─────→ sql_database
+    data_factory ────→ integration_runtime
+    synapse_storage ─→ synapse_container ─→ synapse_workspace ─→ synapse_firewall
+
+WHY THIS MATTERS:
+Total provisioning time approaches the longest chain (Synapse workspace)
+instead of the sum of all steps.
+
+Usage:
+    python provision_async.py             # provision everything
+    python provision_async.py --plan      # print the dependency plan only
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import azure_session as session
+
+# Configuration (names match 01_create_infrastructure.py)
+RESOURCE_GROUP = session.RESOURCE_GROUP
+LOCATION = session.LOCATION
+STORAGE_ACCOUNT = session.STORAGE_ACCOUNT
+SQL_SERVER = session.SQL_SERVER
+SQL_DATABASE = session.SQL_DATABASE
+SQL_ADMIN_USER = session.SQL_USERNAME
+SQL_ADMIN_PASSWORD = session.SQL_PASSWORD
+DATA_FACTORY = session.DATA_FACTORY
+INTEGRATION_RUNTIME = session.INTEGRATION_RUNTIME
+DATAFLOW_TTL_MINUTES = session.DATAFLOW_TTL_MINUTES
+SYNAPSE_WORKSPACE = session.SYNAPSE_WORKSPACE
+SYNAPSE_STORAGE = "synapsestoragerodolfol"
+
+CONTAINERS = ["dirpayrollfiles", "dirhistoryfiles", "dirstaging"]
+
+# Seconds between long-running-operation polls
+POLL_INTERVAL = 5
+
+
+class Clients:
+    """Async management clients sharing one async CLI credential"""
+
+    def __init__(self):
+        from azure.identity.aio import AzureCliCredential
+        from azure.mgmt.datafactory.aio import DataFactoryManagementClient
+        from azure.mgmt.sql.aio import SqlManagementClient
+        from azure.mgmt.storage.aio import StorageManagementClient
+        from azure.mgmt.synapse.aio import SynapseManagementClient
+
+        subscription_id = session.get_subscription_id()
+        self.credential = AzureCliCredential()
+        self.storage = StorageManagementClient(self.credential, subscription_id, polling_interval=POLL_INTERVAL)
+        self.sql = SqlManagementClient(self.credential, subscription_id, polling_interval=POLL_INTERVAL)
+        self.adf = DataFactoryManagementClient(self.credential, subscription_id, polling_interval=POLL_INTERVAL)
+        self.synapse = SynapseManagementClient(self.credential, subscription_id, polling_interval=POLL_INTERVAL)
+
+    async def close(self):
+        for client in (self.storage, self.sql, self.adf, self.synapse, self.credential):
+            await client.close()
+
+
+def adls_account_body():
+    """StorageV2 + hierarchical namespace, same as 01_create_infrastructure.py"""
+    return {
+        "location": LOCATION,
+        "sku": {"name": "Standard_LRS"},
+        "kind": "StorageV2",
+        "properties": {"isHnsEnabled": True},
+    }
+
+
+async def create_storage_account(clients):
+    poller = await clients.storage.storage_accounts.begin_create(
+        RESOURCE_GROUP, STORAGE_ACCOUNT, adls_account_body()
+    )
+    await poller.result()
+
+
+async def create_containers(clients):
+    # Management-plane container creation: no data-plane role assignment needed
+    await asyncio.gather(*(
+        clients.storage.blob_containers.create(RESOURCE_GROUP, STORAGE_ACCOUNT, name, {})
+        for name in CONTAINERS
+    ))
+
+
+async def create_sql_server(clients):
+    poller = await clients.sql.servers.begin_create_or_update(RESOURCE_GROUP, SQL_SERVER, {
+        "location": LOCATION,
+        "properties": {
+            "administratorLogin": SQL_ADMIN_USER,
+            "administratorLoginPassword": SQL_ADMIN_PASSWORD,
+        },
+    })
+    await poller.result()
+
+
+async def configure_sql_firewall(clients):
+    await clients.sql.firewall_rules.create_or_update(RESOURCE_GROUP, SQL_SERVER, "AllowAzureServices", {
+        "properties": {"startIpAddress": "0.0.0.0", "endIpAddress": "0.0.0.0"},
+    })
+
+
+async def create_sql_database(clients):
+    poller = await clients.sql.databases.begin_create_or_update(RESOURCE_GROUP, SQL_SERVER, SQL_DATABASE, {
+        "location": LOCATION,
+        "sku": {"name": "Basic", "tier": "Basic"},
+    })
+    await poller.result()
+
+
+async def create_data_factory(clients):
+    await clients.adf.factories.create_or_update(RESOURCE_GROUP, DATA_FACTORY, {"location": LOCATION})
+
+
+def integration_runtime_body():
+    """
+    Managed Azure IR for data flows: clusters stay warm for the TTL and are
+    reused by the next activity (cleanup: false = quick re-use)
+    """
+    return {
+        "properties": {
+            "type": "Managed",
+            "description": "Data flow runtime for pl_NYC_Payroll_Pipeline",
+            "typeProperties": {
+                "computeProperties": {
+                    "location": "AutoResolve",
+                    "dataFlowProperties": {
+                        "computeType": session.DATAFLOW_COMPUTE["computeType"],
+                        "coreCount": session.DATAFLOW_COMPUTE["coreCount"],
+                        "timeToLive": DATAFLOW_TTL_MINUTES,
+                        "cleanup": False,
+                    },
+                },
+            },
+        }
+    }
+
+
+async def create_integration_runtime(clients):
+    await clients.adf.integration_runtimes.create_or_update(
+        RESOURCE_GROUP, DATA_FACTORY, INTEGRATION_RUNTIME, integration_runtime_body()
+    )
+
+
+async def create_synapse_storage(clients):
+    poller = await clients.storage.storage_accounts.begin_create(
+        RESOURCE_GROUP, SYNAPSE_STORAGE, adls_account_body()
+    )
+    await poller.result()
+
+
+async def create_synapse_container(clients):
+    await clients.storage.blob_containers.create(RESOURCE_GROUP, SYNAPSE_STORAGE, "workspace", {})
+
+
+async def create_synapse_workspace(clients):
+    poller = await clients.synapse.workspaces.begin_create_or_update(RESOURCE_GROUP, SYNAPSE_WORKSPACE, {
+        "location": LOCATION,
+        "identity": {"type": "SystemAssigned"},
+        "properties": {
+            "defaultDataLakeStorage": {
+                "accountUrl": f"https://{SYNAPSE_STORAGE}.dfs.core.windows.net",
+                "filesystem": "workspace",
+            },
+            "sqlAdministratorLogin": SQL_ADMIN_USER,
+            "sqlAdministratorLoginPassword": SQL_ADMIN_PASSWORD,
+        },
+    })
+    await poller.result()
+
+
+async def configure_synapse_firewall(clients):
+    poller = await clients.synapse.ip_firewall_rules.begin_create_or_update(
+        RESOURCE_GROUP, SYNAPSE_WORKSPACE, "AllowAllWindowsAzureIps",
+        {"properties": {"startIpAddress": "0.0.0.0", "endIpAddress": "0.0.0.0"}},
+    )
+    await poller.result()
+
+
+# name -> (dependencies, coroutine function, description)
+RESOURCES = {
+    "storage_account": ([], create_storage_account, f"Storage account {STORAGE_ACCOUNT}"),
+    "containers": (["storage_account"], create_containers, f"Containers {', '.join(CONTAINERS)}"),
+    "sql_server": ([], create_sql_server, f"SQL Server {SQL_SERVER}"),
+    "sql_firewall": (["sql_server"], configure_sql_firewall, "SQL firewall AllowAzureServices"),
+    "sql_database": (["sql_server"], create_sql_database, f"SQL Database {SQL_DATABASE} (Basic)"),
+    "data_factory": ([], create_data_factory, f"Data Factory {DATA_FACTORY}"),
+    "integration_runtime": (["data_factory"], create_integration_runtime,
+                            f"Integration runtime {INTEGRATION_RUNTIME} (TTL {DATAFLOW_TTL_MINUTES} min)"),
+    "synapse_storage": ([], create_synapse_storage, f"Synapse storage {SYNAPSE_STORAGE}"),
+    "synapse_container": (["synapse_storage"], create_synapse_container, "Synapse workspace container"),
+    "synapse_workspace": (["synapse_container"], create_synapse_workspace, f"Synapse workspace {SYNAPSE_WORKSPACE}"),
+    "synapse_firewall": (["synapse_workspace"], configure_synapse_firewall, "Synapse firewall AllowAllWindowsAzureIps"),
+}
+
+
+class DependencyFailed(Exception):
+    pass
+
+
+async def provision(clients, resources=RESOURCES):
+    """
+    Run every resource as soon as its dependencies have succeeded
+
+    Returns {name: (status, seconds)}. A failure marks every downstream
+    resource as skipped; independent branches keep going.
+    """
+    start = time.perf_counter()
+    tasks = {}
+    results = {}
+
+    async def run(name):
+        deps, create, description = resources[name]
+        try:
+            await asyncio.gather(*(tasks[d] for d in deps))
+        except Exception as e:
+            results[name] = (f"skipped: {e}", 0.0)
+            raise DependencyFailed(name) from e
+
+        began = time.perf_counter()
+        print(f"[{began - start:7.1f}s] START   {description}")
+        try:
+            await create(clients)
+        except Exception as e:
+            results[name] = (f"failed: {e}", time.perf_counter() - began)
+            print(f"[{time.perf_counter() - start:7.1f}s] ERROR   {description}: {e}")
+            raise DependencyFailed(name) from e
+
+        results[name] = ("succeeded", time.perf_counter() - began)
+        print(f"[{time.perf_counter() - start:7.1f}s] DONE    {description}")
+
+    for name in resources:
+        tasks[name] = asyncio.ensure_future(run(name))
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return results
+
+
+def critical_path(resources=RESOURCES):
+    """Longest dependency chain (by number of steps)"""
+    memo = {}
+
+    def chain(name):
+        if name not in memo:
+            deps = resources[name][0]
+            memo[name] = max((chain(d) for d in deps), key=len, default=[]) + [name]
+        return memo[name]
+
+    return max((chain(name) for name in resources), key=len)
+
+
+def print_plan(resources=RESOURCES):
+    for name, (deps, _, description) in resources.items():
+        after = ", ".join(deps) if deps else "start immediately"
+        print(f"  {name:<20} {description:<50} after: {after}")
+    print()
+    print(f"Critical path: {' → '.join(critical_path(resources))}")
+
+
+async def main_async():
+    clients = Clients()
+    try:
+        return await provision(clients)
+    finally:
+        await clients.close()
+
+
+def main():
+    """Provision all resources concurrently"""
+    parser = argparse.ArgumentParser(description="Concurrent Azure infrastructure provisioning")
+    parser.add_argument("--plan", action="store_true", help="Print the dependency plan only")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("CONCURRENT INFRASTRUCTURE PROVISIONING")
+    print("=" * 70)
+    print()
+    print_plan()
+    print()
+    if args.plan:
+        return
+
+    start = time.perf_counter()
+    results = asyncio.run(main_async())
+    elapsed = time.perf_counter() - start
+
+    print()
+    print("=" * 70)
+    print(f"PROVISIONING FINISHED in {elapsed:.1f}s")
+    print("=" * 70)
+    for name, (status, seconds) in results.items():
+        print(f"  {name:<20} {status:<12.60} {seconds:7.1f}s")
+
+    if any(status != "succeeded" for status, _ in results.values()):
+        sys.exit(1)
+    print()
+    print("NEXT STEP: Upload data with 02_upload_data.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Summary Reconciliation: Prove the three NYC_Payroll_Summary copies agree
+
+The summary exists three times:
+- sql:     NYC_Payroll_Summary in SQL Database
+- lake:    the part files the data flow wrote to dirstaging
+- synapse: the dbo.NYC_Payroll_Summary external table
+
+11_verify_results.py and 13_query_synapse_openrowset.py only look at the
+top rows. This tool compares every (FiscalYear, AgencyName) key in two
+streaming passes:
+
+1. Each source is streamed (fetchmany for SQL/Synapse, chunked blob
+   downloads for the lake) and every row is hashed into one of BUCKETS
+   order-independent digests (row count + sum of row hashes per bucket)
+2. Only the buckets whose digests differ are streamed again, this time
+   keeping the per-key values, so the report names the exact keys
+
+TotalPaid is compared in cents, so float noise below a cent does not count.
+Memory is BUCKETS digests per source plus the keys of mismatched buckets,
+however large the summary grows.
+
+Usage:
+    python reconcile_summary.py                           # sql vs lake vs synapse
+    python reconcile_summary.py --sources sql engine      # check SQL against payroll_engine
+    python reconcile_summary.py --sources lake engine --lake-files part-0.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import azure_session as session
+import sql_pool
+
+# Configuration
+STAGING_CONTAINER = "dirstaging"
+SUMMARY_FILE_PREFIXES = ("part-", "NYC_Payroll_Summary")
+FETCH_ROWS = 5000
+BUCKETS = 1024
+DIGEST_MODULUS = 1 << 128
+
+# Values closer than this are float noise, not a disagreement (see payroll_engine.py)
+ABS_TOLERANCE = 0.005
+
+SUMMARY_QUERY = "SELECT FiscalYear, AgencyName, TotalPaid FROM {table}"
+
+
+def normalize(year, agency, total):
+    """Canonical (key, cents) for one summary row"""
+    year = int(year) if year not in (None, "") else None
+    agency = (agency or "").strip()
+    if total in (None, ""):
+        cents = None
+    else:
+        cents = int(round(float(total) * 100))
+    return (year, agency), cents
+
+
+def key_bucket(key, buckets=BUCKETS):
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % buckets
+
+
+def row_hash(key, cents):
+    digest = hashlib.blake2b(repr((key, cents)).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest, "big")
+
+
+class BucketDigest:
+    """Order-independent (rows, hash sum) per key bucket"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * buckets
+        self.sums = [0] * buckets
+        self.rows = 0
+
+    def add(self, key, cents):
+        bucket = key_bucket(key, self.buckets)
+        self.counts[bucket] += 1
+        self.sums[bucket] = (self.sums[bucket] + row_hash(key, cents)) % DIGEST_MODULUS
+        self.rows += 1
+
+    def signature(self, bucket):
+        return self.counts[bucket], self.sums[bucket]
+
+
+# ----------------------------------------------------------------------------
+# Sources: each is a function returning an iterator of (FiscalYear, AgencyName, TotalPaid)
+# ----------------------------------------------------------------------------
+
+def sql_rows(target, table, fetch_rows=FETCH_ROWS):
+    """Stream a summary table with fetchmany (target "sql" or "synapse")"""
+    with sql_pool.connection(target) as conn:
+        cursor = conn.cursor()
+        cursor.execute(SUMMARY_QUERY.format(table=table))
+        while True:
+            batch = cursor.fetchmany(fetch_rows)
+            if not batch:
+                break
+            for row in batch:
+                yield tuple(row)
+
+
+class ChunkStream(io.RawIOBase):
+    """Readable file object over an iterator of byte chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+        n = min(len(target), len(self.buffer))
+        target[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+
+def iter_summary_csv(stream):
+    for record in csv.DictReader(stream):
+        yield record["FiscalYear"], record["AgencyName"], record["TotalPaid"]
+
+
+def lake_summary_blobs(container=STAGING_CONTAINER, account=session.STORAGE_ACCOUNT):
+    client = session.blob_service_client(account).get_container_client(container)
+    return [
+        blob.name for blob in client.list_blobs()
+        if blob.name.rsplit("/", 1)[-1].startswith(SUMMARY_FILE_PREFIXES) and blob.name.endswith(".csv")
+    ]
+
+
+def lake_rows(container=STAGING_CONTAINER, account=session.STORAGE_ACCOUNT):
+    """Stream every summary part file in dirstaging chunk by chunk"""
+    client = session.blob_service_client(account).get_container_client(container)
+    for name in lake_summary_blobs(container, account):
+        chunks = client.get_blob_client(name).download_blob().chunks()
+        stream = io.TextIOWrapper(io.BufferedReader(ChunkStream(chunks)), encoding="utf-8", newline="")
+        yield from iter_summary_csv(stream)
+
+
+def local_rows(paths):
+    """Stream local summary CSVs (e.g. downloaded part files)"""
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from iter_summary_csv(f)
+
+
+def engine_rows():
+    """Recompute the summary from data/nycpayroll_*.csv (payroll_engine.py)"""
+    from payroll_engine import compute_summary
+
+    rows, _ = compute_summary()
+    return iter(rows)
+
+
+def make_sources(names, lake_files=None, fetch_rows=FETCH_ROWS):
+    factories = {
+        "sql": lambda: sql_rows("sql", "NYC_Payroll_Summary", fetch_rows),
+        "lake": (lambda: local_rows(lake_files)) if lake_files else lake_rows,
+        "synapse": lambda: sql_rows("synapse", "dbo.NYC_Payroll_Summary", fetch_rows),
+        "engine": engine_rows,
+    }
+    return {name: factories[name] for name in names}
+
+
+# ----------------------------------------------------------------------------
+# Reconciliation
+# ----------------------------------------------------------------------------
+
+def digest_source(factory, buckets=BUCKETS):
+    digest = BucketDigest(buckets)
+    for row in factory():
+        digest.add(*normalize(*row))
+    return digest
+
+
+def collect_keys(factory, wanted, buckets=BUCKETS):
+    """{key: [cents, ...]} for the rows that fall into the wanted buckets"""
+    values = {}
+    for row in factory():
+        key, cents = normalize(*row)
+        if key_bucket(key, buckets) in wanted:
+            values.setdefault(key, []).append(cents)
+    return values
+
+
+def classify(key, values_by_source):
+    """Describe how one key differs across sources, or None if it agrees"""
+    values = {name: v.get(key, []) for name, v in values_by_source.items()}
+    if any(len(v) > 1 for v in values.values()):
+        return "duplicate"
+    if any(not v for v in values.values()):
+        return "missing"
+    cents = [v[0] for v in values.values()]
+    if len(set(cents)) == 1:
+        return None
+    if None in cents:
+        return "value"
+    spread = (max(cents) - min(cents)) / 100
+    return "rounding" if math.isclose(spread, 0.01, abs_tol=ABS_TOLERANCE) else "value"
+
+
+def reconcile(sources, buckets=BUCKETS):
+    """
+    Compare all sources; returns a structured report
+
+    {"rows": {source: n}, "buckets_mismatched": n,
+     "differences": [{"key", "kind", "values": {source: [TotalPaid, ...]}}],
+     "agree": bool}
+    """
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        digests = dict(zip(sources, pool.map(lambda f: digest_source(f, buckets), sources.values())))
+
+    wanted = {
+        b for b in range(buckets)
+        if len({digest.signature(b) for digest in digests.values()}) > 1
+    }
+
+    differences = []
+    if wanted:
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            values = dict(zip(sources, pool.map(lambda f: collect_keys(f, wanted, buckets), sources.values())))
+        all_keys = set().union(*(v.keys() for v in values.values()))
+        for key in sorted(all_keys, key=lambda k: (k[0] or 0, k[1])):
+            kind = classify(key, values)
+            if kind:
+                differences.append({
+                    "key": key,
+                    "kind": kind,
+                    "values": {
+                        name: [None if c is None else c / 100 for c in v.get(key, [])]
+                        for name, v in values.items()
+                    },
+                })
+
+    return {
+        "rows": {name: digest.rows for name, digest in digests.items()},
+        "buckets_mismatched": len(wanted),
+        "differences": differences,
+        "agree": all(d["kind"] == "rounding" for d in differences),
+    }
+
+
+def print_report(report):
+    for name, rows in report["rows"].items():
+        print(f"  {name:<10} {rows:>10,} rows")
+    print()
+    if not report["differences"]:
+        print(f"✓ All sources agree on every (FiscalYear, AgencyName) key")
+        return
+
+    print(f"{report['buckets_mismatched']} of {BUCKETS} digest buckets differ:")
+    for diff in report["differences"]:
+        year, agency = diff["key"]
+        marker = "~" if diff["kind"] == "rounding" else "✗"
+        values = ", ".join(f"{name}={vals or 'missing'}" for name, vals in diff["values"].items())
+        print(f"  {marker} {diff['kind']:<9} {year} | {agency} | {values}")
+    print()
+    print("✓ Differences are cent rounding only" if report["agree"] else "✗ Sources DISAGREE")
+
+
+def main():
+    """Reconcile the summary copies"""
+    parser = argparse.ArgumentParser(description="Streaming reconciliation of NYC_Payroll_Summary copies")
+    parser.add_argument("--sources", nargs="+", default=["sql", "lake", "synapse"],
+                        choices=["sql", "lake", "synapse", "engine"])
+    parser.add_argument("--lake-files", nargs="+", help="Read the lake copy from local part files")
+    parser.add_argument("--fetch-rows", type=int, default=FETCH_ROWS)
+    args = parser.parse_args()
+
+    if len(args.sources) < 2:
+        parser.error("need at least two sources to compare")
+
+    print("=" * 80)
+    print(f"SUMMARY RECONCILIATION: {' vs '.join(args.sources)}")
+    print("=" * 80)
+    print()
+
+    start = time.perf_counter()
+    report = reconcile(make_sources(args.sources, args.lake_files, args.fetch_rows))
+    print_report(report)
+    print(f"\nElapsed: {time.perf_counter() - start:.1f}s")
+    if not report["agree"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Schema Registry: Canonical payroll schema, alias rules and header signatures
+
+The 2021 extract says AgencyCode where 2020 says AgencyID.
+Dataflow_Summary_Aggregate unions the two with union(byName: true), so a
+drifted header silently becomes a column of nulls instead of an error.
+
+This registry holds:
+- CANONICAL_SCHEMAS: the canonical column names and logical types
+  (int / float / varchar / date, the same names the SQL DDL uses)
+- ALIASES: header names that mean a canonical column (AgencyCode → AgencyID);
+  names are also matched ignoring case, spaces and underscores
+- SIGNATURES: the header signature of every extract seen so far, so a new
+  header layout is reported instead of loaded blindly
+
+payroll_engine.py, bulk_loader.py and parquet_landing.py resolve every CSV
+header through resolve() while parsing. The rename only changes the
+position → name lookup, no column data is copied.
+
+WHY THIS MATTERS:
+A new fiscal year with a drifted header loads correctly without a new
+derive/select stage or a new data flow.
+
+Usage:
+    python schema_registry.py                      # check data/nycpayroll_*.csv
+    python schema_registry.py path/to/new_extract.csv
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import re
+
+# Configuration
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DATA_PATH = os.path.join(PROJECT_ROOT, "data")
+PAYROLL_PATTERN = "nycpayroll_*.csv"
+
+CANONICAL_SCHEMAS = {
+    "payroll": [
+        ("FiscalYear", "int"),
+        ("PayrollNumber", "int"),
+        ("AgencyID", "varchar"),
+        ("AgencyName", "varchar"),
+        ("EmployeeID", "varchar"),
+        ("LastName", "varchar"),
+        ("FirstName", "varchar"),
+        ("AgencyStartDate", "date"),
+        ("WorkLocationBorough", "varchar"),
+        ("TitleCode", "varchar"),
+        ("TitleDescription", "varchar"),
+        ("LeaveStatusasofJune30", "varchar"),
+        ("BaseSalary", "float"),
+        ("PayBasis", "varchar"),
+        ("RegularHours", "float"),
+        ("RegularGrossPaid", "float"),
+        ("OTHours", "float"),
+        ("TotalOTPaid", "float"),
+        ("TotalOtherPay", "float"),
+    ],
+}
+
+# alias -> canonical column, per schema
+ALIASES = {
+    "payroll": {
+        "AgencyCode": "AgencyID",
+    },
+}
+
+# Header signatures of the extracts registered so far
+SIGNATURES = {
+    "4b87c85d87c3": {"schema": "payroll", "source": "nycpayroll_2020.csv"},
+    "b12c80eef6b4": {"schema": "payroll", "source": "nycpayroll_2021.csv (AgencyCode header)"},
+}
+
+
+def fold(name):
+    """Case/space/underscore-insensitive form of a column name"""
+    return re.sub(r"[\s_]", "", name).lower()
+
+
+def _lookup(schema):
+    """{folded name: canonical name} for canonical names and aliases"""
+    lookup = {fold(name): name for name, _ in CANONICAL_SCHEMAS[schema]}
+    lookup.update({fold(alias): canonical for alias, canonical in ALIASES[schema].items()})
+    return lookup
+
+
+def canonical_name(name, schema="payroll"):
+    """Canonical column for a header name; unknown names are returned unchanged"""
+    return _lookup(schema).get(fold(name.strip()), name)
+
+
+def canonical_header(header, schema="payroll"):
+    lookup = _lookup(schema)
+    return [lookup.get(fold(name.strip()), name) for name in header]
+
+
+def header_signature(header):
+    return hashlib.sha1(",".join(header).encode("utf-8")).hexdigest()[:12]
+
+
+def column_types(schema="payroll"):
+    return dict(CANONICAL_SCHEMAS[schema])
+
+
+def resolve(header, schema="payroll"):
+    """
+    Map a raw CSV header onto the canonical schema
+
+    Returns {"signature", "known", "columns" (canonical name per position),
+    "renamed" {raw: canonical}, "missing" canonical columns absent from the
+    file, "unknown" raw columns that map to nothing}.
+    """
+    columns = canonical_header(header, schema)
+    canonical = [name for name, _ in CANONICAL_SCHEMAS[schema]]
+    signature = header_signature(header)
+    return {
+        "signature": signature,
+        "known": signature in SIGNATURES,
+        "columns": columns,
+        "renamed": {raw: name for raw, name in zip(header, columns) if raw != name},
+        "missing": [name for name in canonical if name not in columns],
+        "unknown": [raw for raw, name in zip(header, columns) if name not in canonical],
+    }
+
+
+def read_header(path):
+    with open(path, encoding="utf-8") as f:
+        return f.readline().strip().split(",")
+
+
+def main():
+    """Report how each payroll extract maps onto the canonical schema"""
+    parser = argparse.ArgumentParser(description="Check CSV headers against the schema registry")
+    parser.add_argument("files", nargs="*", help="CSV files (default: data/nycpayroll_*.csv)")
+    parser.add_argument("--schema", default="payroll", choices=sorted(CANONICAL_SCHEMAS))
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(os.path.join(DATA_PATH, PAYROLL_PATTERN)))
+    drifted = False
+
+    print("=" * 80)
+    print(f"SCHEMA REGISTRY: {args.schema} ({len(CANONICAL_SCHEMAS[args.schema])} canonical columns)")
+    print("=" * 80)
+    for path in paths:
+        mapping = resolve(read_header(path), args.schema)
+        status = "✓ registered" if mapping["known"] else "! NEW header signature"
+        print(f"\n{os.path.basename(path)}: {mapping['signature']} {status}")
+        for raw, name in mapping["renamed"].items():
+            print(f"  rename  {raw} → {name}")
+        for name in mapping["missing"]:
+            print(f"  ✗ missing {name} (loaded as NULL)")
+        for raw in mapping["unknown"]:
+            print(f"  ✗ unknown column {raw} (ignored)")
+        if not mapping["known"]:
+            print(f'  To register: "{mapping["signature"]}": '
+                  f'{{"schema": "{args.schema}", "source": "{os.path.basename(path)}"}},')
+        drifted = drifted or bool(mapping["missing"] or mapping["unknown"])
+
+    if drifted:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
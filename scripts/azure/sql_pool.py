@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+SQL Pool: Shared pyodbc connections for SQL Database and Synapse serverless
+
+11_verify_results.py, 12_fix_synapse_table.py and 13_query_synapse_openrowset.py
+each connected cold with pyodbc.connect(). Every new connection is a TLS +
+login round-trip of a few seconds, and Synapse serverless often stalls or
+fails on the first query after being idle.
+
+This module:
+- Keeps a small pool of open connections per target ("sql" / "synapse")
+- Health-checks a pooled connection with SELECT 1 when it has been idle
+  longer than HEALTH_CHECK_AFTER seconds, and replaces it if it is dead
+- Retries with exponential backoff on transient errors (40613 database
+  unavailable, 40501 service busy, serverless resume / warm-up, login
+  timeouts, dropped links): connection() retries the connect, run() and
+  query() retry the whole connect + query; never both at once
+- warm_up() pings both endpoints concurrently so the first real query does
+  not pay the serverless resume
+
+WHY THIS MATTERS:
+Reporting scripts issue dozens of queries per run; reusing connections and
+riding out transient errors turns seconds per query into milliseconds.
+
+Usage (from any script in this folder):
+    import sql_pool
+    rows = sql_pool.query("synapse", "SELECT TOP 5 * FROM dbo.NYC_Payroll_Summary")
+    with sql_pool.connection("sql") as conn:
+        df = pd.read_sql(sql, conn)
+
+    python sql_pool.py                 # warm up both endpoints and report latency
+"""
+
+import argparse
+import atexit
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import azure_session as session
+
+# Configuration
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 30
+HEALTH_CHECK_AFTER = 60
+MAX_RETRIES = 5
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 30.0
+
+# SQL error numbers / SQLSTATEs that are worth retrying
+TRANSIENT_ERRORS = (
+    "40613",   # Database is not currently available (also serverless resume)
+    "40501",   # Service is busy
+    "40197",   # Service error processing the request
+    "49918", "49919", "49920",  # Not enough resources / too many operations
+    "10928", "10929",  # Resource limits reached
+    "42108", "42109",  # Serverless pool is paused / warming up
+    "HYT00",   # Login / query timeout
+    "08S01",   # Communication link failure
+    "08001",   # Unable to establish connection
+)
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def is_transient(error):
+    """
+    True if an error is a transient Azure SQL / serverless error
+
+    The cause chain is checked too, since pandas.read_sql wraps the
+    pyodbc error in its own DatabaseError.
+    """
+    while error is not None:
+        text = " ".join(str(arg) for arg in getattr(error, "args", ()))
+        if any(code in text for code in TRANSIENT_ERRORS):
+            return True
+        error = error.__cause__
+    return False
+
+
+def backoff(attempt):
+    """Exponential backoff with jitter, capped at BACKOFF_MAX seconds"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE ** attempt)
+    return delay * (0.5 + random.random() / 2)
+
+
+def with_retry(func, retries=MAX_RETRIES, description="query"):
+    """Call func() and retry it on transient errors"""
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = backoff(attempt)
+            print(f"  Transient error on {description} (attempt {attempt + 1}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class ConnectionPool:
+    """Bounded pool of pyodbc connections to one endpoint"""
+
+    def __init__(self, target, size=POOL_SIZE, conn_str=None):
+        self.target = target
+        self.conn_str = conn_str or session.sql_connection_string(target)
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        import pyodbc
+
+        return pyodbc.connect(self.conn_str, timeout=CONNECT_TIMEOUT, autocommit=True)
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    conn, last_used = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if time.monotonic() - last_used < HEALTH_CHECK_AFTER or self._healthy(conn):
+                    return conn
+                self._discard(conn)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, conn, broken=False):
+        try:
+            if broken:
+                self._discard(conn)
+            else:
+                self.idle.put((conn, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+def get_pool(target="sql"):
+    """Shared pool for "sql" or "synapse" (created on first use)"""
+    with _lock:
+        if target not in _pools:
+            _pools[target] = ConnectionPool(target)
+        return _pools[target]
+
+
+@contextmanager
+def connection(target="sql", retries=MAX_RETRIES):
+    """
+    Borrow a pooled connection
+
+    Getting the connection is retried on transient errors; the block itself
+    is not (use run() for that). The connection goes back to the pool
+    afterwards; if the block raised, the connection is closed instead,
+    since it may be dead.
+    """
+    pool = get_pool(target)
+    conn = with_retry(pool.acquire, retries, description=f"{target} connect")
+    broken = False
+    try:
+        yield conn
+    except Exception:
+        broken = True
+        raise
+    finally:
+        pool.release(conn, broken)
+
+
+def run(target, func, retries=MAX_RETRIES):
+    """
+    Run func(conn) on a pooled connection, retrying transient errors
+
+    Each retry borrows a fresh connection, so func must be safe to repeat
+    (a read, or a statement that is idempotent).
+    """
+    def attempt():
+        with connection(target, retries=0) as conn:
+            return func(conn)
+
+    return with_retry(attempt, retries, description=f"{target} query")
+
+
+def query(target, sql, params=(), retries=MAX_RETRIES):
+    """Execute a read and return all rows as tuples"""
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        return [tuple(row) for row in cursor.fetchall()]
+
+    return run(target, fetch, retries)
+
+
+def warm_up(targets=("sql", "synapse")):
+    """
+    Ping every endpoint concurrently (SELECT 1 with retries)
+
+    Returns {target: seconds or error string}. The warmed connection stays
+    in the pool for the next query.
+    """
+    def ping(target):
+        start = time.perf_counter()
+        try:
+            query(target, "SELECT 1")
+            return target, time.perf_counter() - start
+        except Exception as e:
+            return target, f"error: {e}"
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        return dict(pool.map(ping, targets))
+
+
+@atexit.register
+def close_all():
+    with _lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def main():
+    """Warm up the endpoints and show cold vs pooled latency"""
+    parser = argparse.ArgumentParser(description="Warm up SQL Database / Synapse serverless connections")
+    parser.add_argument("--targets", nargs="+", default=["sql", "synapse"], choices=["sql", "synapse"])
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("SQL POOL WARM-UP")
+    print("=" * 70)
+    for target, result in warm_up(args.targets).items():
+        if isinstance(result, float):
+            print(f"✓ {target:<8} cold ping {result:.2f}s")
+        else:
+            print(f"✗ {target:<8} {result}")
+
+    for target in args.targets:
+        start = time.perf_counter()
+        try:
+            query(target, "SELECT 1")
+            print(f"✓ {target:<8} pooled ping {time.perf_counter() - start:.3f}s")
+        except Exception as e:
+            print(f"✗ {target:<8} {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from adf_deploy import CLIENT_OPERATIONS, changed_artifacts, deployed_hashes, load_json_artifacts
+
+
+class FakeOperations:
+    def __init__(self, resources):
+        self.resources = resources
+
+    def list_by_factory(self, resource_group, factory):
+        return [
+            SimpleNamespace(name=name, serialize=lambda properties=properties: {"properties": properties})
+            for name, properties in self.resources
+        ]
+
+
+def fake_client(artifacts):
+    """Stand-in DataFactoryManagementClient whose factory holds these artifacts"""
+    return SimpleNamespace(**{
+        attribute: FakeOperations([(a.name, a.properties) for a in artifacts if a.kind == kind])
+        for kind, attribute in CLIENT_OPERATIONS.items()
+    })
+
+
+def test_live_diff_finds_only_changed_artifacts():
+    artifacts = load_json_artifacts()
+    client = fake_client(artifacts)
+    assert changed_artifacts(artifacts, deployed_hashes(client, artifacts, "live")) == []
+
+    target = next(a for a in artifacts if a.kind == "dataset")
+    target.properties = {**target.properties, "description": "edited"}
+    client = fake_client(load_json_artifacts())
+    changed = changed_artifacts(artifacts, deployed_hashes(client, artifacts, "live"))
+    assert [a.key for a in changed] == [target.key]
+
+
+def test_no_diff_means_everything_changes():
+    artifacts = load_json_artifacts()
+    assert len(changed_artifacts(artifacts, deployed_hashes(None, artifacts, "none"))) == len(artifacts)
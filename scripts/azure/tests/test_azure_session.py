@@ -0,0 +1,56 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import azure_session as session
+
+
+def test_slow_factory_does_not_block_other_clients():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    worker = threading.Thread(target=session._cached, args=("test:slow", slow))
+    worker.start()
+    started.wait(5)
+    try:
+        assert session._cached("test:fast", lambda: "fast") == "fast"
+    finally:
+        release.set()
+        worker.join()
+    assert session._cached("test:slow", lambda: "other") == "slow"
+
+
+def test_factory_runs_once_per_name():
+    calls = []
+    threads = [threading.Thread(target=session._cached, args=("test:once", lambda: calls.append(1) or "x"))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [1]
+
+
+def test_tokens_are_reused_until_near_expiry():
+    pytest.importorskip("azure.core")
+    calls = []
+
+    def get_token(*scopes, **kwargs):
+        calls.append(scopes)
+        return SimpleNamespace(token=f"t{len(calls)}", expires_on=time.time() + expiry[0])
+
+    expiry = [3600]
+    credential = session.CachedCredential(SimpleNamespace(get_token=get_token))
+    assert credential.get_token("scope").token == "t1"
+    assert credential.get_token("scope").token == "t1"
+
+    expiry[0] = session.TOKEN_REFRESH_MARGIN - 1
+    assert credential.get_token("other").token == "t2"
+    assert credential.get_token("other").token == "t3"
@@ -0,0 +1,52 @@
+from benchmark_schema import index_statements, run_query
+
+
+class FakeCursor:
+    """Result sets as (rows or None, messages); messages arrive per set"""
+
+    def __init__(self, sets):
+        self.sets = sets
+
+    def execute(self, sql):
+        self.position = 0
+
+    @property
+    def description(self):
+        return None if self.sets[self.position][0] is None else [("c",)]
+
+    @property
+    def messages(self):
+        return self.sets[self.position][1]
+
+    def fetchall(self):
+        return self.sets[self.position][0]
+
+    def nextset(self):
+        self.position += 1
+        return self.position < len(self.sets)
+
+
+def test_run_query_reads_messages_from_every_result_set():
+    cursor = FakeCursor([
+        ([(1,), (2,)], []),
+        (None, [("01000", "Table 'NYC_Payroll_Data'. Scan count 1, logical reads 40")]),
+        (None, [("01000", "Table 'Worktable'. Scan count 0, logical reads 2")]),
+    ])
+
+    _, rows, reads = run_query(cursor, "SELECT 1")
+
+    assert rows == 2
+    assert reads == 42
+
+
+def test_payroll_and_its_stage_table_get_columnstore_or_the_same_rowstore_fallback():
+    statements, indexes = index_statements()
+    tables = {}
+    for name, table in indexes:
+        tables.setdefault(table, set()).add(name.replace(table, "<table>"))
+
+    assert tables["NYC_Payroll_Data"] == tables["NYC_Payroll_Data_Stage"] == {
+        "CCI_<table>", "CIX_<table>_FiscalYear_AgencyName"}
+    aligned = [s for s in statements if "NYC_Payroll_Data]" in s or "NYC_Payroll_Data_Stage]" in s]
+    assert len(aligned) == 2 and all(s.count("ON [ps_FiscalYear]([FiscalYear])") == 2 for s in aligned)
+    assert not [table for table in tables if table.startswith("NYC_Payroll_Data_20")]
@@ -0,0 +1,41 @@
+import csv
+import os
+
+from bulk_loader import DATA_PATH, LOAD_CONFIGS, PAYROLL_TABLE, load_all, load_payroll, make_backend, make_row_converter
+
+
+def test_row_converter_matches_by_canonical_name():
+    columns = [("AgencyID", "varchar"), ("AgencyStartDate", "date"), ("BaseSalary", "float"), ("OTHours", "float")]
+
+    convert = make_row_converter(["BaseSalary", "AgencyStartDate", "AgencyCode"], columns)
+
+    # AgencyCode fills AgencyID; OTHours is not in the file and empty strings are NULL
+    assert convert(["", "7/1/2019", "002"]) == ("002", "2019-07-01", None, None)
+
+
+def test_every_file_loads_in_batches(tmp_path):
+    backend = make_backend("sqlite", str(tmp_path / "local.db"))
+    try:
+        results = load_all(backend, batch_rows=7)
+        counts = {table: backend.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                  for _, table in LOAD_CONFIGS}
+    finally:
+        backend.close()
+
+    for filename, table in LOAD_CONFIGS:
+        with open(os.path.join(DATA_PATH, filename), newline="", encoding="utf-8") as f:
+            expected = sum(1 for row in csv.reader(f) if row) - 1
+        assert counts[table] == expected
+    assert [r["rows"] for r in results] == [counts[table] for _, table in LOAD_CONFIGS]
+
+
+def test_payroll_files_load_into_the_partitioned_table(tmp_path):
+    backend = make_backend("sqlite", str(tmp_path / "local.db"))
+    try:
+        stats = load_payroll(backend, batch_rows=7)
+        counts = dict(backend.conn.execute(f'SELECT FiscalYear, COUNT(*) FROM "{PAYROLL_TABLE}" GROUP BY FiscalYear'))
+    finally:
+        backend.close()
+
+    assert counts == {1998: 1, 1999: 1, 2020: 99, 2021: 100}
+    assert (stats["table"], stats["rows"]) == (PAYROLL_TABLE, 201)
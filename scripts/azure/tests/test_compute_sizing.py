@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from compute_sizing import (
+    DEFAULT_ROWS_PER_CORE_SECOND,
+    DEFAULT_STARTUP_SECONDS,
+    MEMORY_OPTIMIZED_BYTES,
+    calibrate,
+    choose,
+    estimate_rows,
+)
+
+
+def test_small_flows_stay_on_the_smallest_cluster():
+    sizing = choose({"rows": 154, "bytes": 20_000, "shuffle": False}, DEFAULT_ROWS_PER_CORE_SECOND, 240)
+
+    assert (sizing["coreCount"], sizing["computeType"]) == (8, "General")
+    assert "smallest cluster" in sizing["reason"]
+
+
+def test_large_shuffles_get_more_cores_and_memory():
+    stats = {"rows": 50_000_000, "bytes": MEMORY_OPTIMIZED_BYTES + 1, "shuffle": True}
+
+    sizing = choose(stats, 20_000, 240)
+
+    # 100M rows of work (shuffle counted twice) needs 48 cores to stay under 120s
+    assert (sizing["coreCount"], sizing["computeType"]) == (48, "MemoryOptimized")
+    assert sizing["predicted_seconds"] == pytest.approx(240 + 100_000_000 / (20_000 * 48))
+    assert "shuffle counted twice" in sizing["reason"]
+
+
+def test_calibrate_takes_overhead_off_and_skips_small_or_failed_runs(tmp_path):
+    runs = [
+        {"status": "Succeeded", "rows_read": 200_000, "core_count": 8, "duration_seconds": 300,
+         "cluster_startup_seconds": 100, "queue_seconds": 0},
+        {"status": "Succeeded", "rows_read": 400_000, "core_count": 16, "duration_seconds": 260,
+         "cluster_startup_seconds": 50, "queue_seconds": 10},
+        {"status": "Succeeded", "rows_read": 10, "core_count": 8, "duration_seconds": 90,
+         "cluster_startup_seconds": 60},
+        {"status": "Failed", "rows_read": 900_000, "core_count": 8, "duration_seconds": 5,
+         "cluster_startup_seconds": 1},
+    ]
+    path = tmp_path / "history.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in runs) + "\n\n")
+
+    assert calibrate(str(path)) == (125.0, 60, 2)
+
+
+def test_calibrate_without_history_uses_defaults(tmp_path):
+    assert calibrate(str(tmp_path / "missing.jsonl")) == (DEFAULT_ROWS_PER_CORE_SECOND, DEFAULT_STARTUP_SECONDS, 0)
+
+
+def test_estimate_rows_counts_small_files_without_trailing_newline(tmp_path):
+    path = tmp_path / "AgencyMaster.csv"
+    path.write_bytes(b"AgencyID,AgencyName\n1,A\n2,B")
+
+    assert estimate_rows(str(path), path.stat().st_size) == 2
@@ -0,0 +1,36 @@
+import csv
+
+import pytest
+
+from bulk_loader import make_backend
+from generate_payroll import MASTER_FILES, generate, parse_rows
+from partitioned_load import TABLE, load_partitioned, payroll_files
+
+
+@pytest.mark.parametrize("text, rows", [
+    ("1M", 1_000_000), ("2.5k", 2_500), ("1B", 1_000_000_000), ("10_000", 10_000), (" 42 ", 42),
+])
+def test_parse_rows(text, rows):
+    assert parse_rows(text) == rows
+
+
+def test_generated_folder_loads_like_data(tmp_path):
+    output = tmp_path / "synthetic"
+
+    results = generate(rows=11, years=2, output_path=str(output), chunk_rows=4)
+
+    assert [rows for _, rows, _, _ in results] == [6, 5]
+    assert all((output / name).exists() for name in MASTER_FILES)
+    with open(output / "nycpayroll_2021.csv", newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+    assert "AgencyCode" in header and len(rows) == 5
+    assert all(len(row) == len(header) and row[0] == "2021" for row in rows)
+
+    backend = make_backend("sqlite", str(tmp_path / "local.db"))
+    try:
+        loaded = load_partitioned(backend, payroll_files(str(output)), str(output))
+        counts = dict(backend.conn.execute(f'SELECT FiscalYear, COUNT(*) FROM "{TABLE}" GROUP BY FiscalYear'))
+    finally:
+        backend.close()
+    assert [r["file"] for r in loaded] == ["nycpayroll_2020.csv", "nycpayroll_2021.csv"]
+    assert counts == {2020: 6, 2021: 5}
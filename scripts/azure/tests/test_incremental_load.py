@@ -0,0 +1,82 @@
+import shutil
+
+import pytest
+
+from bulk_loader import DATA_PATH, SqliteBackend
+from incremental_load import PAYROLL_TABLE, incremental_load, merge_slice_digests
+
+LATE_2020 = "2020,17,2120,OFFICE OF EMERGENCY MANAGEMENT,10002,LATE,ROW,9/12/2016,BROOKLYN,40447,X,ACTIVE,86005,per Annum,1820,100,0,0,0"
+BLANK_NUMBER = "2021,,2153,NYC HOUSING AUTHORITY,1,DOE,JANE,1/1/2020,MANHATTAN,40475,CLERK,ACTIVE,50000,per Annum,1820,50000,0,0,0"
+
+
+def payroll_copies(tmp_path, extra_2021_lines=()):
+    shutil.copy(f"{DATA_PATH}/nycpayroll_2020.csv", tmp_path)
+    path = tmp_path / "nycpayroll_2021.csv"
+    shutil.copy(f"{DATA_PATH}/nycpayroll_2021.csv", path)
+    with open(path, "a", encoding="utf-8") as f:
+        for line in extra_2021_lines:
+            f.write(line + "\n")
+
+
+def refresh(backend, tmp_path):
+    [stats] = incremental_load(backend, [], str(tmp_path))
+    counts = dict(backend.fetchall(f"SELECT FiscalYear, COUNT(*) FROM {PAYROLL_TABLE} GROUP BY FiscalYear"))
+    return stats, counts
+
+
+def test_slices_spread_over_files_digest_like_one_file():
+    merged = merge_slice_digests([{(2020, 1): (2, "0" * 31 + "3")},
+                                  {(2020, 1): (1, "f" * 32), (2021, 1): (1, "a" * 32)}])
+
+    assert merged == {(2020, 1): (3, "0" * 31 + "2"), (2021, 1): (1, "a" * 32)}
+
+
+def test_only_years_with_changed_slices_are_switched(tmp_path):
+    payroll_copies(tmp_path)
+    backend = SqliteBackend(str(tmp_path / "test.db"))
+    try:
+        first, counts = refresh(backend, tmp_path)
+        assert first["years"] == [1998, 1999, 2020, 2021]
+        assert counts == {1998: 1, 1999: 1, 2020: 99, 2021: 100}
+
+        assert refresh(backend, tmp_path)[0]["status"] == "skipped"
+
+        # a late 2020 record in the 2021 file rewrites 2020 only, with the rows of both files
+        payroll_copies(tmp_path, [LATE_2020])
+        late, counts = refresh(backend, tmp_path)
+        assert (late["years"], late["changed"], late["rows"]) == ([2020], 1, 100)
+        assert counts == {1998: 1, 1999: 1, 2020: 100, 2021: 100}
+
+        # and dropping it again switches 2020 back without the late row
+        payroll_copies(tmp_path)
+        dropped, counts = refresh(backend, tmp_path)
+        assert (dropped["years"], dropped["changed"], counts[2020]) == ([2020], 1, 99)
+    finally:
+        backend.close()
+
+
+def test_blank_payroll_number_slice_is_not_reinserted(tmp_path):
+    payroll_copies(tmp_path, [BLANK_NUMBER])
+    backend = SqliteBackend(str(tmp_path / "test.db"))
+    try:
+        _, first = refresh(backend, tmp_path)
+        unchanged, _ = refresh(backend, tmp_path)
+        # touch only the blank-number slice: its year is replaced, not duplicated
+        payroll_copies(tmp_path, [BLANK_NUMBER.replace("50000,0,0,0", "50000,0,0,10")])
+        changed, third = refresh(backend, tmp_path)
+    finally:
+        backend.close()
+
+    assert first[2021] == third[2021] == 101
+    assert unchanged["status"] == "skipped"
+    assert (changed["changed"], changed["years"]) == (1, [2021])
+
+
+def test_row_without_fiscal_year_is_rejected(tmp_path):
+    payroll_copies(tmp_path, [BLANK_NUMBER.replace("2021,", ",", 1)])
+    backend = SqliteBackend(str(tmp_path / "test.db"))
+    try:
+        with pytest.raises(ValueError, match="row without FiscalYear"):
+            refresh(backend, tmp_path)
+    finally:
+        backend.close()
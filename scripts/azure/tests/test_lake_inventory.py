@@ -0,0 +1,50 @@
+from lake_inventory import diff_inventory, list_inventory
+
+
+def entry(size=10, md5="aa", etag=None):
+    return {"path": "x", "size": size, "mtime": 0, "md5": md5, "etag": etag}
+
+
+def remote(size=10, md5="aa", etag="e1"):
+    return {"size": size, "md5": md5, "etag": etag}
+
+
+def test_diff_classifies_blobs():
+    manifest = {
+        "raw/ok.csv": entry(),
+        "raw/gone.csv": entry(),
+        "raw/bad.csv": entry(md5="bb"),
+        "raw/rewritten.csv": entry(etag="e0"),
+    }
+    inventory = {"raw": {"ok.csv": remote(), "bad.csv": remote(), "rewritten.csv": remote(),
+                         "stray.csv": remote()}}
+
+    diff = diff_inventory(manifest, inventory)
+
+    assert diff["matched"] == ["raw/ok.csv"]
+    assert diff["missing"] == ["raw/gone.csv"]
+    assert diff["mismatched"] == [{"blob": "raw/bad.csv", "field": "md5", "local": "bb", "remote": "aa"}]
+    assert diff["etag_changed"] == ["raw/rewritten.csv"]
+    assert diff["extra"] == ["raw/stray.csv"]
+
+
+def test_diff_ignores_containers_that_were_not_listed():
+    manifest = {"raw/a.csv": entry(), "curated/b.csv": entry()}
+
+    diff = diff_inventory(manifest, {"raw": {"a.csv": remote()}})
+
+    assert diff["matched"] == ["raw/a.csv"]
+    assert diff["missing"] == []
+
+
+def test_diff_honours_prefix():
+    manifest = {"raw/2020/a.csv": entry(), "raw/2021/b.csv": entry()}
+
+    diff = diff_inventory(manifest, {"raw": {"2020/a.csv": remote()}}, prefix="2020/")
+
+    assert diff["matched"] == ["raw/2020/a.csv"]
+    assert diff["missing"] == []
+
+
+def test_list_inventory_with_no_containers():
+    assert list_inventory([]) == {}
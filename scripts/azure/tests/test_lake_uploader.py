@@ -0,0 +1,157 @@
+import hashlib
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import lake_uploader
+from lake_uploader import UploadCheckpoint, block_id, upload_file
+
+KEY = "https://account/container/blob"
+
+
+def saved_blocks(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)[KEY]["blocks"]
+
+
+def test_blocks_are_saved_in_batches_and_on_flush(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = UploadCheckpoint(path, save_every=10, save_seconds=3600)
+    checkpoint.staged(KEY, {"size": 1, "mtime": 1, "block_size": 1})
+
+    for i in range(9):
+        checkpoint.mark(KEY, f"b{i}")
+    assert saved_blocks(path) == []
+
+    checkpoint.mark(KEY, "b9")
+    assert len(saved_blocks(path)) == 10
+
+    for i in range(10, 15):
+        checkpoint.mark(KEY, f"b{i}")
+    assert len(saved_blocks(path)) == 10
+    checkpoint.flush()
+    assert len(saved_blocks(path)) == 15
+
+
+def test_reloaded_checkpoint_resumes_saved_blocks(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    fingerprint = {"size": 1, "mtime": 1, "block_size": 1}
+    checkpoint = UploadCheckpoint(path, save_every=2)
+    checkpoint.staged(KEY, fingerprint)
+    for block in ("a", "b", "c"):
+        checkpoint.mark(KEY, block)
+    checkpoint.flush()
+
+    assert UploadCheckpoint(path).staged(KEY, fingerprint) == {"a", "b", "c"}
+    assert UploadCheckpoint(path).staged(KEY, {**fingerprint, "size": 2}) == set()
+
+
+class FakeBlob:
+    """In-memory blob client: staged and committed blocks, properties, server-side copies"""
+
+    def __init__(self, service, container, name):
+        self.service = service
+        self.container_name = container
+        self.blob_name = name
+        self.url = f"https://account/{container}/{name}"
+        self.data = None
+        self.md5 = None
+        self.uncommitted = {}
+        self.sent = []
+        self.committed = []
+
+    def get_blob_properties(self):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        if self.data is None:
+            raise ResourceNotFoundError("blob not found")
+        return SimpleNamespace(size=len(self.data), content_settings=SimpleNamespace(content_md5=self.md5),
+                               copy=SimpleNamespace(status="success"))
+
+    def get_block_list(self, block_list_type):
+        return [], [SimpleNamespace(id=block) for block in self.uncommitted]
+
+    def stage_block(self, block, data, length):
+        self.uncommitted[block] = bytes(data)
+        self.sent.append(block)
+
+    def commit_block_list(self, blocks, content_settings):
+        self.committed = [block.id for block in blocks]
+        self.data = b"".join(self.uncommitted[block] for block in self.committed)
+        self.md5 = content_settings.content_md5
+        self.uncommitted = {}
+
+    def start_copy_from_url(self, url):
+        source = next(blob for blob in self.service.blobs.values() if blob.url == url)
+        self.data, self.md5 = source.data, source.md5
+
+
+class FakeService:
+    def __init__(self):
+        self.blobs = {}
+
+    def get_blob_client(self, container, name):
+        return self.blobs.setdefault((container, name), FakeBlob(self, container, name))
+
+
+def fake_service(monkeypatch):
+    pytest.importorskip("azure.storage.blob")
+    service = FakeService()
+    monkeypatch.setattr(lake_uploader.session, "blob_service_client", lambda account: service)
+    return service
+
+
+def upload(path, containers=("dirpayrollfiles", "dirhistoryfiles"), **kwargs):
+    results = upload_file(str(path), "AgencyMaster.csv", list(containers), block_size=4, **kwargs)
+    return [r["action"] for r in results]
+
+
+def test_unchanged_blobs_are_skipped_and_extra_containers_copied(monkeypatch, tmp_path):
+    service = fake_service(monkeypatch)
+    path = tmp_path / "AgencyMaster.csv"
+    path.write_bytes(b"AgencyID,AgencyName\n")
+
+    assert upload(path) == ["uploaded", "copied"]
+    source = service.blobs[("dirpayrollfiles", "AgencyMaster.csv")]
+    sent = len(source.sent)
+    assert upload(path) == ["skipped", "skipped"]
+    assert len(source.sent) == sent
+
+    # a stale copy is refreshed although the first container is unchanged
+    service.blobs[("dirhistoryfiles", "AgencyMaster.csv")].data = b"old"
+    assert upload(path) == ["skipped", "copied"]
+    assert service.blobs[("dirhistoryfiles", "AgencyMaster.csv")].data == path.read_bytes()
+
+
+def test_reuploaded_source_is_copied_again(monkeypatch, tmp_path):
+    service = fake_service(monkeypatch)
+    path = tmp_path / "AgencyMaster.csv"
+    path.write_bytes(b"AgencyID,AgencyName\n")
+    upload(path)
+
+    path.write_bytes(b"AgencyID,AgencyName\n002,POLICE\n")
+
+    assert upload(path) == ["uploaded", "copied"]
+    assert service.blobs[("dirhistoryfiles", "AgencyMaster.csv")].data == path.read_bytes()
+
+
+def test_resume_sends_only_missing_blocks_and_commits_the_full_list(monkeypatch, tmp_path):
+    service = fake_service(monkeypatch)
+    path = tmp_path / "AgencyMaster.csv"
+    content = b"AgencyID,AgencyName\n"
+    path.write_bytes(content)
+    blob = service.get_blob_client("dirpayrollfiles", "AgencyMaster.csv")
+    checkpoint = UploadCheckpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.staged(blob.url, UploadCheckpoint.fingerprint(str(path), 4))
+    # blocks 0 and 1 were staged by the interrupted run, but the service discarded block 1
+    for index in (0, 1):
+        checkpoint.mark(blob.url, block_id(index))
+    blob.uncommitted[block_id(0)] = content[:4]
+
+    assert upload(path, ["dirpayrollfiles"], checkpoint=checkpoint) == ["uploaded"]
+
+    assert sorted(blob.sent) == [block_id(i) for i in range(1, 5)]
+    assert blob.committed == [block_id(i) for i in range(5)]
+    assert blob.data == content and bytes(blob.md5) == hashlib.md5(content).digest()
+    assert blob.url not in checkpoint.entries
@@ -0,0 +1,39 @@
+import shutil
+
+from bulk_loader import DATA_PATH, make_backend
+from normalized_load import FACT_TABLE, VIEW_NAME, KeyMap, load_normalized, payroll_files, run
+
+
+def test_key_map_assigns_each_tuple_one_key():
+    km = KeyMap("NYC_Payroll_Agency_Dim", "AgencyKey", ("AgencyID", "AgencyName"))
+
+    keys = [km.key_for(values) for values in [("1", "POLICE"), ("2", "FIRE"), ("1", "POLICE")]]
+
+    assert keys == [1, 2, 1]
+    assert km.pending == [(1, "1", "POLICE"), (2, "2", "FIRE")]
+
+
+def test_reload_keeps_surrogate_keys_and_the_view_matches_the_files(tmp_path):
+    backend = make_backend("sqlite", str(tmp_path / "local.db"))
+    try:
+        first = load_normalized(backend, batch_rows=7)
+        agencies = backend.fetchall("SELECT AgencyKey, AgencyID, AgencyName FROM NYC_Payroll_Agency_Dim")
+        load_normalized(backend, batch_rows=7)
+        reloaded = backend.fetchall("SELECT AgencyKey, AgencyID, AgencyName FROM NYC_Payroll_Agency_Dim")
+        facts = backend.fetchall(f"SELECT COUNT(*) FROM {FACT_TABLE}")[0][0]
+        view = backend.fetchall(f"SELECT COUNT(*) FROM {VIEW_NAME}")[0][0]
+    finally:
+        backend.close()
+
+    assert sorted(reloaded) == sorted(agencies)
+    assert facts == view == sum(r["rows"] for r in first)
+
+
+def test_run_reads_the_files_from_data_path(tmp_path):
+    data_path = tmp_path / "synthetic"
+    data_path.mkdir()
+    shutil.copy(f"{DATA_PATH}/nycpayroll_2021.csv", data_path / "nycpayroll_2030.csv")
+
+    results = run("sqlite", str(tmp_path / "local.db"), files=payroll_files(str(data_path)), data_path=str(data_path))
+
+    assert [(r["file"], r["rows"]) for r in results] == [("nycpayroll_2030.csv", 101)]
@@ -0,0 +1,46 @@
+import fnmatch
+
+import pytest
+
+from openrowset_cache import listing_prefix, normalize_sql, path_regex
+
+
+def test_normalize_sql_ignores_formatting_and_comments():
+    a = "SELECT  TOP 5 *\n  FROM t -- latest\nWHERE x = 1 /* block\ncomment */ ORDER BY x"
+    b = "SELECT TOP 5 * FROM t WHERE x = 1 ORDER BY x"
+
+    assert normalize_sql(a) == b
+
+
+def test_normalize_sql_keeps_literals_and_identifiers():
+    assert normalize_sql("WHERE a = 'A  B'") != normalize_sql("WHERE a = 'A B'")
+    assert normalize_sql("SELECT [Agency  Name] FROM t") == "SELECT [Agency  Name] FROM t"
+    assert normalize_sql('SELECT "x  y" FROM t') == 'SELECT "x  y" FROM t'
+    assert normalize_sql("WHERE a = 'x -- not a comment' AND b = 1") == "WHERE a = 'x -- not a comment' AND b = 1"
+    assert normalize_sql("WHERE a = 'it''s  here'") == "WHERE a = 'it''s  here'"
+
+
+@pytest.mark.parametrize("pattern, name, expected", [
+    ("part-*.csv", "part-00000.csv", True),
+    ("part-*.csv", "sub/part-00000.csv", False),
+    ("**/part-*.csv", "a/b/part-1.csv", True),
+    ("year=202?/*.csv", "year=2021/x.csv", True),
+    ("part-[0-9]*.csv", "part-7.csv", True),
+    ("part-[!0-9]*.csv", "part-7.csv", False),
+    ("data.v1+(x).csv", "data.v1+(x).csv", True),
+    ("data.v1+(x).csv", "dataXv1+(x).csv", False),
+    ("dirstaging/", "dirstaging/a/b.csv", True),
+])
+def test_path_regex(pattern, name, expected):
+    assert bool(path_regex(pattern).match(name)) is expected
+
+
+@pytest.mark.parametrize("part", ["a.b", "x[abc]y", "x[!a]y", "q?", "[]]", "(a|b)+"])
+def test_path_regex_agrees_with_fnmatch_within_a_folder(part):
+    for name in ["a.b", "axb", "xay", "xby", "xzy", "q1", "]", "(a|b)+", "ab"]:
+        assert bool(path_regex(part).match(name)) == fnmatch.fnmatchcase(name, part)
+
+
+def test_listing_prefix():
+    assert listing_prefix("year=2021/part-*.csv") == "year=2021/part-"
+    assert listing_prefix("plain.csv") == "plain.csv"
@@ -0,0 +1,38 @@
+import sqlite3
+
+from bulk_loader import SqliteBackend
+from parquet_landing import DATA_PATH, convert_to_parquet, iter_landing_batches
+from partitioned_load import load_from_parquet, load_partitioned
+
+PAYROLL_FILES = ["nycpayroll_2020.csv", "nycpayroll_2021.csv"]
+
+
+def build_landing(tmp_path):
+    landing = str(tmp_path / "landing")
+    convert_to_parquet([f"{DATA_PATH}/{name}" for name in PAYROLL_FILES], landing)
+    return landing
+
+
+def test_year_filter_reads_only_that_partition(tmp_path):
+    landing = build_landing(tmp_path)
+    years = set()
+    for batch in iter_landing_batches(landing, years=[2021], columns=["FiscalYear", "AgencyID"]):
+        years.update(batch.column("FiscalYear").to_pylist())
+    assert years == {2021}
+
+
+def test_parquet_load_matches_csv_load(tmp_path):
+    landing = build_landing(tmp_path)
+    query = "SELECT * FROM NYC_Payroll_Data ORDER BY FiscalYear, EmployeeID, TitleCode, TotalOtherPay"
+
+    csv_backend = SqliteBackend(str(tmp_path / "csv.db"))
+    load_partitioned(csv_backend)
+    csv_backend.close()
+
+    parquet_backend = SqliteBackend(str(tmp_path / "parquet.db"))
+    results = load_from_parquet(parquet_backend, landing)
+    parquet_backend.close()
+
+    assert results[0]["rows"] == 201
+    with sqlite3.connect(tmp_path / "csv.db") as a, sqlite3.connect(tmp_path / "parquet.db") as b:
+        assert a.execute(query).fetchall() == b.execute(query).fetchall()
@@ -0,0 +1,38 @@
+import shutil
+
+from bulk_loader import DATA_PATH, make_backend
+from partitioned_load import STAGE_TABLE, TABLE, load_partitioned
+
+HEADER = ("FiscalYear,PayrollNumber,AgencyID,AgencyName,EmployeeID,LastName,FirstName,AgencyStartDate,"
+          "WorkLocationBorough,TitleCode,TitleDescription,LeaveStatusasofJune30,BaseSalary,PayBasis,"
+          "RegularHours,RegularGrossPaid,OTHours,TotalOTPaid,TotalOtherPay")
+
+
+def year_counts(backend, table=TABLE):
+    return dict(backend.conn.execute(f'SELECT FiscalYear, COUNT(*) FROM "{table}" GROUP BY FiscalYear'))
+
+
+def test_year_shared_by_two_files_keeps_the_rows_of_both(tmp_path):
+    shutil.copy(f"{DATA_PATH}/nycpayroll_2020.csv", tmp_path)
+    # late record for 2020 arriving with the 2021 extract
+    (tmp_path / "nycpayroll_2021.csv").write_text(
+        HEADER + "\n"
+        "2021,17,2120,OFFICE OF EMERGENCY MANAGEMENT,10001,GEAGER,VERONICA,9/12/2016,BROOKLYN,40447,X,ACTIVE,"
+        "86005,per Annum,1820,84698,0,0,0\n"
+        "2020,17,2120,OFFICE OF EMERGENCY MANAGEMENT,10002,LATE,ROW,9/12/2016,BROOKLYN,40447,X,ACTIVE,"
+        "86005,per Annum,1820,100,0,0,0\n"
+    )
+    backend = make_backend("sqlite", str(tmp_path / "local.db"))
+    try:
+        results = load_partitioned(backend, ["nycpayroll_2020.csv", "nycpayroll_2021.csv"], str(tmp_path))
+        loaded = year_counts(backend)
+        staged = year_counts(backend, STAGE_TABLE)
+        # reloading replaces the years instead of adding to them
+        load_partitioned(backend, ["nycpayroll_2020.csv", "nycpayroll_2021.csv"], str(tmp_path))
+        reloaded = year_counts(backend)
+    finally:
+        backend.close()
+
+    assert loaded == reloaded == {1998: 1, 2020: 100, 2021: 1}
+    assert staged == {}
+    assert [r["years"] for r in results] == [{2020: 99, 1998: 1}, {2021: 1, 2020: 1}]
@@ -0,0 +1,41 @@
+from payroll_engine import compare_summary, compute_summary, read_summary, write_summary
+
+
+def write_csv(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_summary_sums_across_chunks_and_files(tmp_path):
+    a = write_csv(tmp_path / "nycpayroll_2020.csv", [
+        "FiscalYear,AgencyID,AgencyName,RegularGrossPaid,TotalOTPaid,TotalOtherPay",
+        "2020,1,POLICE,100,10,-5",
+        "2020,1,POLICE,200,,",
+        "2020,2,FIRE,50,0,0",
+    ])
+    # drifted header and no TotalOtherPay column (filled with nulls, like union byName)
+    b = write_csv(tmp_path / "nycpayroll_2021.csv", [
+        "FiscalYear,AgencyCode,AgencyName,RegularGrossPaid,TotalOTPaid",
+        "2021,1,POLICE,300,30",
+        "2021,9,PARKS,,",
+    ])
+
+    rows, count = compute_summary([a, b], chunk_rows=1)
+
+    assert count == 5
+    # a null in any part nulls the row's TotalPaid, and an all-null group stays null
+    assert rows == [(2020, "POLICE", 105.0), (2020, "FIRE", 50.0), (2021, "PARKS", None), (2021, "POLICE", None)]
+
+
+def test_written_summary_compares_clean_and_reports_differences(tmp_path):
+    rows = [(2020, "POLICE", 105.0), (2021, "PARKS", None)]
+    path = tmp_path / "summary.csv"
+
+    write_summary(rows, str(path))
+    expected = read_summary([str(path)])
+
+    assert compare_summary(rows, expected) == []
+    assert compare_summary([(2020, "POLICE", 105.1)], expected) == [
+        (("POLICE", 2020), 105.1, 105.0),
+        (("PARKS", 2021), "missing", None),
+    ]
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from adf_deploy import content_hash
+from pipeline_monitor import attached_deploy, dataflow_metrics, manifest_activity, pipeline_definition, run_records
+from pipeline_scheduler import INTEGRATION_RUNTIME, PAYROLL_STAGE_TABLE, PAYROLL_TABLE, RUNTIME_COMPUTE
+
+MANIFEST = {"batchCount": 5, "loads": [
+    {"activity": "Load_AgencyMaster", "fileSystem": "raw", "fileName": "AgencyMaster.csv",
+     "tableName": "NYC_Payroll_AGENCY_MD"},
+    {"activity": "Load_2020_Payroll", "fileSystem": "raw", "fileName": "nycpayroll_2020.csv",
+     "tableName": PAYROLL_TABLE, "fiscalYears": [2020]},
+    {"activity": "Load_2021_Payroll", "fileSystem": "raw", "fileName": "nycpayroll_2021.csv",
+     "tableName": PAYROLL_TABLE, "fiscalYears": [2021]},
+]}
+
+
+def activity_run(name, activity_type="ExecuteDataFlow", file_name=None, table=None, start_minute=0, **run_input):
+    if file_name or table:
+        run_input["dataflow"] = {"datasetParameters": {"source": {"fileName": file_name},
+                                                       "sink": {"tableName": table}}}
+    return SimpleNamespace(
+        activity_name=name, activity_type=activity_type, status="Succeeded", duration_in_ms=90_000,
+        activity_run_start=datetime(2026, 10, 18, 6, start_minute, tzinfo=timezone.utc),
+        input=run_input, output={}, error=None,
+    )
+
+
+def test_dataflow_metrics_counts_each_source_once():
+    output = {
+        "runStatus": {
+            "computeAcquisitionDuration": 180_000,
+            "metrics": {
+                "sinkSummary": {"rowsWritten": 10, "sinkProcessingTime": 2_000,
+                                "sources": {"sourcePayroll": {"rowsRead": 1_000}},
+                                "stages": [{"stage": 1, "time": 4_000}]},
+                "sinkAudit": {"rowsWritten": 1_000, "sinkPostProcessingTime": 500,
+                              "sources": {"sourcePayroll": {"rowsRead": 1_000}}},
+            },
+        },
+        "executionDetails": [{"detailedDurations": {"queuingDuration": 12}}],
+        "effectiveIntegrationRuntime": f"{INTEGRATION_RUNTIME} (East US)",
+    }
+
+    metrics = dataflow_metrics(output)
+
+    assert (metrics["rows_read"], metrics["rows_written"]) == (1_000, 1_010)
+    assert (metrics["sink_seconds"], metrics["cluster_startup_seconds"], metrics["queue_seconds"]) == (2.5, 180, 12)
+    assert metrics["stages"] == [{"sink": "sinkSummary", "stage": 1, "seconds": 4}]
+
+
+def test_dataflow_metrics_without_run_status():
+    metrics = dataflow_metrics(None)
+
+    assert metrics["rows_read"] is None and metrics["sink_seconds"] is None and metrics["stages"] == []
+
+
+def test_payroll_years_are_told_apart_by_their_file():
+    run = activity_run("Load_Year", file_name="nycpayroll_2021.csv", table=PAYROLL_STAGE_TABLE)
+
+    assert manifest_activity(run, MANIFEST) == "Load_2021_Payroll"
+    assert manifest_activity(activity_run("Load_File", table="NYC_Payroll_AGENCY_MD"), MANIFEST) == "Load_AgencyMaster"
+    assert manifest_activity(activity_run("Load_File", file_name="other.csv"), MANIFEST) == "Load_File"
+
+
+def test_run_records_label_loads_and_take_the_runtime_size():
+    run = SimpleNamespace(run_id="run-1", pipeline_name="pl", run_start=None)
+    runs = [
+        activity_run("Load_Year", file_name="nycpayroll_2020.csv", table=PAYROLL_STAGE_TABLE, start_minute=2,
+                     integrationRuntime={"referenceName": INTEGRATION_RUNTIME}),
+        activity_run("Prepare_Years", "SqlServerStoredProcedure", start_minute=1),
+        activity_run("Aggregate_Payroll_Summary", start_minute=3,
+                     compute={"coreCount": 32, "computeType": "MemoryOptimized"}),
+    ]
+
+    records = run_records(run, runs, MANIFEST, deploy="abc")
+
+    assert [r["activity"] for r in records] == ["Prepare_Years", "Load_2020_Payroll", "Aggregate_Payroll_Summary"]
+    assert "core_count" not in records[0]
+    assert (records[1]["core_count"], records[1]["compute_type"]) == (RUNTIME_COMPUTE["coreCount"], "General")
+    assert (records[2]["core_count"], records[2]["compute_type"]) == (32, "MemoryOptimized")
+    assert records[1]["duration_seconds"] == 90 and records[1]["deploy"] == "abc"
+
+
+def test_pipeline_definition_hashes_without_the_publish_time():
+    properties = {"activities": [{"name": "Load_Manifest_Files"}], "lastPublishTime": "2026-10-18T05:00:00Z"}
+    resource = SimpleNamespace(serialize=lambda: {"name": "pl", "properties": properties})
+    client = SimpleNamespace(pipelines=SimpleNamespace(get=lambda *args: resource))
+
+    deploy, published = pipeline_definition(client)
+
+    assert deploy == content_hash({"activities": [{"name": "Load_Manifest_Files"}]})[:12]
+    assert published == datetime(2026, 10, 18, 5, 0, tzinfo=timezone.utc)
+
+
+def test_attached_run_keeps_the_hash_only_if_published_before_it_started():
+    start = datetime(2026, 10, 18, 6, 0, tzinfo=timezone.utc)
+
+    assert attached_deploy("abc", datetime(2026, 10, 18, 5, 0, tzinfo=timezone.utc), start) == "abc"
+    assert attached_deploy("abc", datetime(2026, 10, 18, 7, 0, tzinfo=timezone.utc), start) is None
+    assert attached_deploy("abc", None, start) is None
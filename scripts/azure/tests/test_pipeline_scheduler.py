@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+
+import pytest
+
+from bulk_loader import DATA_PATH
+from pipeline_scheduler import (
+    FOREACH_ACTIVITY,
+    INTEGRATION_RUNTIME,
+    ITEM_YEARS,
+    PAYROLL_STAGE_TABLE,
+    PAYROLL_TABLE,
+    build_manifest_pipeline,
+    build_pipeline,
+    derive_manifest_dependencies,
+    load_manifest,
+    manifest_io,
+    oversized,
+    simulate_manifest,
+    simulate_pipeline,
+)
+
+MASTER = {"activity": "Load_AgencyMaster", "fileSystem": "raw", "fileName": "AgencyMaster.csv",
+          "tableName": "NYC_Payroll_AGENCY_MD"}
+
+
+def year(fiscal_year, *late_years):
+    return {"activity": f"Load_{fiscal_year}_Payroll", "fileSystem": "raw", "fileName": f"nycpayroll_{fiscal_year}.csv",
+            "tableName": PAYROLL_TABLE, "fiscalYears": [fiscal_year, *late_years]}
+
+
+def write_manifest(tmp_path, loads, batch_count=5):
+    path = tmp_path / "load_manifest.json"
+    path.write_text(json.dumps({"batchCount": batch_count, "loads": loads}))
+    return str(path)
+
+
+def test_payroll_years_share_the_partitioned_table(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020), year(2021), year(2022)]))
+
+    _, writes = manifest_io(manifest["loads"][1])
+
+    assert len(manifest["loads"]) == 4
+    assert {target[-1] for target in writes} == {PAYROLL_TABLE, PAYROLL_STAGE_TABLE}
+
+
+def test_aggregate_waits_for_the_loads_through_the_partitioned_table(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020), year(2021)]))
+
+    dependencies = derive_manifest_dependencies(manifest)
+
+    assert dependencies == {FOREACH_ACTIVITY: [], "Aggregate_Payroll_Summary": [FOREACH_ACTIVITY]}
+
+
+def test_aggregate_starts_at_once_when_no_load_writes_what_it_reads(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER]))
+
+    dependencies = derive_manifest_dependencies(manifest)
+
+    assert dependencies == {FOREACH_ACTIVITY: [], "Aggregate_Payroll_Summary": []}
+
+
+@pytest.mark.parametrize("loads, batch_count, message", [
+    ([MASTER, dict(MASTER, activity="Load_Again")], 5, "tables loaded by more than one entry: NYC_Payroll_AGENCY_MD"),
+    ([year(2020), dict(year(2020), activity="Load_Again")], 5, f"{PAYROLL_TABLE} FiscalYear 2020"),
+    ([year(2021, 2020), year(2020)], 5, f"{PAYROLL_TABLE} FiscalYear 2020"),
+    ([dict(MASTER, fiscalYears=[2020])], 5, "fiscalYears is required for NYC_Payroll_Data and only allowed there"),
+    ([dict(MASTER, tableName=PAYROLL_TABLE)], 5, "fiscalYears is required"),
+    ([dict(year(2020), fiscalYears=[])], 5, "fiscalYears must be a non-empty list of years"),
+    ([dict(year(2020), fiscalYears="2020")], 5, "fiscalYears must be a non-empty list of years"),
+    ([MASTER], 0, "batchCount must be 1..50"),
+    ([MASTER], 51, "batchCount must be 1..50"),
+])
+def test_load_manifest_rejects_invalid_manifests(tmp_path, loads, batch_count, message):
+    with pytest.raises(ValueError, match=message):
+        load_manifest(write_manifest(tmp_path, loads, batch_count))
+
+
+def test_payroll_years_take_the_partition_switch_branch(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020)]))
+    pipeline = build_manifest_pipeline(manifest, derive_manifest_dependencies(manifest))["properties"]
+
+    branch = pipeline["activities"][0]["typeProperties"]["activities"][0]
+    prepare, load, switch = branch["typeProperties"]["ifTrueActivities"]
+    (load_file,) = branch["typeProperties"]["ifFalseActivities"]
+
+    assert branch["typeProperties"]["expression"]["value"] == "@contains(item(), 'fiscalYears')"
+    assert prepare["typeProperties"]["storedProcedureName"] == "[dbo].[usp_Prepare_Payroll_Years]"
+    assert load["dependsOn"][0]["activity"] == prepare["name"]
+    assert load["typeProperties"]["dataFlow"]["datasetParameters"]["sink"]["tableName"] == PAYROLL_STAGE_TABLE
+    assert switch["dependsOn"][0]["activity"] == load["name"]
+    assert switch["typeProperties"]["storedProcedureName"] == "[dbo].[usp_Switch_Payroll_Years]"
+    assert load_file["typeProperties"]["dataFlow"]["referenceName"] == "df_Load_Generic"
+    assert prepare["typeProperties"]["storedProcedureParameters"]["FiscalYears"]["value"]["value"] == ITEM_YEARS
+    assert load["typeProperties"]["dataFlow"]["parameters"]["fiscalYears"]["value"] == ITEM_YEARS
+    assert [item["fiscalYears"] for item in pipeline["parameters"]["loadManifest"]["defaultValue"][1:]] == [[2020]]
+
+
+def test_manifest_lists_every_year_in_the_payroll_files():
+    for entry in load_manifest()["loads"]:
+        if "fiscalYears" in entry:
+            with open(os.path.join(DATA_PATH, entry["fileName"]), newline="", encoding="utf-8") as f:
+                years = {int(row["FiscalYear"]) for row in csv.DictReader(f)}
+            assert sorted(entry["fiscalYears"]) == sorted(years)
+
+
+def test_deployed_foreach_pipeline_is_simulated_with_its_own_items(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020), year(2021)], batch_count=1))
+    deployed = build_manifest_pipeline(manifest, derive_manifest_dependencies(manifest))["properties"]
+    durations = {"Load_AgencyMaster": 10, "Load_2020_Payroll": 100, "Load_2021_Payroll": 100,
+                 "Aggregate_Payroll_Summary": 50}
+
+    dependencies, result = simulate_pipeline(deployed, durations)
+
+    assert dependencies == {FOREACH_ACTIVITY: [], "Aggregate_Payroll_Summary": [FOREACH_ACTIVITY]}
+    assert result["durations"][FOREACH_ACTIVITY] == 210
+    assert result["makespan"] == 260
+
+
+def test_saving_against_a_chained_per_file_pipeline(tmp_path):
+    chain = {"Load_AgencyMaster": [], "Load_2020_Payroll": ["Load_AgencyMaster"],
+             "Load_2021_Payroll": ["Load_2020_Payroll"], "Aggregate_Payroll_Summary": ["Load_2021_Payroll"]}
+    deployed = build_pipeline(chain, [(name, "df") for name in chain])["properties"]
+    durations = {"Load_AgencyMaster": 10, "Load_2020_Payroll": 100, "Load_2021_Payroll": 100,
+                 "Aggregate_Payroll_Summary": 50}
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020), year(2021)]))
+
+    _, before = simulate_pipeline(deployed, durations)
+    after = simulate_manifest(manifest, derive_manifest_dependencies(manifest), durations)
+
+    assert before["makespan"] == 260
+    assert after["makespan"] == 150
+
+
+def test_activities_get_a_runtime_or_compute_never_both(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020)]))
+    big = {"coreCount": 32, "computeType": "MemoryOptimized"}
+    small = {"coreCount": 8, "computeType": "General"}
+
+    def post_activity(compute):
+        pipeline = build_manifest_pipeline(manifest, derive_manifest_dependencies(manifest), compute=compute)
+        return pipeline["properties"]["activities"][1]["typeProperties"]
+
+    assert post_activity({"Aggregate_Payroll_Summary": small}) == {
+        "dataFlow": {"referenceName": "Dataflow_Summary_Aggregate", "type": "DataFlowReference"},
+        "traceLevel": "Fine",
+        "integrationRuntime": {"referenceName": INTEGRATION_RUNTIME, "type": "IntegrationRuntimeReference"},
+    }
+    on_auto_resolve = post_activity({"Aggregate_Payroll_Summary": big})
+    assert on_auto_resolve["compute"] == big and "integrationRuntime" not in on_auto_resolve
+
+
+def test_manifest_loads_share_the_runtime_and_report_oversized_entries(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER, year(2020)]))
+    compute = {"Load_2020_Payroll": {"coreCount": 16, "computeType": "General"}}
+
+    pipeline = build_manifest_pipeline(manifest, derive_manifest_dependencies(manifest), compute=compute)
+    branch = pipeline["properties"]["activities"][0]["typeProperties"]["activities"][0]["typeProperties"]
+    load_file = branch["ifFalseActivities"][0]["typeProperties"]
+
+    assert "compute" not in load_file and load_file["integrationRuntime"]["referenceName"] == INTEGRATION_RUNTIME
+    assert "coreCount" not in pipeline["properties"]["parameters"]["loadManifest"]["defaultValue"][1]
+    assert oversized(manifest, compute) == ["Load_2020_Payroll"]
+
+
+def test_without_a_runtime_items_carry_their_compute(tmp_path):
+    manifest = load_manifest(write_manifest(tmp_path, [MASTER]))
+
+    pipeline = build_manifest_pipeline(manifest, derive_manifest_dependencies(manifest), integration_runtime=None)
+    item = pipeline["properties"]["parameters"]["loadManifest"]["defaultValue"][0]
+    aggregate = pipeline["properties"]["activities"][1]["typeProperties"]
+
+    assert (item["coreCount"], item["computeType"]) == (8, "General")
+    assert aggregate["compute"] == {"coreCount": 8, "computeType": "General"}
+    assert "integrationRuntime" not in aggregate
@@ -0,0 +1,41 @@
+import asyncio
+
+import azure_session as session
+from provision_async import critical_path, integration_runtime_body, provision
+
+
+def test_failure_skips_only_downstream_resources():
+    order = []
+
+    def step(name, fail=False):
+        async def create(clients):
+            await asyncio.sleep(0)
+            order.append(name)
+            if fail:
+                raise RuntimeError(f"{name} quota")
+        return create
+
+    resources = {
+        "server": ([], step("server"), "server"),
+        "database": (["server"], step("database", fail=True), "database"),
+        "firewall": (["database"], step("firewall"), "firewall"),
+        "factory": ([], step("factory"), "factory"),
+    }
+
+    results = asyncio.run(provision(None, resources))
+
+    assert {name: status.split(":")[0] for name, (status, _) in results.items()} == {
+        "server": "succeeded", "database": "failed", "firewall": "skipped", "factory": "succeeded",
+    }
+    assert order.index("server") < order.index("database") and "firewall" not in order
+
+
+def test_critical_path_runs_through_the_synapse_chain():
+    assert critical_path() == ["synapse_storage", "synapse_container", "synapse_workspace", "synapse_firewall"]
+
+
+def test_integration_runtime_keeps_warm_clusters_of_the_shared_size():
+    properties = integration_runtime_body()["properties"]["typeProperties"]["computeProperties"]["dataFlowProperties"]
+
+    assert properties["timeToLive"] == session.DATAFLOW_TTL_MINUTES and properties["cleanup"] is False
+    assert {"coreCount": properties["coreCount"], "computeType": properties["computeType"]} == session.DATAFLOW_COMPUTE
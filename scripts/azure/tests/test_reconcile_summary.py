@@ -0,0 +1,37 @@
+import io
+
+from reconcile_summary import ChunkStream, iter_summary_csv, normalize, reconcile
+
+ROWS = [(2020, "POLICE", 105.0), (2020, "FIRE", 50.0), (2021, "PARKS", None)]
+
+
+def test_normalize_trims_names_and_rounds_to_cents():
+    assert normalize("2021", " PARKS ", "12.346") == ((2021, "PARKS"), 1235)
+    assert normalize(None, None, "") == ((None, ""), None)
+
+
+def test_identical_sources_agree_in_any_order():
+    report = reconcile({"sql": lambda: iter(ROWS), "lake": lambda: iter(ROWS[::-1])}, buckets=8)
+
+    assert report == {"rows": {"sql": 3, "lake": 3}, "buckets_mismatched": 0, "differences": [], "agree": True}
+
+
+def test_differences_are_classified():
+    lake = [(2020, "POLICE", 105.01), (2020, "FIRE", 51.0), (2020, "FIRE", 51.0)]
+    synapse = [(2020, "POLICE", 105.0), (2020, "FIRE", 50.0), (2021, "PARKS", 7.5)]
+
+    report = reconcile({"sql": lambda: iter(ROWS), "lake": lambda: iter(lake)}, buckets=4)
+    kinds = {d["key"]: d["kind"] for d in report["differences"]}
+
+    assert kinds == {(2020, "POLICE"): "rounding", (2020, "FIRE"): "duplicate", (2021, "PARKS"): "missing"}
+    assert not report["agree"]
+    value = reconcile({"sql": lambda: iter(ROWS), "synapse": lambda: iter(synapse)}, buckets=4)
+    assert [(d["key"], d["kind"]) for d in value["differences"]] == [((2021, "PARKS"), "value")]
+
+
+def test_summary_csv_streams_from_byte_chunks():
+    chunks = [b"FiscalYear,AgencyName,TotalPaid\n20", b"20,POLICE,105.0\n", b"2021,PARKS,\n"]
+
+    stream = io.TextIOWrapper(io.BufferedReader(ChunkStream(chunks)), encoding="utf-8", newline="")
+
+    assert list(iter_summary_csv(stream)) == [("2020", "POLICE", "105.0"), ("2021", "PARKS", "")]
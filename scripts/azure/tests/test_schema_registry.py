@@ -0,0 +1,25 @@
+import os
+
+from schema_registry import DATA_PATH, canonical_name, read_header, resolve
+
+
+def test_names_fold_case_spaces_and_aliases():
+    assert canonical_name(" agency code ") == "AgencyID"
+    assert canonical_name("Fiscal_Year") == "FiscalYear"
+    assert canonical_name("Bonus") == "Bonus"
+
+
+def test_registered_extracts_resolve_to_the_full_schema():
+    for name in ("nycpayroll_2020.csv", "nycpayroll_2021.csv"):
+        resolved = resolve(read_header(os.path.join(DATA_PATH, name)))
+
+        assert resolved["known"] and resolved["missing"] == [] and resolved["unknown"] == []
+    assert resolved["renamed"] == {"AgencyCode": "AgencyID"}
+
+
+def test_drifted_header_reports_missing_and_unknown_columns():
+    resolved = resolve(["FiscalYear", "AGENCY_ID", "Bonus"])
+
+    assert not resolved["known"]
+    assert resolved["columns"] == ["FiscalYear", "AgencyID", "Bonus"]
+    assert resolved["unknown"] == ["Bonus"] and "TotalOtherPay" in resolved["missing"]
@@ -0,0 +1,48 @@
+import pytest
+
+import sql_pool
+
+
+class TransientError(Exception):
+    pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(sql_pool.time, "sleep", lambda seconds: None)
+    pool = sql_pool.ConnectionPool("sql", conn_str="DRIVER=fake")
+    monkeypatch.setitem(sql_pool._pools, "sql", pool)
+    return pool
+
+
+def failing_connect(pool, monkeypatch):
+    calls = []
+
+    def connect():
+        calls.append(1)
+        raise TransientError("40613 Database is not currently available")
+
+    monkeypatch.setattr(pool, "_connect", connect)
+    return calls
+
+
+def test_run_retries_connect_at_one_level(pool, monkeypatch):
+    calls = failing_connect(pool, monkeypatch)
+
+    with pytest.raises(TransientError):
+        sql_pool.run("sql", lambda conn: None, retries=2)
+
+    assert len(calls) == 3
+
+
+def test_connection_retries_connect(pool, monkeypatch):
+    calls = failing_connect(pool, monkeypatch)
+
+    with pytest.raises(TransientError):
+        with sql_pool.connection("sql", retries=2):
+            pass
+
+    assert len(calls) == 3
+    # Every failed attempt gave its slot back
+    for _ in range(sql_pool.POOL_SIZE):
+        assert pool.slots.acquire(blocking=False)
@@ -0,0 +1,35 @@
+import importlib
+
+verify = importlib.import_module("11_verify_results")
+
+
+class FakeCursor:
+    def __init__(self, results):
+        self.results = list(results)
+        self.rows = []
+
+    def execute(self, sql):
+        self.rows = self.results.pop(0)
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_summary_tolerates_null_year_and_total():
+    cursor = FakeCursor([
+        [(None, 3, None), (2020, 5, 125.5)],
+        [(2020, "POLICE", 100.0), (None, None, None)],
+    ])
+
+    summary = verify.summarize_summary_table(cursor, "NYC_Payroll_Summary")
+
+    assert summary["years"] == [(None, 3, 0.0), (2020, 5, 125.5)]
+    assert summary["records"] == 8
+    verify.print_summary(summary)
+
+
+def test_summary_files_match_spark_part_files():
+    files = ["part-00000-1f2e.c000.csv", "_SUCCESS", "other/notes.txt", "sub/NYC_Payroll_Summary.csv"]
+
+    assert verify.summary_files(files) == ["part-00000-1f2e.c000.csv", "sub/NYC_Payroll_Summary.csv"]
+    assert verify.summary_files(["_SUCCESS"]) == []
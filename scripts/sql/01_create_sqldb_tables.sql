@@ -35,54 +35,9 @@ GO
 -- Payroll Transaction Tables
 -- -----------------------------------------------------------------------------
 
--- Payroll 2020 Transaction Data Table (Historical)
-CREATE TABLE [dbo].[NYC_Payroll_Data_2020](
-    [FiscalYear] [int] NULL,
-    [PayrollNumber] [int] NULL,
-    [AgencyID] [varchar](10) NULL,
-    [AgencyName] [varchar](50) NULL,
-    [EmployeeID] [varchar](10) NULL,
-    [LastName] [varchar](20) NULL,
-    [FirstName] [varchar](20) NULL,
-    [AgencyStartDate] [date] NULL,
-    [WorkLocationBorough] [varchar](50) NULL,
-    [TitleCode] [varchar](10) NULL,
-    [TitleDescription] [varchar](100) NULL,
-    [LeaveStatusasofJune30] [varchar](50) NULL,
-    [BaseSalary] [float] NULL,
-    [PayBasis] [varchar](50) NULL,
-    [RegularHours] [float] NULL,
-    [RegularGrossPaid] [float] NULL,
-    [OTHours] [float] NULL,
-    [TotalOTPaid] [float] NULL,
-    [TotalOtherPay] [float] NULL
-);
-GO
-
--- Payroll 2021 Transaction Data Table (Current)
--- Note: Uses AgencyCode instead of AgencyID
-CREATE TABLE [dbo].[NYC_Payroll_Data_2021](
-    [FiscalYear] [int] NULL,
-    [PayrollNumber] [int] NULL,
-    [AgencyCode] [varchar](10) NULL,
-    [AgencyName] [varchar](50) NULL,
-    [EmployeeID] [varchar](10) NULL,
-    [LastName] [varchar](20) NULL,
-    [FirstName] [varchar](20) NULL,
-    [AgencyStartDate] [date] NULL,
-    [WorkLocationBorough] [varchar](50) NULL,
-    [TitleCode] [varchar](10) NULL,
-    [TitleDescription] [varchar](100) NULL,
-    [LeaveStatusasofJune30] [varchar](50) NULL,
-    [BaseSalary] [float] NULL,
-    [PayBasis] [varchar](50) NULL,
-    [RegularHours] [float] NULL,
-    [RegularGrossPaid] [float] NULL,
-    [OTHours] [float] NULL,
-    [TotalOTPaid] [float] NULL,
-    [TotalOtherPay] [float] NULL
-);
-GO
+-- Every fiscal year is loaded into the FiscalYear-partitioned NYC_Payroll_Data
+-- (07_create_partitioned_payroll.sql), which replaces the per-year tables
+-- NYC_Payroll_Data_2020 and NYC_Payroll_Data_2021
 
 -- -----------------------------------------------------------------------------
 -- Summary/Destination Table
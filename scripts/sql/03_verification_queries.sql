@@ -16,9 +16,7 @@ SELECT 'NYC_Payroll_TITLE_MD', COUNT(*) FROM [dbo].[NYC_Payroll_TITLE_MD]
 UNION ALL
 SELECT 'NYC_Payroll_AGENCY_MD', COUNT(*) FROM [dbo].[NYC_Payroll_AGENCY_MD]
 UNION ALL
-SELECT 'NYC_Payroll_Data_2020', COUNT(*) FROM [dbo].[NYC_Payroll_Data_2020]
-UNION ALL
-SELECT 'NYC_Payroll_Data_2021', COUNT(*) FROM [dbo].[NYC_Payroll_Data_2021]
+SELECT 'NYC_Payroll_Data', COUNT(*) FROM [dbo].[NYC_Payroll_Data]
 UNION ALL
 SELECT 'NYC_Payroll_Summary', COUNT(*) FROM [dbo].[NYC_Payroll_Summary];
 GO
@@ -35,12 +33,18 @@ GO
 SELECT TOP 10 * FROM [dbo].[NYC_Payroll_AGENCY_MD];
 GO
 
--- Sample data from 2020 Payroll
-SELECT TOP 10 * FROM [dbo].[NYC_Payroll_Data_2020];
+-- Sample data from 2021 Payroll (one partition of NYC_Payroll_Data)
+SELECT TOP 10 * FROM [dbo].[NYC_Payroll_Data] WHERE FiscalYear = 2021;
 GO
 
--- Sample data from 2021 Payroll
-SELECT TOP 10 * FROM [dbo].[NYC_Payroll_Data_2021];
+-- Paid totals per year from the partitioned payroll table (one partition per year)
+SELECT 
+    FiscalYear,
+    COUNT(*) AS PayrollRows,
+    SUM(RegularGrossPaid + TotalOTPaid + TotalOtherPay) AS TotalPaid
+FROM [dbo].[NYC_Payroll_Data]
+GROUP BY FiscalYear
+ORDER BY FiscalYear;
 GO
 
 -- Query Summary Table (Destination) - Run after pipeline execution
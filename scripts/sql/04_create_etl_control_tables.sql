@@ -0,0 +1,37 @@
+-- =============================================================================
+-- NYC Payroll Data Analytics - ETL Control Tables
+-- =============================================================================
+-- Purpose: State for incremental payroll loads (scripts/azure/incremental_load.py)
+-- The loader creates these automatically if they are missing
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- File Watermarks
+-- -----------------------------------------------------------------------------
+
+-- Last loaded modified-time and size per source file
+-- An unchanged file (same LastModifiedUtc and FileSize) is skipped entirely
+CREATE TABLE [dbo].[ETL_File_Watermark](
+    [SourceFile] [varchar](260) NULL,
+    [TableName] [varchar](128) NULL,
+    [LastModifiedUtc] [varchar](40) NULL,
+    [FileSize] [bigint] NULL,
+    [LoadedAtUtc] [varchar](40) NULL
+);
+GO
+
+-- -----------------------------------------------------------------------------
+-- Payroll Slice Digests
+-- -----------------------------------------------------------------------------
+
+-- One row per (FiscalYear, PayrollNumber) slice loaded into NYC_Payroll_Data
+-- Only fiscal years with a slice whose SliceRows or Digest changed are
+-- restaged and switched in
+CREATE TABLE [dbo].[ETL_Payroll_Slice](
+    [TableName] [varchar](128) NULL,
+    [FiscalYear] [int] NULL,
+    [PayrollNumber] [int] NULL,
+    [SliceRows] [bigint] NULL,
+    [Digest] [varchar](32) NULL
+);
+GO
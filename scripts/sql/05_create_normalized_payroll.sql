@@ -0,0 +1,112 @@
+-- =============================================================================
+-- NYC Payroll Data Analytics - Normalized Payroll Fact Storage
+-- =============================================================================
+-- Purpose: Star layout for payroll rows with integer surrogate keys
+-- NYC_Payroll_Data repeats EmployeeID, names, AgencyName and
+-- TitleDescription as varchar on every row. Here each distinct value set is
+-- stored once in a dimension and the fact row carries small integer keys.
+-- Loaded by scripts/azure/normalized_load.py (bulk_loader.py --layout normalized)
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- Dimensions (one row per distinct attribute combination)
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE [dbo].[NYC_Payroll_Agency_Dim](
+    [AgencyKey] [int] NOT NULL PRIMARY KEY,
+    [AgencyID] [varchar](10) NULL,
+    [AgencyName] [varchar](50) NULL
+);
+GO
+
+CREATE TABLE [dbo].[NYC_Payroll_Employee_Dim](
+    [EmployeeKey] [int] NOT NULL PRIMARY KEY,
+    [EmployeeID] [varchar](10) NULL,
+    [LastName] [varchar](20) NULL,
+    [FirstName] [varchar](20) NULL
+);
+GO
+
+CREATE TABLE [dbo].[NYC_Payroll_Title_Dim](
+    [TitleKey] [int] NOT NULL PRIMARY KEY,
+    [TitleCode] [varchar](10) NULL,
+    [TitleDescription] [varchar](100) NULL
+);
+GO
+
+-- Low-cardinality text columns, dictionary-encoded
+CREATE TABLE [dbo].[NYC_Payroll_Borough_Dim](
+    [BoroughKey] [smallint] NOT NULL PRIMARY KEY,
+    [WorkLocationBorough] [varchar](50) NULL
+);
+GO
+
+CREATE TABLE [dbo].[NYC_Payroll_LeaveStatus_Dim](
+    [LeaveStatusKey] [smallint] NOT NULL PRIMARY KEY,
+    [LeaveStatusasofJune30] [varchar](50) NULL
+);
+GO
+
+CREATE TABLE [dbo].[NYC_Payroll_PayBasis_Dim](
+    [PayBasisKey] [smallint] NOT NULL PRIMARY KEY,
+    [PayBasis] [varchar](50) NULL
+);
+GO
+
+-- -----------------------------------------------------------------------------
+-- Fact Table (all fiscal years)
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE [dbo].[NYC_Payroll_Fact](
+    [FiscalYear] [smallint] NULL,
+    [PayrollNumber] [smallint] NULL,
+    [AgencyKey] [int] NOT NULL,
+    [EmployeeKey] [int] NOT NULL,
+    [TitleKey] [int] NOT NULL,
+    [AgencyStartDate] [date] NULL,
+    [BoroughKey] [smallint] NOT NULL,
+    [LeaveStatusKey] [smallint] NOT NULL,
+    [BaseSalary] [float] NULL,
+    [PayBasisKey] [smallint] NOT NULL,
+    [RegularHours] [float] NULL,
+    [RegularGrossPaid] [float] NULL,
+    [OTHours] [float] NULL,
+    [TotalOTPaid] [float] NULL,
+    [TotalOtherPay] [float] NULL
+);
+GO
+
+-- -----------------------------------------------------------------------------
+-- Compatibility View
+-- -----------------------------------------------------------------------------
+
+-- Same 19 columns as NYC_Payroll_Data (canonical AgencyID name)
+CREATE VIEW [dbo].[vw_NYC_Payroll_Data] AS
+SELECT
+    f.[FiscalYear],
+    f.[PayrollNumber],
+    a.[AgencyID],
+    a.[AgencyName],
+    e.[EmployeeID],
+    e.[LastName],
+    e.[FirstName],
+    f.[AgencyStartDate],
+    b.[WorkLocationBorough],
+    t.[TitleCode],
+    t.[TitleDescription],
+    l.[LeaveStatusasofJune30],
+    f.[BaseSalary],
+    p.[PayBasis],
+    f.[RegularHours],
+    f.[RegularGrossPaid],
+    f.[OTHours],
+    f.[TotalOTPaid],
+    f.[TotalOtherPay]
+FROM [dbo].[NYC_Payroll_Fact] f
+JOIN [dbo].[NYC_Payroll_Agency_Dim] a ON a.[AgencyKey] = f.[AgencyKey]
+JOIN [dbo].[NYC_Payroll_Employee_Dim] e ON e.[EmployeeKey] = f.[EmployeeKey]
+JOIN [dbo].[NYC_Payroll_Title_Dim] t ON t.[TitleKey] = f.[TitleKey]
+JOIN [dbo].[NYC_Payroll_Borough_Dim] b ON b.[BoroughKey] = f.[BoroughKey]
+JOIN [dbo].[NYC_Payroll_LeaveStatus_Dim] l ON l.[LeaveStatusKey] = f.[LeaveStatusKey]
+JOIN [dbo].[NYC_Payroll_PayBasis_Dim] p ON p.[PayBasisKey] = f.[PayBasisKey];
+GO
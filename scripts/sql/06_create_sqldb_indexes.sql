@@ -0,0 +1,79 @@
+-- =============================================================================
+-- NYC Payroll Data Analytics - Indexed Schema Profile
+-- =============================================================================
+-- Purpose: Alternative physical design for the tables from 01_create_sqldb_tables.sql
+-- and 07_create_partitioned_payroll.sql
+-- 01 creates every table as a heap, so every lookup and aggregate is a full scan.
+-- Run this script after 01 (and after loading) to switch to the indexed profile;
+-- scripts/azure/benchmark_schema.py compares both profiles on 03_verification_queries.sql
+--
+-- NOTE: Columnstore indexes need Standard S3 / vCore or higher, and 01 /
+-- provision_async.py create the database as Basic. The payroll tables check the
+-- service objective and fall back to a page-compressed clustered rowstore index
+-- on (FiscalYear, AgencyName) on Basic and S0-S2, printing a note.
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- Master Data Tables: clustered on the lookup key
+-- -----------------------------------------------------------------------------
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CIX_NYC_Payroll_EMP_MD_EmployeeID')
+CREATE CLUSTERED INDEX [CIX_NYC_Payroll_EMP_MD_EmployeeID] ON [dbo].[NYC_Payroll_EMP_MD] ([EmployeeID]);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CIX_NYC_Payroll_TITLE_MD_TitleCode')
+CREATE CLUSTERED INDEX [CIX_NYC_Payroll_TITLE_MD_TitleCode] ON [dbo].[NYC_Payroll_TITLE_MD] ([TitleCode]);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CIX_NYC_Payroll_AGENCY_MD_AgencyID')
+CREATE CLUSTERED INDEX [CIX_NYC_Payroll_AGENCY_MD_AgencyID] ON [dbo].[NYC_Payroll_AGENCY_MD] ([AgencyID]);
+GO
+
+-- -----------------------------------------------------------------------------
+-- Payroll Fact Table: clustered columnstore (compressed, column-at-a-time scans)
+-- Basic / S0-S2 have no columnstore: clustered rowstore on the GROUP BY keys
+-- -----------------------------------------------------------------------------
+
+-- NYC_Payroll_Data and its staging table get the same index, aligned to
+-- ps_FiscalYear: SWITCH PARTITION requires identical indexes on both sides
+IF CAST(ISNULL(DATABASEPROPERTYEX(DB_NAME(), 'ServiceObjective'), '') AS NVARCHAR(128)) NOT IN ('Basic', 'S0', 'S1', 'S2')
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CCI_NYC_Payroll_Data')
+    CREATE CLUSTERED COLUMNSTORE INDEX [CCI_NYC_Payroll_Data] ON [dbo].[NYC_Payroll_Data]
+        ON [ps_FiscalYear]([FiscalYear]);
+END
+ELSE IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CIX_NYC_Payroll_Data_FiscalYear_AgencyName')
+BEGIN
+    PRINT 'NOTE: columnstore is not available on this service tier; NYC_Payroll_Data gets a rowstore clustered index';
+    CREATE CLUSTERED INDEX [CIX_NYC_Payroll_Data_FiscalYear_AgencyName]
+        ON [dbo].[NYC_Payroll_Data] ([FiscalYear], [AgencyName])
+        WITH (DATA_COMPRESSION = PAGE)
+        ON [ps_FiscalYear]([FiscalYear]);
+END
+GO
+
+IF CAST(ISNULL(DATABASEPROPERTYEX(DB_NAME(), 'ServiceObjective'), '') AS NVARCHAR(128)) NOT IN ('Basic', 'S0', 'S1', 'S2')
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CCI_NYC_Payroll_Data_Stage')
+    CREATE CLUSTERED COLUMNSTORE INDEX [CCI_NYC_Payroll_Data_Stage] ON [dbo].[NYC_Payroll_Data_Stage]
+        ON [ps_FiscalYear]([FiscalYear]);
+END
+ELSE IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'CIX_NYC_Payroll_Data_Stage_FiscalYear_AgencyName')
+BEGIN
+    PRINT 'NOTE: columnstore is not available on this service tier; NYC_Payroll_Data_Stage gets a rowstore clustered index';
+    CREATE CLUSTERED INDEX [CIX_NYC_Payroll_Data_Stage_FiscalYear_AgencyName]
+        ON [dbo].[NYC_Payroll_Data_Stage] ([FiscalYear], [AgencyName])
+        WITH (DATA_COMPRESSION = PAGE)
+        ON [ps_FiscalYear]([FiscalYear]);
+END
+GO
+
+-- -----------------------------------------------------------------------------
+-- Summary Table: covering index for (FiscalYear, AgencyName) lookups
+-- -----------------------------------------------------------------------------
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_NYC_Payroll_Summary_FiscalYear_AgencyName')
+CREATE NONCLUSTERED INDEX [IX_NYC_Payroll_Summary_FiscalYear_AgencyName]
+    ON [dbo].[NYC_Payroll_Summary] ([FiscalYear], [AgencyName])
+    INCLUDE ([TotalPaid]);
+GO
@@ -0,0 +1,201 @@
+-- =============================================================================
+-- NYC Payroll Data Analytics - FiscalYear-Partitioned Payroll Table
+-- =============================================================================
+-- Purpose: One payroll table for every fiscal year instead of one table per year
+-- Each FiscalYear lives in its own partition. A year is loaded into the
+-- staging table and switched in, so reloading a year is a metadata operation
+-- (TRUNCATE partition + SWITCH) instead of DELETE + INSERT, and queries with
+-- WHERE FiscalYear = ... only read that year's partition.
+-- Loaded by scripts/azure/partitioned_load.py, which runs this script first,
+-- and by pl_NYC_Payroll_Pipeline (load_manifest.json entries with fiscalYears:
+-- usp_Prepare_Payroll_Years → df_Load_Payroll_Year → usp_Switch_Payroll_Years).
+-- 03_create_sql_tables.py runs it after 01 (every statement is idempotent)
+-- and it drops the per-year tables NYC_Payroll_Data_2020/2021 it replaces
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- Partition Function and Scheme
+-- -----------------------------------------------------------------------------
+
+-- RANGE RIGHT: boundary value Y starts the partition holding FiscalYear = Y
+-- usp_Prepare_Payroll_Year adds the boundaries for new years (Y and Y + 1)
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_FiscalYear')
+CREATE PARTITION FUNCTION [pf_FiscalYear] (int) AS RANGE RIGHT FOR VALUES (2020, 2021, 2022);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = 'ps_FiscalYear')
+CREATE PARTITION SCHEME [ps_FiscalYear] AS PARTITION [pf_FiscalYear] ALL TO ([PRIMARY]);
+GO
+
+-- -----------------------------------------------------------------------------
+-- Payroll Table (all fiscal years, canonical AgencyID column name)
+-- -----------------------------------------------------------------------------
+
+IF OBJECT_ID('dbo.NYC_Payroll_Data', 'U') IS NULL
+CREATE TABLE [dbo].[NYC_Payroll_Data](
+    [FiscalYear] [int] NOT NULL,
+    [PayrollNumber] [int] NULL,
+    [AgencyID] [varchar](10) NULL,
+    [AgencyName] [varchar](50) NULL,
+    [EmployeeID] [varchar](10) NULL,
+    [LastName] [varchar](20) NULL,
+    [FirstName] [varchar](20) NULL,
+    [AgencyStartDate] [date] NULL,
+    [WorkLocationBorough] [varchar](50) NULL,
+    [TitleCode] [varchar](10) NULL,
+    [TitleDescription] [varchar](100) NULL,
+    [LeaveStatusasofJune30] [varchar](50) NULL,
+    [BaseSalary] [float] NULL,
+    [PayBasis] [varchar](50) NULL,
+    [RegularHours] [float] NULL,
+    [RegularGrossPaid] [float] NULL,
+    [OTHours] [float] NULL,
+    [TotalOTPaid] [float] NULL,
+    [TotalOtherPay] [float] NULL
+) ON [ps_FiscalYear]([FiscalYear]);
+GO
+
+-- Staging table: same columns, same partition scheme, so a partition can be
+-- switched straight into the same partition number of NYC_Payroll_Data
+IF OBJECT_ID('dbo.NYC_Payroll_Data_Stage', 'U') IS NULL
+CREATE TABLE [dbo].[NYC_Payroll_Data_Stage](
+    [FiscalYear] [int] NOT NULL,
+    [PayrollNumber] [int] NULL,
+    [AgencyID] [varchar](10) NULL,
+    [AgencyName] [varchar](50) NULL,
+    [EmployeeID] [varchar](10) NULL,
+    [LastName] [varchar](20) NULL,
+    [FirstName] [varchar](20) NULL,
+    [AgencyStartDate] [date] NULL,
+    [WorkLocationBorough] [varchar](50) NULL,
+    [TitleCode] [varchar](10) NULL,
+    [TitleDescription] [varchar](100) NULL,
+    [LeaveStatusasofJune30] [varchar](50) NULL,
+    [BaseSalary] [float] NULL,
+    [PayBasis] [varchar](50) NULL,
+    [RegularHours] [float] NULL,
+    [RegularGrossPaid] [float] NULL,
+    [OTHours] [float] NULL,
+    [TotalOTPaid] [float] NULL,
+    [TotalOtherPay] [float] NULL
+) ON [ps_FiscalYear]([FiscalYear]);
+GO
+
+-- Retired per-year tables (one table per fiscal year): every year is here now
+DROP TABLE IF EXISTS [dbo].[NYC_Payroll_Data_2020];
+DROP TABLE IF EXISTS [dbo].[NYC_Payroll_Data_2021];
+GO
+
+-- -----------------------------------------------------------------------------
+-- Load Procedures
+-- -----------------------------------------------------------------------------
+
+-- Before loading a year: make sure it has its own partition and empty its
+-- staging partition. Y + 1 is always added as well, so no partition ever
+-- holds more than one year and every split cuts off an empty range.
+-- The ForEach prepares several files at once and adjacent years add the same
+-- boundary, so the check and the SPLIT run under one exclusive application
+-- lock (released with the transaction).
+CREATE OR ALTER PROCEDURE [dbo].[usp_Prepare_Payroll_Year] @FiscalYear int
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    DECLARE @Boundary int = @FiscalYear, @Sql nvarchar(400), @Lock int;
+
+    BEGIN TRANSACTION;
+    EXEC @Lock = sp_getapplock @Resource = N'pf_FiscalYear', @LockMode = 'Exclusive',
+        @LockOwner = 'Transaction', @LockTimeout = 600000;
+    IF @Lock < 0
+        THROW 50001, 'usp_Prepare_Payroll_Year: timed out waiting for the pf_FiscalYear lock', 1;
+
+    WHILE @Boundary <= @FiscalYear + 1
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.partition_range_values v
+            JOIN sys.partition_functions f ON f.function_id = v.function_id
+            WHERE f.name = 'pf_FiscalYear' AND CAST(v.value AS int) = @Boundary)
+        BEGIN
+            ALTER PARTITION SCHEME [ps_FiscalYear] NEXT USED [PRIMARY];
+            ALTER PARTITION FUNCTION [pf_FiscalYear]() SPLIT RANGE (@Boundary);
+        END
+        SET @Boundary += 1;
+    END
+    COMMIT TRANSACTION;
+
+    SET @Sql = N'TRUNCATE TABLE [dbo].[NYC_Payroll_Data_Stage] WITH (PARTITIONS ('
+        + CAST($PARTITION.pf_FiscalYear(@FiscalYear) AS nvarchar(10)) + N'));';
+    EXEC sp_executesql @Sql;
+END;
+GO
+
+-- After loading a year into staging: replace that year's partition
+-- (metadata only, no rows are copied or logged individually)
+CREATE OR ALTER PROCEDURE [dbo].[usp_Switch_Payroll_Year] @FiscalYear int
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    DECLARE @Partition nvarchar(10) = CAST($PARTITION.pf_FiscalYear(@FiscalYear) AS nvarchar(10));
+    DECLARE @Sql nvarchar(400) =
+        N'TRUNCATE TABLE [dbo].[NYC_Payroll_Data] WITH (PARTITIONS (' + @Partition + N'));'
+        + N' ALTER TABLE [dbo].[NYC_Payroll_Data_Stage] SWITCH PARTITION ' + @Partition
+        + N' TO [dbo].[NYC_Payroll_Data] PARTITION ' + @Partition + N';';
+
+    BEGIN TRANSACTION;
+    EXEC sp_executesql @Sql;
+    COMMIT TRANSACTION;
+END;
+GO
+
+-- Every year of one payroll file (e.g. N'2020,1998': a file may carry late
+-- records for earlier years), so the pipeline prepares and switches them all
+CREATE OR ALTER PROCEDURE [dbo].[usp_Prepare_Payroll_Years] @FiscalYears nvarchar(400)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Year int;
+    DECLARE years CURSOR LOCAL FAST_FORWARD FOR
+        SELECT DISTINCT CAST(value AS int) FROM STRING_SPLIT(@FiscalYears, ',') WHERE LTRIM(value) <> '';
+
+    OPEN years;
+    FETCH NEXT FROM years INTO @Year;
+    WHILE @@FETCH_STATUS = 0
+    BEGIN
+        EXEC [dbo].[usp_Prepare_Payroll_Year] @Year;
+        FETCH NEXT FROM years INTO @Year;
+    END
+    CLOSE years;
+    DEALLOCATE years;
+END;
+GO
+
+CREATE OR ALTER PROCEDURE [dbo].[usp_Switch_Payroll_Years] @FiscalYears nvarchar(400)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Year int;
+    DECLARE years CURSOR LOCAL FAST_FORWARD FOR
+        SELECT DISTINCT CAST(value AS int) FROM STRING_SPLIT(@FiscalYears, ',') WHERE LTRIM(value) <> '';
+
+    OPEN years;
+    FETCH NEXT FROM years INTO @Year;
+    WHILE @@FETCH_STATUS = 0
+    BEGIN
+        EXEC [dbo].[usp_Switch_Payroll_Year] @Year;
+        FETCH NEXT FROM years INTO @Year;
+    END
+    CLOSE years;
+    DEALLOCATE years;
+END;
+GO
+
+-- -----------------------------------------------------------------------------
+-- Partition Check
+-- -----------------------------------------------------------------------------
+
+-- Rows per partition (one fiscal year per non-empty partition)
+-- SELECT $PARTITION.pf_FiscalYear(FiscalYear) AS PartitionNumber, FiscalYear, COUNT(*) AS Rows
+-- FROM [dbo].[NYC_Payroll_Data]
+-- GROUP BY $PARTITION.pf_FiscalYear(FiscalYear), FiscalYear
+-- ORDER BY FiscalYear;